@@ -3,21 +3,27 @@ from typing import Any
 from airalogy.assigner import AssignerResult, assigner
 
 
-def build_downstream_aimd(dependent_fields: dict[str, Any]) -> str:
-    upstream_aimd_1 = (dependent_fields.get("upstream_aimd_1") or "").strip()
-    upstream_aimd_2 = (dependent_fields.get("upstream_aimd_2") or "").strip()
+_HEADER = "# Downstream AIMD (Auto-Assembled)\n\n## Upstream AIMD #1\n"
+_SEPARATOR = "\n\n---\n\n## Upstream AIMD #2\n"
 
-    return f"""
-# Downstream AIMD (Auto-Assembled)
 
-## Upstream AIMD #1
-{upstream_aimd_1}
+def downstream_aimd_parts(dependent_fields: dict[str, Any]) -> list[Any]:
+    """The pieces `build_downstream_aimd` joins, upstream values included whole.
+
+    Upstream values only need `strip()` and truthiness, so callers can pass
+    rope-like values and concatenate the parts without copying them.
+    """
+    upstream_aimd_1 = (dependent_fields.get("upstream_aimd_1") or "").strip()
+    upstream_aimd_2 = (dependent_fields.get("upstream_aimd_2") or "").strip()
+    if not upstream_aimd_2:
+        return [_HEADER, upstream_aimd_1, _SEPARATOR.rstrip()]
+    return [_HEADER, upstream_aimd_1, _SEPARATOR, upstream_aimd_2]
 
----
 
-## Upstream AIMD #2
-{upstream_aimd_2}
-""".strip()
+def build_downstream_aimd(dependent_fields: dict[str, Any]) -> str:
+    # One copy of each upstream value: `strip()` returns the string itself
+    # when there is nothing to strip.
+    return "".join(downstream_aimd_parts(dependent_fields))
 
 
 @assigner(
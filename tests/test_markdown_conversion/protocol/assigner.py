@@ -2,30 +2,18 @@ from __future__ import annotations
 
 from typing import Any
 
-from airalogy import Airalogy
 from airalogy.assigner import AssignerResult, assigner
 
+from tools import markdown_conversion
+from tools.markdown_conversion import DEFAULT_BACKEND
 
-AIRALOGY_CLIENT = Airalogy()
 
-_DEFAULT_BACKEND = "markitdown"
-
-def _to_markdown(file_id: str) -> tuple[str, str, list[str]]:
-    try:
-        from airalogy.convert import to_markdown
-    except ImportError as exc:
-        raise RuntimeError(
-            "Document conversion API is unavailable in this runtime. "
-            "Please upgrade Airalogy to a version that provides `airalogy.convert.to_markdown`, "
-            "and install `airalogy[markitdown]` for PDF/DOCX support. "
-            f"Import error: {exc}"
-        ) from exc
-
-    result = to_markdown(file_id, backend=_DEFAULT_BACKEND, client=AIRALOGY_CLIENT)
-    source_filename = result.source_filename or file_id
-    warnings: list[str] = list(getattr(result, "warnings", None) or [])
-    text = (result.text or "").strip()
-    return text, source_filename, warnings
+# Where each assigner runs when served (default: inline in the caller's thread).
+# Conversion is CPU-bound and would hold the GIL of a shared worker.
+ASSIGNER_EXECUTION = {
+    "convert_docx": "process",
+    "convert_pdf": "process",
+}
 
 
 @assigner(
@@ -43,12 +31,12 @@ def convert_docx(dependent_fields: dict[str, Any]) -> AssignerResult:
         )
 
     try:
-        text, source_filename, warnings = _to_markdown(docx_file_id)
+        text, source_filename, warnings = markdown_conversion.convert_file(docx_file_id)
     except Exception as exc:
         return AssignerResult(
             success=False,
             error_message=(
-                f"DOCX conversion failed for {docx_file_id} with backend={_DEFAULT_BACKEND!r}: {exc}"
+                f"DOCX conversion failed for {docx_file_id} with backend={DEFAULT_BACKEND!r}: {exc}"
             ),
         )
 
@@ -76,12 +64,12 @@ def convert_pdf(dependent_fields: dict[str, Any]) -> AssignerResult:
         )
 
     try:
-        text, source_filename, warnings = _to_markdown(pdf_file_id)
+        text, source_filename, warnings = markdown_conversion.convert_file(pdf_file_id)
     except Exception as exc:
         return AssignerResult(
             success=False,
             error_message=(
-                f"PDF conversion failed for {pdf_file_id} with backend={_DEFAULT_BACKEND!r}: {exc}"
+                f"PDF conversion failed for {pdf_file_id} with backend={DEFAULT_BACKEND!r}: {exc}"
             ),
         )
 
@@ -4,6 +4,11 @@ from typing import Any
 
 from airalogy.assigner import AssignerResult, assigner
 
+# Where each assigner runs when served (default: inline in the caller's thread).
+ASSIGNER_EXECUTION = {
+    "line_b_slow_auto": "thread",  # sleeps for b4 seconds
+}
+
 
 def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
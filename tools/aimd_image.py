@@ -0,0 +1,1045 @@
+"""The image pipeline of `test_aimd_image`, outside the protocol itself.
+
+`extract_and_describe` in `tests/test_aimd_image/protocol/assigner.py` parses
+the image references of an AIMD, resolves them to URLs and asks a vision
+model to describe them. The pieces it is built from live here:
+
+- `FILE_URL_CACHE` and `IMAGE_ID_CACHE`: in-memory caches of file URLs (until
+  shortly before their signature expires) and parsed image IDs, optionally
+  backed by SQLite (`AIMD_IMAGE_CACHE_DB`);
+- `prepare_images`: deduplicated, downscaled data URIs instead of image URLs
+  (`AIMD_IMAGE_MAX_DIMENSION`, needs Pillow);
+- `OPENAI_CLIENTS`: OpenAI clients and their connection pools, shared per
+  API key and endpoint (`AIMD_IMAGE_OPENAI_BASE_URL`, DashScope by default);
+- `build_ai_description`, and its streaming and asyncio counterparts;
+- `DESCRIPTION_SCHEDULER`: the completions of every `extract_and_describe`
+  in a process, rate-limited, retried with backoff, deduplicated and cached
+  (`AIMD_IMAGE_COMPLETIONS_PER_SECOND`).
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+from urllib.parse import parse_qs, urlsplit
+
+from airalogy import Airalogy
+from airalogy import markdown as aimd
+from airalogy.assigner import AssignerResult
+
+# `openai`, `httpx`, `sqlite3` and `asyncio` are imported where they are first
+# needed: importing `openai` alone costs far more than loading the rest of this
+# module, and the async functions only ever run inside an already-running loop.
+if TYPE_CHECKING:
+    import asyncio
+    import sqlite3
+
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
+    from openai.types.chat import (
+        ChatCompletionContentPartParam,
+        ChatCompletionMessageParam,
+    )
+
+
+@functools.cache
+def _airalogy_client() -> Airalogy:
+    # Created on first use so that importing this module needs no credentials.
+    return Airalogy()
+
+
+DASHSCOPE_BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1"
+# Set to point `extract_and_describe` at another OpenAI-compatible endpoint.
+_BASE_URL_ENV = "AIMD_IMAGE_OPENAI_BASE_URL"
+_MAX_CONCURRENT_URL_REQUESTS = 8
+
+# Set to a file path to persist both caches below across processes.
+_CACHE_DB_ENV = "AIMD_IMAGE_CACHE_DB"
+_DEFAULT_URL_TTL_SECONDS = 300.0
+# Stop handing out a cached URL this long before it expires.
+_URL_EXPIRY_MARGIN_SECONDS = 30.0
+_FILE_URL_CACHE_SIZE = 4096
+_IMAGE_ID_CACHE_SIZE = 256
+# How often reads sweep expired entries out of a cache.
+_CACHE_SWEEP_SECONDS = 60.0
+
+_OPENAI_POOL_LIMITS = {
+    "max_connections": 20,
+    "max_keepalive_connections": 10,
+    "keepalive_expiry": 60.0,
+}
+_OPENAI_CLIENT_IDLE_SECONDS = 600.0
+
+# Client-side limits for the chat completions `extract_and_describe` sends.
+# Set the rate (requests per second) to stay under the provider's quota.
+_COMPLETION_RATE_ENV = "AIMD_IMAGE_COMPLETIONS_PER_SECOND"
+_COMPLETION_BURST = 4
+_MAX_CONCURRENT_COMPLETIONS = 8
+_COMPLETION_MAX_RETRIES = 6
+_COMPLETION_BACKOFF_SECONDS = 0.5
+_COMPLETION_MAX_BACKOFF_SECONDS = 30.0
+_DESCRIPTION_CACHE_SIZE = 1024
+_DESCRIPTION_TTL_SECONDS = 3600.0
+
+
+# Set to a pixel count to send the model deduplicated images, downscaled to
+# fit within that many pixels on either side and inlined as data URIs,
+# instead of their URLs. Requires Pillow.
+_IMAGE_MAX_DIMENSION_ENV = "AIMD_IMAGE_MAX_DIMENSION"
+_IMAGE_JPEG_QUALITY = 85
+_MAX_CONCURRENT_DOWNLOADS = 8
+
+
+def _url_expires_at(url: str, now: float) -> float:
+    """Expiry of a temporary (pre-signed) URL, read from its query string."""
+    query = {
+        key.lower(): values[0] for key, values in parse_qs(urlsplit(url).query).items()
+    }
+    try:
+        if "expires" in query:  # OSS / CloudFront: absolute unix time
+            return float(query["expires"])
+        if "x-amz-expires" in query and "x-amz-date" in query:  # S3 SigV4
+            signed_at = datetime.strptime(
+                query["x-amz-date"] + "+0000", "%Y%m%dT%H%M%SZ%z"
+            )
+            return signed_at.timestamp() + float(query["x-amz-expires"])
+    except ValueError:
+        pass
+    return now + _DEFAULT_URL_TTL_SECONDS
+
+
+class _CacheStore:
+    """Thread-safe key/value store: in-memory, optionally backed by SQLite.
+
+    Expired entries are dropped when read, and every `_CACHE_SWEEP_SECONDS`
+    swept out of both the memory and the SQLite table. With `max_entries`,
+    writes bound both to that many entries.
+    """
+
+    def __init__(self, table: str, db_path: str | None):
+        self._table = table
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._swept = time.monotonic()
+        self._db: sqlite3.Connection | None = None
+        if db_path:
+            import sqlite3
+
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str, now: float) -> str | None:
+        with self._lock:
+            if time.monotonic() - self._swept >= _CACHE_SWEEP_SECONDS:
+                self._sweep(now)
+            entry = self._memory.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    f"SELECT value, expires_at FROM {self._table} WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = self._memory[key] = (row[0], row[1])
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                self._delete(key)
+                return None
+            self._memory.move_to_end(key)
+            return entry[0]
+
+    def put(
+        self,
+        key: str,
+        value: str,
+        expires_at: float,
+        max_entries: int | None = None,
+    ) -> None:
+        with self._lock:
+            self._memory[key] = (value, expires_at)
+            self._memory.move_to_end(key)
+            if max_entries is not None:
+                while len(self._memory) > max_entries:
+                    self._memory.popitem(last=False)
+            if self._db is not None:
+                self._db.execute(
+                    f"INSERT OR REPLACE INTO {self._table} VALUES (?, ?, ?)",
+                    (key, value, expires_at),
+                )
+                self._prune(max_entries)
+                self._db.commit()
+
+    def _sweep(self, now: float) -> None:
+        self._swept = time.monotonic()
+        for key in [key for key, (_, expires_at) in self._memory.items() if expires_at <= now]:
+            del self._memory[key]
+        if self._db is not None:
+            self._db.execute(f"DELETE FROM {self._table} WHERE expires_at <= ?", (now,))
+            self._db.commit()
+
+    def _prune(self, max_entries: int | None) -> None:
+        # Expired rows go first; past `max_entries`, so do the oldest writes
+        # (`INSERT OR REPLACE` gives a rewritten key a new, higher rowid).
+        self._db.execute(
+            f"DELETE FROM {self._table} WHERE expires_at <= ?", (time.time(),)
+        )
+        if max_entries is not None:
+            self._db.execute(
+                f"DELETE FROM {self._table} WHERE rowid NOT IN "
+                f"(SELECT rowid FROM {self._table} ORDER BY rowid DESC LIMIT ?)",
+                (max_entries,),
+            )
+
+    def _delete(self, key: str) -> None:
+        self._memory.pop(key, None)
+        if self._db is not None:
+            self._db.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+            self._db.commit()
+
+
+class _CacheCounters:
+    """Hit/miss counters, shared by the URL resolution threads of `extract_image_data`."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.served_bytes = 0
+        """Size of the cached values handed out instead of being looked up again."""
+        self._counter_lock = threading.Lock()
+
+    def _count(self, cached: str | None) -> None:
+        with self._counter_lock:
+            if cached is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.served_bytes += len(cached.encode())
+
+    def counters(self) -> dict[str, float]:
+        with self._counter_lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "served_bytes": self.served_bytes,
+            }
+
+
+class FileUrlCache(_CacheCounters):
+    """Caches `get_file_url` results until shortly before the URL expires."""
+
+    def __init__(
+        self,
+        db_path: str | None = None,
+        max_entries: int = _FILE_URL_CACHE_SIZE,
+    ):
+        super().__init__()
+        self._store = _CacheStore("file_urls", db_path)
+        self._max_entries = max_entries
+
+    def get_file_url(self, file_id: str) -> str:
+        now = time.time()
+        url = self._store.get(file_id, now)
+        self._count(url)
+        if url is not None:
+            return url
+        url = _airalogy_client().get_file_url(file_id=file_id)
+        expires_at = _url_expires_at(url, now) - _URL_EXPIRY_MARGIN_SECONDS
+        if expires_at > now:
+            self._store.put(file_id, url, expires_at, self._max_entries)
+        return url
+
+
+class ImageIdCache(_CacheCounters):
+    """Caches `get_airalogy_image_ids` by the SHA-256 of the AIMD content."""
+
+    def __init__(
+        self,
+        db_path: str | None = None,
+        max_entries: int = _IMAGE_ID_CACHE_SIZE,
+    ):
+        super().__init__()
+        self._store = _CacheStore("image_ids", db_path)
+        self._max_entries = max_entries
+
+    def get_image_ids(self, aimd_content: str) -> list[str]:
+        key = hashlib.sha256(aimd_content.encode()).hexdigest()
+        cached = self._store.get(key, 0.0)
+        self._count(cached)
+        if cached is not None:
+            return json.loads(cached)
+        image_ids = aimd.get_airalogy_image_ids(aimd_content)
+        self._store.put(key, json.dumps(image_ids), float("inf"), self._max_entries)
+        return image_ids
+
+
+FILE_URL_CACHE = FileUrlCache(os.environ.get(_CACHE_DB_ENV))
+IMAGE_ID_CACHE = ImageIdCache(os.environ.get(_CACHE_DB_ENV))
+
+
+def cache_stats() -> dict[str, dict[str, float]]:
+    """Hit ratios and bytes served from the file URL and image ID caches."""
+    return {
+        "file_urls": FILE_URL_CACHE.counters(),
+        "image_ids": IMAGE_ID_CACHE.counters(),
+    }
+
+
+def _parse_image_ids(aimd_content: str) -> list[str]:
+    try:
+        return IMAGE_ID_CACHE.get_image_ids(aimd_content)
+    except Exception as exc:
+        raise ValueError(f"Failed to parse AIMD for image IDs: {exc}") from exc
+
+
+def extract_image_data(aimd_content: str) -> tuple[list[str], list[str]]:
+    image_ids = _parse_image_ids(aimd_content)
+
+    image_urls: list[str] = []
+    for file_id in image_ids:
+        try:
+            image_urls.append(FILE_URL_CACHE.get_file_url(file_id))
+        except Exception:
+            continue
+
+    return image_ids, image_urls
+
+
+async def extract_image_data_async(
+    aimd_content: str,
+    max_concurrency: int = _MAX_CONCURRENT_URL_REQUESTS,
+) -> tuple[list[str], list[str]]:
+    """Like `extract_image_data`, but resolves the file URLs concurrently."""
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    image_ids = _parse_image_ids(aimd_content)
+    loop = asyncio.get_running_loop()
+
+    async def resolve(pool: ThreadPoolExecutor, file_id: str) -> str | None:
+        try:
+            return await loop.run_in_executor(pool, FILE_URL_CACHE.get_file_url, file_id)
+        except Exception:
+            return None
+
+    # A pool of our own: the loop's default executor (`asyncio.to_thread`)
+    # has min(32, cpus + 4) threads, which would cap `max_concurrency`.
+    workers = max(1, min(max_concurrency, len(image_ids)))
+    with ThreadPoolExecutor(workers, thread_name_prefix="file-url") as pool:
+        # `gather` keeps the order of `image_ids`, which the prompt relies on.
+        resolved = await asyncio.gather(*(resolve(pool, file_id) for file_id in image_ids))
+    return image_ids, [url for url in resolved if url is not None]
+
+
+def _load_pil() -> Any:
+    try:
+        from PIL import Image
+    except ImportError as exc:
+        raise RuntimeError(
+            "Image downscaling requires Pillow; install it with `uv pip install pillow` "
+            f"or unset {_IMAGE_MAX_DIMENSION_ENV}."
+        ) from exc
+    return Image
+
+
+def _image_max_dimension() -> int | None:
+    value = os.environ.get(_IMAGE_MAX_DIMENSION_ENV)
+    return int(value) if value else None
+
+
+def _downscale(data: bytes, max_dimension: int) -> tuple[bytes, str]:
+    """Re-encode an image to fit within `max_dimension`; returns (bytes, MIME type)."""
+    import io
+
+    Image = _load_pil()
+    with Image.open(io.BytesIO(data)) as image:
+        source_format = image.format
+        resized = max(image.size) > max_dimension
+        # `thumbnail` keeps the aspect ratio and never upscales.
+        image.thumbnail((max_dimension, max_dimension))
+        out = io.BytesIO()
+        if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+            image.save(out, format="PNG", optimize=True)
+            mime = "image/png"
+        else:
+            image.convert("RGB").save(
+                out, format="JPEG", quality=_IMAGE_JPEG_QUALITY, optimize=True
+            )
+            mime = "image/jpeg"
+    if not resized and source_format in ("JPEG", "PNG") and out.tell() >= len(data):
+        # Already small enough, and re-encoding would not make it smaller.
+        return data, f"image/{source_format.lower()}"
+    return out.getvalue(), mime
+
+
+@dataclass
+class PreparedImages:
+    """Images to send the model, deduplicated by file ID and by content."""
+
+    image_ids: list[str]
+    """The file ID of every image kept, in order of first appearance."""
+    data_uris: list[str]
+    duplicates: int = 0
+    failed: list[str] = field(default_factory=list)
+    source_bytes: int = 0
+    """Downloaded bytes of the kept images."""
+    sent_bytes: int = 0
+    """Bytes of the kept images as inlined (after downscaling, before base64)."""
+
+
+def prepare_images(image_ids: list[str], max_dimension: int) -> PreparedImages:
+    """Download, deduplicate and downscale images into data URIs.
+
+    A repeated file ID is only downloaded once, and an image whose bytes
+    match an earlier one is dropped. Images that fail to download or decode
+    are skipped, like unresolvable URLs in `extract_image_data`.
+    """
+    import base64
+    from concurrent.futures import ThreadPoolExecutor
+
+    _load_pil()  # fail before downloading anything if Pillow is missing
+    unique_ids = list(dict.fromkeys(image_ids))
+    prepared = PreparedImages(
+        image_ids=[], data_uris=[], duplicates=len(image_ids) - len(unique_ids)
+    )
+
+    def fetch(file_id: str) -> bytes | None:
+        try:
+            return _airalogy_client().download_file_bytes(file_id)
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(_MAX_CONCURRENT_DOWNLOADS) as pool:
+        downloads = list(pool.map(fetch, unique_ids))
+
+    seen: set[str] = set()
+    for file_id, data in zip(unique_ids, downloads):
+        if data is None:
+            prepared.failed.append(file_id)
+            continue
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in seen:
+            prepared.duplicates += 1
+            continue
+        seen.add(digest)
+        try:
+            encoded, mime = _downscale(data, max_dimension)
+        except Exception:
+            prepared.failed.append(file_id)
+            continue
+        prepared.image_ids.append(file_id)
+        prepared.data_uris.append(
+            f"data:{mime};base64,{base64.b64encode(encoded).decode('ascii')}"
+        )
+        prepared.source_bytes += len(data)
+        prepared.sent_bytes += len(encoded)
+    return prepared
+
+
+def model_images(image_ids: list[str], image_urls: list[str]) -> list[str]:
+    """What to attach to the completion request: inlined images or unique URLs."""
+    max_dimension = _image_max_dimension()
+    if max_dimension is None:
+        return list(dict.fromkeys(image_urls))
+    return prepare_images(image_ids, max_dimension).data_uris
+
+
+class OpenAIClientRegistry:
+    """Shares one `OpenAI` client (and its keep-alive connection pool) per
+    (api_key, base_url), closing clients that have not been used for
+    `idle_seconds`.
+
+    `lease_async` does the same for `AsyncOpenAI` clients, one per event
+    loop as well: an async connection pool cannot outlive its loop.
+    """
+
+    def __init__(
+        self,
+        limits: httpx.Limits | None = None,
+        idle_seconds: float = _OPENAI_CLIENT_IDLE_SECONDS,
+    ):
+        self.limits = limits
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        # key -> [client, last_used, leases in flight]; async clients are
+        # keyed by their event loop too.
+        self._clients: dict[tuple[Any, ...], list[Any]] = {}
+
+    @contextmanager
+    def lease(self, api_key: str, base_url: str) -> Iterator[OpenAI]:
+        entry = self._acquire((api_key, base_url), self._create_client)
+        try:
+            yield entry[0]
+        finally:
+            self._release(entry)
+
+    @asynccontextmanager
+    async def lease_async(self, api_key: str, base_url: str) -> AsyncIterator[AsyncOpenAI]:
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        entry = self._acquire((api_key, base_url, loop), self._create_async_client)
+        try:
+            yield entry[0]
+        finally:
+            self._release(entry)
+
+    def _acquire(self, key: tuple[Any, ...], create: Callable[..., Any]) -> list[Any]:
+        with self._lock:
+            self._evict_idle(time.monotonic())
+            entry = self._clients.get(key)
+            if entry is None:
+                entry = self._clients[key] = [create(*key[:2]), 0.0, 0]
+            entry[2] += 1
+            return entry
+
+    def _release(self, entry: list[Any]) -> None:
+        with self._lock:
+            entry[1] = time.monotonic()
+            entry[2] -= 1
+
+    def _limits(self) -> httpx.Limits:
+        import httpx
+
+        return self.limits or httpx.Limits(**_OPENAI_POOL_LIMITS)
+
+    def _create_client(self, api_key: str, base_url: str) -> OpenAI:
+        from openai import DefaultHttpxClient, OpenAI
+
+        return OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=DefaultHttpxClient(limits=self._limits()),
+        )
+
+    def _create_async_client(self, api_key: str, base_url: str) -> AsyncOpenAI:
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        return AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=DefaultAsyncHttpxClient(limits=self._limits()),
+        )
+
+    def _evict_idle(self, now: float) -> None:
+        for key, (client, last_used, leases) in list(self._clients.items()):
+            loop_closed = len(key) == 3 and key[2].is_closed()
+            if leases == 0 and (loop_closed or now - last_used > self.idle_seconds):
+                del self._clients[key]
+                self._close_client(key, client)
+
+    @staticmethod
+    def _close_client(key: tuple[Any, ...], client: Any) -> None:
+        if len(key) == 2:
+            client.close()
+            return
+        # An async client can only be closed on its own loop; once that loop
+        # is closed, so are the connections it served.
+        loop: asyncio.AbstractEventLoop = key[2]
+        if loop.is_running():
+            import asyncio
+
+            asyncio.run_coroutine_threadsafe(client.close(), loop)
+
+    def close(self) -> None:
+        with self._lock:
+            for key, (client, _, _) in self._clients.items():
+                self._close_client(key, client)
+            self._clients.clear()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+OPENAI_CLIENTS = OpenAIClientRegistry()
+
+
+def _build_messages(
+    aimd_content: str, image_urls: list[str]
+) -> list[ChatCompletionMessageParam]:
+    system_prompt = (
+        "You are verifying that you can see images embedded in Airalogy Markdown. "
+        "Use both the text and images provided. "
+        "Briefly describe what each image shows (order matters), mention if any image URL seems invalid, "
+        "and summarize key visual details in 3-6 sentences. Do not invent content."
+    )
+
+    user_content: list[ChatCompletionContentPartParam] = [
+        {
+            "type": "text",
+            "text": aimd_content,
+        }
+    ]
+    for url in image_urls:
+        user_content.append(
+            {
+                "type": "image_url",
+                "image_url": {"url": url},
+            }
+        )
+
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content},
+    ]
+
+
+def resolve_base_url(base_url: str | None) -> str:
+    return base_url or os.environ.get(_BASE_URL_ENV) or DASHSCOPE_BASE_URL
+
+
+def _completion_text(completion: Any) -> str:
+    content = completion.choices[0].message.content
+    if not content:
+        raise ValueError("LLM returned empty description.")
+    return content.strip()
+
+
+def build_ai_description(
+    aimd_content: str,
+    image_urls: list[str],
+    api_key: str,
+    model: str = "qwen3-vl-flash",
+    base_url: str = DASHSCOPE_BASE_URL,
+    max_retries: int | None = None,
+) -> str:
+    with OPENAI_CLIENTS.lease(api_key, base_url) as client:
+        if max_retries is not None:
+            client = client.with_options(max_retries=max_retries)
+        completion = client.chat.completions.create(
+            model=model,
+            messages=_build_messages(aimd_content, image_urls),
+        )
+    return _completion_text(completion)
+
+
+
+class _TokenBucket:
+    """Hands out `rate` tokens per second, in bursts of up to `burst`."""
+
+    def __init__(self, rate: float | None, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._paused_until = 0.0
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self.rate is None:
+                        return
+                    self._tokens = min(
+                        self.burst, self._tokens + (now - self._refilled) * self.rate
+                    )
+                    self._refilled = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hand out nothing for `seconds`, e.g. after the provider asked to retry later."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+def _retry_after(exc: Exception) -> float | None:
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    for header, scale in (("retry-after-ms", 1e-3), ("retry-after", 1.0)):
+        try:
+            return float(response.headers[header]) * scale
+        except (KeyError, ValueError):
+            continue
+    return None
+
+
+def _is_retryable(exc: Exception) -> bool:
+    from openai import APIConnectionError, APIStatusError, RateLimitError
+
+    if isinstance(exc, (RateLimitError, APIConnectionError)):
+        return True
+    return isinstance(exc, APIStatusError) and exc.status_code >= 500
+
+
+class DescriptionScheduler:
+    """Shares the chat completions of every `extract_and_describe` in a process.
+
+    - identical requests (same API key, endpoint, model, AIMD content and
+      images) are answered from a cache of descriptions, kept for `ttl`
+      seconds and bounded to `cache_size` entries, or wait for the one
+      already in flight instead of sending their own;
+    - at most `max_concurrency` completions are in flight, started at no more
+      than `rate` per second (token bucket, bursts of `burst`);
+    - rate limits, 5xx answers and connection errors are retried up to
+      `max_retries` times with exponential backoff and full jitter. A 429
+      pauses the bucket for its `Retry-After`, so that the other requests
+      back off too instead of stacking retries.
+
+    Signed-URL query strings (`?Expires=...`) are not part of the request
+    identity. The API key is, as a hash: a key is only ever answered with
+    descriptions it paid for itself.
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        *,
+        burst: int = _COMPLETION_BURST,
+        max_concurrency: int = _MAX_CONCURRENT_COMPLETIONS,
+        max_retries: int = _COMPLETION_MAX_RETRIES,
+        backoff_seconds: float = _COMPLETION_BACKOFF_SECONDS,
+        max_backoff_seconds: float = _COMPLETION_MAX_BACKOFF_SECONDS,
+        db_path: str | None = None,
+        cache_size: int = _DESCRIPTION_CACHE_SIZE,
+        ttl: float = _DESCRIPTION_TTL_SECONDS,
+    ):
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._bucket = _TokenBucket(rate, burst)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._store = _CacheStore("descriptions", db_path)
+        self._cache_size = cache_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future[str]] = {}
+        self.requests = 0
+        self.cache_hits = 0
+        self.deduplicated = 0
+        self.completions = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.failures = 0
+
+    @staticmethod
+    def request_key(
+        aimd_content: str,
+        image_urls: list[str],
+        api_key: str,
+        model: str,
+        base_url: str,
+    ) -> str:
+        images = [
+            url if url.startswith("data:") else urlsplit(url)._replace(query="").geturl()
+            for url in image_urls
+        ]
+        key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+        payload = json.dumps([key_hash, base_url, model, aimd_content, images])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def describe(
+        self,
+        aimd_content: str,
+        image_urls: list[str],
+        api_key: str,
+        model: str = "qwen3-vl-flash",
+        base_url: str = DASHSCOPE_BASE_URL,
+    ) -> str:
+        """`build_ai_description`, scheduled."""
+        key = self.request_key(aimd_content, image_urls, api_key, model, base_url)
+        with self._lock:
+            self.requests += 1
+            cached = self._store.get(key, time.time())
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self.deduplicated += 1
+        if not leader:
+            return future.result()
+
+        try:
+            description = self._complete(aimd_content, image_urls, api_key, model, base_url)
+        except BaseException as exc:
+            with self._lock:
+                self.failures += 1
+                del self._in_flight[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            self._store.put(key, description, time.time() + self.ttl, self._cache_size)
+            del self._in_flight[key]
+        future.set_result(description)
+        return description
+
+    def _complete(
+        self,
+        aimd_content: str,
+        image_urls: list[str],
+        api_key: str,
+        model: str,
+        base_url: str,
+    ) -> str:
+        attempt = 0
+        while True:
+            self._bucket.acquire()
+            with self._slots:
+                with self._lock:
+                    self.completions += 1
+                try:
+                    # The client's own retries would bypass the bucket.
+                    return build_ai_description(
+                        aimd_content,
+                        image_urls,
+                        api_key=api_key,
+                        model=model,
+                        base_url=base_url,
+                        max_retries=0,
+                    )
+                except Exception as exc:
+                    if attempt == self.max_retries or not _is_retryable(exc):
+                        raise
+                    retry_after = _retry_after(exc)
+                    rate_limited = getattr(exc, "status_code", None) == 429
+
+            delay = random.uniform(
+                0, min(self.max_backoff_seconds, self.backoff_seconds * 2**attempt)
+            )
+            if retry_after is not None:
+                self._bucket.pause(retry_after)
+                delay = max(delay, retry_after)
+            with self._lock:
+                self.retries += 1
+                self.rate_limited += rate_limited
+            attempt += 1
+            time.sleep(delay)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "cache_hits": self.cache_hits,
+                "deduplicated": self.deduplicated,
+                "completions": self.completions,
+                "rate_limited": self.rate_limited,
+                "retries": self.retries,
+                "failures": self.failures,
+            }
+
+
+def _completion_rate() -> float | None:
+    value = os.environ.get(_COMPLETION_RATE_ENV)
+    return float(value) if value else None
+
+
+DESCRIPTION_SCHEDULER = DescriptionScheduler(
+    _completion_rate(), db_path=os.environ.get(_CACHE_DB_ENV)
+)
+
+
+def iter_ai_description(
+    aimd_content: str,
+    image_urls: list[str],
+    api_key: str,
+    model: str = "qwen3-vl-flash",
+    base_url: str = DASHSCOPE_BASE_URL,
+) -> Iterator[str]:
+    """Yield the description as text deltas while the model generates it."""
+    with OPENAI_CLIENTS.lease(api_key, base_url) as client:
+        stream = client.chat.completions.create(
+            model=model,
+            messages=_build_messages(aimd_content, image_urls),
+            stream=True,
+        )
+        with stream:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+
+def stream_ai_description(
+    aimd_content: str,
+    image_urls: list[str],
+    api_key: str,
+    model: str = "qwen3-vl-flash",
+    base_url: str = DASHSCOPE_BASE_URL,
+    on_partial: Callable[[str], None] | None = None,
+) -> tuple[str, dict[str, float]]:
+    """Streaming counterpart of `build_ai_description`.
+
+    Calls `on_partial` with the description received so far after every
+    token. Returns the final description together with the wall-clock
+    timings in seconds (`first_token`, `total`).
+    """
+    text = ""
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    for delta in iter_ai_description(
+        aimd_content, image_urls, api_key=api_key, model=model, base_url=base_url
+    ):
+        if not text:
+            timings["first_token"] = time.perf_counter() - started
+        text += delta
+        if on_partial is not None:
+            on_partial(text)
+    timings["total"] = time.perf_counter() - started
+    if not text.strip():
+        raise ValueError("LLM returned empty description.")
+    return text.strip(), timings
+
+
+async def build_ai_description_async(
+    aimd_content: str,
+    image_urls: list[str],
+    api_key: str,
+    model: str = "qwen3-vl-flash",
+    base_url: str | None = None,
+) -> str:
+    async with OPENAI_CLIENTS.lease_async(api_key, resolve_base_url(base_url)) as client:
+        completion = await client.chat.completions.create(
+            model=model,
+            messages=_build_messages(aimd_content, image_urls),
+        )
+    return _completion_text(completion)
+
+
+async def extract_and_describe_async(
+    dependent_fields: dict[str, Any],
+    base_url: str | None = None,
+    max_concurrency: int = _MAX_CONCURRENT_URL_REQUESTS,
+) -> tuple[AssignerResult, dict[str, float]]:
+    """Asyncio counterpart of `extract_and_describe`.
+
+    Returns the assigner result together with per-phase wall-clock timings in
+    seconds (`resolve_urls`, `prepare_images`, `completion`, `total`).
+
+    The completion bypasses `DESCRIPTION_SCHEDULER`: no client-side rate
+    limit, retries, deduplication or description cache on this path.
+    """
+    import asyncio
+
+    aimd_content = dependent_fields["aimd_content"]
+    api_key = dependent_fields.get("qwen_api_key") or ""
+    model = dependent_fields.get("model") or "qwen3-vl-flash"
+
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    try:
+        image_ids, image_urls = await extract_image_data_async(
+            aimd_content, max_concurrency=max_concurrency
+        )
+        resolved = time.perf_counter()
+        timings["resolve_urls"] = resolved - started
+        images = await asyncio.to_thread(model_images, image_ids, image_urls)
+        prepared = time.perf_counter()
+        timings["prepare_images"] = prepared - resolved
+        description = await build_ai_description_async(
+            aimd_content,
+            images,
+            api_key=api_key,
+            model=model,
+            base_url=base_url,
+        )
+        timings["completion"] = time.perf_counter() - prepared
+    except Exception as exc:
+        timings["total"] = time.perf_counter() - started
+        return (
+            AssignerResult(
+                success=False,
+                error_message=f"AIMD image test failed: {exc}",
+            ),
+            timings,
+        )
+
+    timings["total"] = time.perf_counter() - started
+    return (
+        AssignerResult(
+            assigned_fields={
+                "image_ids": image_ids,
+                "image_urls": image_urls,
+                "ai_description": description,
+            }
+        ),
+        timings,
+    )
+
+
+def extract_and_describe_streaming(
+    dependent_fields: dict[str, Any],
+    on_partial: Callable[[dict[str, Any]], None],
+    base_url: str | None = None,
+) -> tuple[AssignerResult, dict[str, float]]:
+    """Streaming counterpart of `extract_and_describe`.
+
+    Publishes partial values through `on_partial` as they become available:
+    `image_ids` and `image_urls` once resolved, then `ai_description` after
+    every token. The returned result carries the final values to commit,
+    together with per-phase wall-clock timings in seconds (`resolve_urls`,
+    `first_token` and `completion` from the start of the assigner, `total`).
+
+    The completion bypasses `DESCRIPTION_SCHEDULER` (a stream cannot be
+    shared or cached token by token): no client-side rate limit, retries,
+    deduplication or description cache on this path.
+    """
+    aimd_content = dependent_fields["aimd_content"]
+    api_key = dependent_fields.get("qwen_api_key") or ""
+    model = dependent_fields.get("model") or "qwen3-vl-flash"
+
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    try:
+        image_ids, image_urls = extract_image_data(aimd_content)
+        timings["resolve_urls"] = time.perf_counter() - started
+        on_partial({"image_ids": image_ids, "image_urls": image_urls})
+        images = model_images(image_ids, image_urls)
+        requested = time.perf_counter() - started
+        description, completion = stream_ai_description(
+            aimd_content,
+            images,
+            api_key=api_key,
+            model=model,
+            base_url=resolve_base_url(base_url),
+            on_partial=lambda text: on_partial({"ai_description": text}),
+        )
+        timings["first_token"] = requested + completion["first_token"]
+        timings["completion"] = requested + completion["total"]
+    except Exception as exc:
+        timings["total"] = time.perf_counter() - started
+        return (
+            AssignerResult(
+                success=False,
+                error_message=f"AIMD image test failed: {exc}",
+            ),
+            timings,
+        )
+
+    timings["total"] = time.perf_counter() - started
+    return (
+        AssignerResult(
+            assigned_fields={
+                "image_ids": image_ids,
+                "image_urls": image_urls,
+                "ai_description": description,
+            }
+        ),
+        timings,
+    )
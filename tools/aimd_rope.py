@@ -0,0 +1,193 @@
+"""`AimdRope`: an `AiralogyMarkdown` value assembled from slices of other values.
+
+Assembling a downstream AIMD from its upstream fields with string operations
+copies every upstream character at every hop, so a chain of N hops over
+multi-megabyte notebooks copies the first notebook N times. A rope instead
+keeps references to the original strings together with `(start, stop)`
+offsets into them; concatenating and stripping ropes only touches those
+offsets. Text is materialized by `str()` (or streamed by `write`) when the
+value is rendered or persisted.
+
+Image references are indexed once per original string, when it is wrapped by
+`AimdRope.of`, and carried along with the slices, so `image_ids` never
+rescans the text.
+
+    upstream = AimdRope.of(upstream_aimd_1)
+    downstream = AimdRope.concat(header, upstream.strip(), separator, ...)
+    downstream.image_ids()  # same as get_airalogy_image_ids(str(downstream))
+"""
+
+from __future__ import annotations
+
+import bisect
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import TextIO
+
+
+try:
+    # The patterns `get_airalogy_image_ids` scans for, in its order, so that
+    # `image_ids` cannot drift from the library.
+    from airalogy.markdown.get import _MARKDOWN_IMAGE_PATTERNS as _IMAGE_PATTERNS
+except ImportError:
+    # Private to airalogy; mirror the patterns of airalogy 0.0.13 if it moves.
+    _FILE_ID = r"(airalogy\.id\.file\.[A-Za-z0-9_-]+\.[A-Za-z0-9._-]+)"
+    _IMAGE_PATTERNS = [
+        re.compile(r"!\[[^\]]*\]\(\s*" + _FILE_ID + r"\s*\)"),
+        re.compile(r"src\s*:\s*" + _FILE_ID, re.IGNORECASE),
+    ]
+
+
+@dataclass(frozen=True, slots=True)
+class _ImageIndex:
+    """Image references of one original string, one tuple per pattern."""
+
+    starts: tuple[tuple[int, ...], ...]
+    ends: tuple[tuple[int, ...], ...]
+    ids: tuple[tuple[str, ...], ...]
+
+    @classmethod
+    def scan(cls, text: str) -> _ImageIndex:
+        starts, ends, ids = [], [], []
+        for pattern in _IMAGE_PATTERNS:
+            matches = list(pattern.finditer(text))
+            starts.append(tuple(match.start() for match in matches))
+            ends.append(tuple(match.end() for match in matches))
+            ids.append(tuple(match.group(1) for match in matches))
+        return cls(tuple(starts), tuple(ends), tuple(ids))
+
+    def within(self, pattern: int, start: int, stop: int) -> Iterator[str]:
+        """IDs matched by `pattern` lying entirely inside `text[start:stop]`."""
+        starts = self.starts[pattern]
+        ends = self.ends[pattern]
+        for i in range(bisect.bisect_left(starts, start), len(starts)):
+            if starts[i] >= stop:
+                break
+            if ends[i] <= stop:
+                yield self.ids[pattern][i]
+
+
+_NO_MATCHES = ((),) * len(_IMAGE_PATTERNS)
+_NO_IMAGES = _ImageIndex(_NO_MATCHES, _NO_MATCHES, _NO_MATCHES)
+
+
+@dataclass(frozen=True, slots=True)
+class _Piece:
+    text: str
+    start: int
+    stop: int
+    images: _ImageIndex
+
+
+class AimdRope:
+    """Immutable text made of `(string, start, stop)` slices of other strings.
+
+    Supports `len`, truthiness, `strip`, `+` and `str()`; image references
+    are matched within each slice, never across the boundary between two.
+    """
+
+    __slots__ = ("_pieces", "_length")
+
+    def __init__(self, pieces: Iterable[_Piece] = ()):
+        self._pieces = tuple(piece for piece in pieces if piece.stop > piece.start)
+        self._length = sum(piece.stop - piece.start for piece in self._pieces)
+
+    @classmethod
+    def of(cls, text: str | AimdRope, *, index_images: bool = True) -> AimdRope:
+        """Wrap a string (indexing its image references once), or return a rope as is."""
+        if isinstance(text, AimdRope):
+            return text
+        images = _ImageIndex.scan(text) if index_images else _NO_IMAGES
+        return cls((_Piece(text, 0, len(text), images),))
+
+    @classmethod
+    def concat(cls, *parts: str | AimdRope) -> AimdRope:
+        """Concatenate strings and ropes; strings are wrapped without copying."""
+        pieces: list[_Piece] = []
+        for part in parts:
+            pieces.extend(cls.of(part)._pieces)
+        return cls(pieces)
+
+    def __add__(self, other: str | AimdRope) -> AimdRope:
+        return AimdRope.concat(self, other)
+
+    def __radd__(self, other: str) -> AimdRope:
+        return AimdRope.concat(other, self)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __bool__(self) -> bool:
+        return self._length > 0
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, AimdRope):
+            return len(self) == len(other) and str(self) == str(other)
+        if isinstance(other, str):
+            return len(self) == len(other) and str(self) == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __str__(self) -> str:
+        if len(self._pieces) == 1:
+            piece = self._pieces[0]
+            if piece.start == 0 and piece.stop == len(piece.text):
+                return piece.text
+        return "".join(self._slices())
+
+    def __repr__(self) -> str:
+        return f"AimdRope(length={self._length}, pieces={len(self._pieces)})"
+
+    def _slices(self) -> Iterator[str]:
+        for piece in self._pieces:
+            if piece.start == 0 and piece.stop == len(piece.text):
+                yield piece.text
+            else:
+                yield piece.text[piece.start : piece.stop]
+
+    def write(self, fp: TextIO, chunk_size: int = 1 << 20) -> int:
+        """Stream the text into `fp` without materializing all of it; returns its length."""
+        for piece in self._pieces:
+            for offset in range(piece.start, piece.stop, chunk_size):
+                fp.write(piece.text[offset : min(offset + chunk_size, piece.stop)])
+        return self._length
+
+    def strip(self) -> AimdRope:
+        """Like `str.strip()`, by moving offsets; whitespace-only pieces are dropped."""
+        pieces = list(self._pieces)
+        while pieces:
+            piece = pieces[0]
+            start = piece.start
+            while start < piece.stop and piece.text[start].isspace():
+                start += 1
+            if start < piece.stop:
+                pieces[0] = _Piece(piece.text, start, piece.stop, piece.images)
+                break
+            pieces.pop(0)
+        while pieces:
+            piece = pieces[-1]
+            stop = piece.stop
+            while stop > piece.start and piece.text[stop - 1].isspace():
+                stop -= 1
+            if stop > piece.start:
+                pieces[-1] = _Piece(piece.text, piece.start, stop, piece.images)
+                break
+            pieces.pop()
+        return AimdRope(pieces)
+
+    def image_ids(self) -> list[str]:
+        """Unique image file IDs in order of first appearance, from the index."""
+        ids: dict[str, None] = {}
+        for pattern in range(len(_IMAGE_PATTERNS)):
+            for piece in self._pieces:
+                ids.update(
+                    dict.fromkeys(piece.images.within(pattern, piece.start, piece.stop))
+                )
+        return list(ids)
+
+    @property
+    def pieces(self) -> int:
+        return len(self._pieces)
@@ -0,0 +1,271 @@
+"""Single-pass, streaming scanner for `{{var|...}}` declarations in AIMD.
+
+`airalogy.markdown.extract_vars` needs the whole document as one string and
+builds a full syntax tree. `scan_vars` instead reads a binary stream (a file
+object, an `mmap`, or a path) in fixed-size chunks and only decodes the text
+inside each `{{var|...}}`, yielding declarations with their byte offsets as
+it goes. Like `extract_vars`, it skips backtick-fenced code blocks (e.g.
+```` ```aimd ```` examples and Mermaid diagrams) and inline code spans.
+
+    for var in scan_vars("tests/test_typed_var_table/protocol/protocol.aimd"):
+        print(var.name, var.start, var.end, var.subvars)
+"""
+
+from __future__ import annotations
+
+import ast
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO
+
+
+CHUNK_SIZE = 1 << 20
+
+_TOKEN = re.compile(rb"^ {0,3}(?P<fence>`{3,})|\{\{var\|", re.MULTILINE)
+_BACKTICKS = re.compile(rb"`+")
+_IDENTIFIER = re.compile(r"[A-Za-z_]\w*")
+_STRUCTURE = re.compile(
+    r'(?P<string>"""[\s\S]*?"""|' r"'''[\s\S]*?'''"
+    r'|"(?:[^"\\\n]|\\.)*"|' r"'(?:[^'\\\n]|\\.)*')"
+    r"|(?P<open>[(\[{])|(?P<close>[)\]}])|(?P<sep>[,:=])"
+)
+_PLAIN_STRING = re.compile(r'"[^"\\\n]*"|' r"'[^'\\\n]*'")
+_INTEGER = re.compile(r"[-+]?\d+")
+_CONSTANTS = {"True": True, "False": False, "None": None}
+_MISSING: Any = object()
+
+
+@dataclass(frozen=True)
+class VarDecl:
+    name: str
+    type_annotation: str | None = None
+    default_value: Any = _MISSING
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    subvars: tuple[VarDecl, ...] = ()
+    start: int = 0
+    """Byte offset of `{{` in the scanned stream."""
+    end: int = 0
+    """Byte offset just past `}}`."""
+    line: int = 0
+
+    @property
+    def has_default(self) -> bool:
+        return self.default_value is not _MISSING
+
+    def to_dict(self) -> dict[str, Any]:
+        """The keys `extract_vars` reports for a var (without positions)."""
+        result: dict[str, Any] = {"name": self.name}
+        if self.type_annotation is not None:
+            result["type_annotation"] = self.type_annotation
+        if self.has_default:
+            result["default_value"] = self.default_value
+        if self.kwargs:
+            result["kwargs"] = self.kwargs
+        if self.subvars:
+            result["subvars"] = [subvar.to_dict() for subvar in self.subvars]
+        return result
+
+
+def _fields(text: str) -> list[tuple[str, int, int]]:
+    """Split on top-level commas, outside brackets and string literals.
+
+    Each field comes with the offsets of its first top-level `:` (before any
+    `=`) and `=`, or -1.
+    """
+    fields = []
+    depth = 0
+    start = 0
+    colon = equals = -1
+    for token in _STRUCTURE.finditer(text):
+        kind = token.lastgroup
+        if kind == "open":
+            depth += 1
+        elif kind == "close":
+            depth -= 1
+        elif kind == "sep" and not depth:
+            index = token.start()
+            char = text[index]
+            if char == ",":
+                fields.append((text[start:index], colon, equals))
+                start = index + 1
+                colon = equals = -1
+            elif char == ":":
+                if colon == -1 and equals == -1:
+                    colon = index - start
+            elif equals == -1 and not (
+                # `==`, `<=`, `>=` and `!=` are not assignments.
+                text[index - 1 : index] in ("=", "<", ">", "!")
+                or text[index + 1 : index + 2] == "="
+            ):
+                equals = index - start
+    fields.append((text[start:], colon, equals))
+    return [field for field in fields if field[0].strip()]
+
+
+def _literal(text: str) -> Any:
+    text = text.strip()
+    # Shortcuts for the values that make up nearly all declarations.
+    if _PLAIN_STRING.fullmatch(text):
+        return text[1:-1]
+    if _INTEGER.fullmatch(text):
+        return int(text)
+    if text in _CONSTANTS:
+        return _CONSTANTS[text]
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        raise ValueError(f"Not a literal value: {text!r}") from None
+
+
+def _parse_var(text: str, start: int = 0, end: int = 0, line: int = 0) -> VarDecl:
+    """Parse `name: type = default, key=value, ..., subvars=[...]`."""
+    fields = _fields(text)
+    if not fields:
+        raise ValueError("Empty var declaration")
+    (declaration, colon, equals), *options = fields
+
+    target = declaration[:equals] if equals != -1 else declaration
+    name = (target[:colon] if colon != -1 else target).strip()
+    if not _IDENTIFIER.fullmatch(name):
+        raise ValueError(f"Invalid var name: {name!r}")
+    type_annotation = target[colon + 1 :].strip() if colon != -1 else None
+
+    kwargs: dict[str, Any] = {}
+    subvars: tuple[VarDecl, ...] = ()
+    for option, _, equals_at in options:
+        key = option[:equals_at].strip() if equals_at != -1 else ""
+        if not _IDENTIFIER.fullmatch(key):
+            raise ValueError(f"Invalid keyword argument in var {name}: {option.strip()!r}")
+        value = option[equals_at + 1 :]
+        if key == "subvars":
+            subvars = tuple(
+                _parse_subvar(item, start, end, line)
+                for item, _, _ in _fields(value.strip()[1:-1])
+            )
+        else:
+            kwargs[key] = _literal(value)
+
+    if type_annotation is None and subvars:
+        type_annotation = "list"
+    return VarDecl(
+        name=name,
+        type_annotation=type_annotation,
+        default_value=_literal(declaration[equals + 1 :]) if equals != -1 else _MISSING,
+        kwargs=kwargs,
+        subvars=subvars,
+        start=start,
+        end=end,
+        line=line,
+    )
+
+
+def _parse_subvar(text: str, start: int, end: int, line: int) -> VarDecl:
+    text = text.strip()
+    if text.startswith("var(") and text.endswith(")"):
+        text = text[4:-1]
+    return _parse_var(text, start, end, line)
+
+
+def _in_code_span(prefix: bytes) -> bool:
+    # A backtick run opens a code span that the next run of the same length closes.
+    open_run = 0
+    for run in _BACKTICKS.finditer(prefix):
+        length = run.end() - run.start()
+        if not open_run:
+            open_run = length
+        elif length == open_run:
+            open_run = 0
+    return bool(open_run)
+
+
+def _open(source: str | Path | BinaryIO) -> tuple[BinaryIO, bool]:
+    if isinstance(source, (str, Path)):
+        return open(source, "rb"), True
+    return source, False
+
+
+def scan_vars(
+    source: str | Path | BinaryIO, *, chunk_size: int = CHUNK_SIZE
+) -> Iterator[VarDecl]:
+    """Yield the `{{var|...}}` declarations of an AIMD document in order.
+
+    `source` is a path or anything with a binary `read(size)` (a file opened in
+    `"rb"` mode, `io.BytesIO`, `mmap.mmap`). At most one chunk plus the text of
+    one unfinished var is held in memory. Offsets count bytes from the start of
+    the stream; `line` is 1-based.
+    """
+    stream, owned = _open(source)
+    try:
+        yield from _scan(stream, chunk_size)
+    finally:
+        if owned:
+            stream.close()
+
+
+def _scan(stream: BinaryIO, chunk_size: int) -> Iterator[VarDecl]:
+    buffer = b""
+    base = 0  # stream offset of buffer[0]; buffer always starts at a line start
+    line = 1  # line number of buffer[0]
+    resume = 0
+    fence: re.Pattern[bytes] | None = None
+    eof = False
+    while not eof:
+        chunk = stream.read(chunk_size)
+        if chunk:
+            buffer += chunk
+        else:
+            eof = True
+        # Only scan complete lines, so that `^` anchors are never cut off.
+        limit = len(buffer) if eof else buffer.rfind(b"\n") + 1
+        position = resume
+        counted = 0  # newlines in buffer[:counted] are already added to `line`
+        while position < limit:
+            if fence is not None:
+                match = fence.search(buffer, position, limit)
+                if match is None:
+                    position = limit
+                    break
+                fence = None
+                position = match.end()
+                continue
+
+            match = _TOKEN.search(buffer, position, limit)
+            if match is None:
+                position = limit
+                break
+            if match.group("fence"):
+                ticks = len(match.group("fence"))
+                fence = re.compile(
+                    rb"^ {0,3}`{%d,}[ \t]*\r?$" % ticks, re.MULTILINE
+                )
+                position = match.end()
+                continue
+
+            start = match.start()
+            line_start = buffer.rfind(b"\n", 0, start) + 1
+            if _in_code_span(buffer[line_start:start]):
+                position = match.end()
+                continue
+            close = buffer.find(b"}}", match.end())
+            if close == -1:
+                if eof:
+                    raise ValueError(
+                        f"Unterminated {{{{var|...}}}} at byte {base + start}"
+                    )
+                position = start  # wait for the rest of this var
+                break
+            line += buffer.count(b"\n", counted, start)
+            counted = start
+            body = buffer[match.end() : close].decode("utf-8")
+            yield _parse_var(body, base + start, base + close + 2, line)
+            position = close + 2
+
+        # Keep the unscanned tail from the start of its line; `resume` skips
+        # what was already scanned on that line.
+        cut = buffer.rfind(b"\n", 0, position) + 1
+        line += buffer.count(b"\n", counted, cut)
+        buffer = buffer[cut:]
+        base += cut
+        resume = position - cut
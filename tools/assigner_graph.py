@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+
+from tools.protocol import AssignerSpec
+
+
+class AssignerGraph:
+    """Dependency graph between assigners, derived from their declared fields.
+
+    Everything an edit needs is compiled once, when the graph is built: the
+    reverse index from a field to the assigners reading it, a topological
+    order, and for every field the set of assigners an edit of it triggers,
+    as a bitset over that order (bit `i` is `topological_order()[i]`). A
+    field's closure follows `auto` and `auto_first` assigners and stops at
+    `manual` ones, like the platform does; resolving an edit is then a few
+    bitwise ORs plus one pass over the bits that are set. Closures that must
+    also stop at some assigners (`auto_first` ones that already ran) are
+    compiled on first use of that set and kept, least recently used first
+    out, for the next sessions reaching the same state. A graph can be
+    shared by sessions on different threads.
+
+    Two assigners writing the same field, and dependency cycles, are
+    rejected with a `ValueError` naming the assigners involved.
+    """
+
+    # Distinct non-empty `skip` sets whose closures are kept, besides the
+    # empty one; sessions of one protocol tend to share a handful (e.g.
+    # every `auto_first` assigner ran).
+    MAX_CACHED_CLOSURES = 8
+
+    def __init__(self, specs: Iterable[AssignerSpec]):
+        self.specs: dict[str, AssignerSpec] = {}
+        self.writer: dict[str, str] = {}
+        self.readers: dict[str, list[str]] = {}
+
+        for spec in specs:
+            if spec.name in self.specs:
+                raise ValueError(f"Duplicate assigner name: {spec.name}")
+            self.specs[spec.name] = spec
+            for field in spec.assigned_fields:
+                if field in self.writer:
+                    raise ValueError(
+                        f"Field {field} is assigned by both {self.writer[field]} and {spec.name}."
+                    )
+                self.writer[field] = spec.name
+            for field in spec.dependent_fields:
+                self.readers.setdefault(field, []).append(spec.name)
+
+        self.upstream: dict[str, set[str]] = {
+            name: {
+                self.writer[field]
+                for field in spec.dependent_fields
+                if field in self.writer
+            }
+            for name, spec in self.specs.items()
+        }
+        self._levels = self._compute_levels()
+        self._order = self.topological_order()
+        self.order: dict[str, int] = {
+            spec.name: index for index, spec in enumerate(self._order)
+        }
+        self._base_closures = self._compute_closures()
+        self._closures: OrderedDict[int, dict[str, int]] = OrderedDict()
+        self._closures_lock = threading.Lock()
+
+    def _compute_levels(self) -> list[list[AssignerSpec]]:
+        # Kahn's algorithm, iteratively: chains of thousands of assigners
+        # must not hit the recursion limit.
+        downstream: dict[str, list[str]] = {name: [] for name in self.specs}
+        waiting = {name: len(upstream) for name, upstream in self.upstream.items()}
+        for name, upstream in self.upstream.items():
+            for up in upstream:
+                downstream[up].append(name)
+
+        level_of: dict[str, int] = {}
+        ready = [name for name, count in waiting.items() if count == 0]
+        for name in ready:
+            level_of[name] = 0
+        while ready:
+            name = ready.pop()
+            for down in downstream[name]:
+                level_of[down] = max(level_of.get(down, 0), level_of[name] + 1)
+                waiting[down] -= 1
+                if waiting[down] == 0:
+                    ready.append(down)
+        if any(waiting.values()):
+            cycle = " -> ".join(self._find_cycle(waiting))
+            raise ValueError(f"Assigner dependency cycle: {cycle}")
+
+        depth = max(level_of.values(), default=-1) + 1
+        levels: list[list[AssignerSpec]] = [[] for _ in range(depth)]
+        for name in self.specs:
+            levels[level_of[name]].append(self.specs[name])
+        return levels
+
+    def _find_cycle(self, waiting: dict[str, int]) -> list[str]:
+        # Every assigner left waiting has an upstream assigner that is waiting
+        # too; walking upstream must eventually revisit one.
+        name = next(name for name, count in waiting.items() if count)
+        path: list[str] = []
+        seen: dict[str, int] = {}
+        while name not in seen:
+            seen[name] = len(path)
+            path.append(name)
+            name = next(up for up in sorted(self.upstream[name]) if waiting[up])
+        cycle = path[seen[name] :] + [name]
+        return cycle[::-1]
+
+    def _compute_closures(self, skip: int = 0) -> dict[str, int]:
+        """Bitset of the assigners an edit of each field triggers."""
+        # In reverse topological order, so that the readers of an assigner's
+        # outputs already know their own closure. Manual and skipped
+        # assigners reach nothing.
+        reach = [0] * len(self._order)
+        for index in range(len(self._order) - 1, -1, -1):
+            spec = self._order[index]
+            if spec.mode == "manual" or skip >> index & 1:
+                continue
+            bits = 1 << index
+            for field in spec.assigned_fields:
+                bits |= self._readers_reach(field, reach)
+            reach[index] = bits
+        return {field: self._readers_reach(field, reach) for field in self.readers}
+
+    def _readers_reach(self, field: str, reach: list[int]) -> int:
+        bits = 0
+        for name in self.readers.get(field, ()):
+            bits |= reach[self.order[name]]
+        return bits
+
+    def levels(self) -> list[list[AssignerSpec]]:
+        """Assigners grouped so that each group only depends on earlier groups."""
+        return self._levels
+
+    def topological_order(self) -> list[AssignerSpec]:
+        return [spec for level in self._levels for spec in level]
+
+    def mask(self, names: Iterable[str]) -> int:
+        """Bitset of the named assigners."""
+        bits = 0
+        for name in names:
+            bits |= 1 << self.order[name]
+        return bits
+
+    def specs_of(self, bits: int) -> Iterator[AssignerSpec]:
+        """The assigners of a bitset, in topological order."""
+        # Scanning the binary digits stays linear in the graph size; peeling
+        # off the lowest bit would copy a 10k-bit integer per assigner.
+        digits = bin(bits)[:1:-1]
+        index = digits.find("1")
+        while index != -1:
+            yield self._order[index]
+            index = digits.find("1", index + 1)
+
+    def triggered(self, fields: Iterable[str], skip: int = 0) -> list[AssignerSpec]:
+        """Assigners an edit of `fields` triggers, in topological order.
+
+        `auto` and `auto_first` assigners are followed, `manual` ones are
+        neither returned nor expanded, and neither are the assigners in the
+        `skip` bitset (e.g. `auto_first` assigners that already ran).
+        """
+        closures = self._closures_for(skip)
+        bits = 0
+        for field in fields:
+            bits |= closures.get(field, 0)
+        return list(self.specs_of(bits))
+
+    def _closures_for(self, skip: int) -> dict[str, int]:
+        if not skip:
+            return self._base_closures
+        with self._closures_lock:
+            closures = self._closures.get(skip)
+            if closures is not None:
+                self._closures.move_to_end(skip)
+                return closures
+        # Compiled outside the lock; two threads racing on a new `skip` set
+        # compute the same closures and one result wins.
+        closures = self._compute_closures(skip)
+        with self._closures_lock:
+            self._closures[skip] = closures
+            self._closures.move_to_end(skip)
+            while len(self._closures) > self.MAX_CACHED_CLOSURES:
+                self._closures.popitem(last=False)
+        return closures
+
+    def downstream(
+        self,
+        fields: Iterable[str],
+        follow: Callable[[AssignerSpec], bool] = lambda spec: True,
+    ) -> list[AssignerSpec]:
+        """Assigners transitively reachable from `fields`, in topological order.
+
+        Traversal does not continue past assigners for which `follow` is false;
+        those assigners are neither returned nor expanded. `triggered` answers
+        the common case from the precomputed closures.
+        """
+        reached: set[str] = set()
+        pending = list(fields)
+        while pending:
+            for name in self.readers.get(pending.pop(), ()):
+                if name in reached or not follow(self.specs[name]):
+                    continue
+                reached.add(name)
+                pending.extend(self.specs[name].assigned_fields)
+        return sorted(
+            (self.specs[name] for name in reached),
+            key=lambda spec: self.order[spec.name],
+        )
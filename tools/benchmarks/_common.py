@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+MULTI_LEVEL_PROTOCOL = REPO_ROOT / "tests" / "test_multi_level_assigner" / "protocol"
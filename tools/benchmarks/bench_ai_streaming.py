@@ -0,0 +1,119 @@
+"""Time to first visible `ai_description` text, blocking vs. streamed completion.
+
+The stub answers `stream: true` requests with server-sent events: the first
+token after `--completion-latency`, then one word every `--token-latency`.
+Without streaming nothing is visible until the whole completion has arrived.
+
+    python -m tools.benchmarks.bench_ai_streaming --calls 20 --tokens 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from tools.benchmarks.bench_async_image import make_aimd
+from tools.cli import percentile, print_table
+from tools.stubs import StubServer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=10)
+    parser.add_argument("--images", type=int, default=4)
+    parser.add_argument("--tokens", type=int, default=100, help="Filler words per description.")
+    parser.add_argument("--completion-latency", type=float, default=0.3)
+    parser.add_argument("--token-latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with StubServer(
+        completion_latency=args.completion_latency,
+        token_latency=args.token_latency,
+        extra_tokens=args.tokens,
+    ) as stub:
+        stub.install_env()
+        from tools import aimd_image
+
+        fields = {
+            "aimd_content": make_aimd(args.images),
+            "qwen_api_key": "stub",
+            "model": "qwen3-vl-flash",
+        }
+        _, image_urls = aimd_image.extract_image_data(fields["aimd_content"])
+
+        def blocking() -> tuple[str, float, float, int]:
+            started = time.perf_counter()
+            text = aimd_image.build_ai_description(
+                fields["aimd_content"], image_urls, api_key="stub", base_url=stub.openai_base_url
+            )
+            total = time.perf_counter() - started
+            return text, total, total, 1
+
+        def streamed() -> tuple[str, float, float, int]:
+            partials = []
+            text, timings = aimd_image.stream_ai_description(
+                fields["aimd_content"],
+                image_urls,
+                api_key="stub",
+                base_url=stub.openai_base_url,
+                on_partial=partials.append,
+            )
+            return text, timings["first_token"], timings["total"], len(partials)
+
+        def assigner() -> tuple[str, float, float, int]:
+            partials = []
+            result, timings = aimd_image.extract_and_describe_streaming(
+                fields, partials.append, base_url=stub.openai_base_url
+            )
+            if not result.success:
+                raise SystemExit(result.error_message)
+            published = [partial["ai_description"] for partial in partials if "ai_description" in partial]
+            if published[-1].strip() != result.assigned_fields["ai_description"]:
+                raise SystemExit("last partial ai_description differs from the committed value")
+            return (
+                result.assigned_fields["ai_description"],
+                timings["first_token"],
+                timings["total"],
+                len(published),
+            )
+
+        rows = []
+        expected = None
+        for label, call in (
+            ("build_ai_description", blocking),
+            ("stream_ai_description", streamed),
+            ("extract_and_describe_streaming", assigner),
+        ):
+            runs = [call() for _ in range(args.calls)]
+            texts = {text for text, *_ in runs}
+            if expected is None:
+                (expected,) = texts
+            if texts != {expected}:
+                raise SystemExit(f"{label}: final description differs from the blocking one")
+            first = [run[1] * 1e3 for run in runs]
+            total = [run[2] * 1e3 for run in runs]
+            rows.append(
+                [
+                    label,
+                    runs[0][3],
+                    f"{statistics.median(first):.1f}",
+                    f"{percentile(first, 0.95):.1f}",
+                    f"{statistics.median(total):.1f}",
+                    f"{percentile(total, 0.95):.1f}",
+                ]
+            )
+        aimd_image.OPENAI_CLIENTS.close()
+
+    print(
+        f"{args.calls} calls each, {len(expected.split())} words per description, "
+        f"first token after {args.completion_latency:g} s, then {args.token_latency * 1e3:g} ms per word"
+    )
+    print_table(
+        ["path", "updates", "first_text_p50_ms", "first_text_p95_ms", "total_p50_ms", "total_p95_ms"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
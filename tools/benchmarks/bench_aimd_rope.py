@@ -0,0 +1,132 @@
+"""Latency and memory of chaining `test_aimd_multi_hop_image` hops: strings vs. `AimdRope`.
+
+Hop 1 assembles two fresh upstream fields; every later hop takes the previous
+hop's `downstream_aimd` as `upstream_aimd_1` and a fresh field as
+`upstream_aimd_2`, and the image IDs of each downstream value are extracted
+(as `test_aimd_image` would). All hop outputs stay alive, as they would in a
+record. Timings come from a first pass, memory from a second one under
+`tracemalloc`.
+
+    python -m tools.benchmarks.bench_aimd_rope --hops 5 --field-mb 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import random
+import time
+import tracemalloc
+
+from airalogy.markdown import get_airalogy_image_ids
+
+from tools.aimd_rope import AimdRope
+from tools.benchmarks._common import REPO_ROOT
+from tools.cli import print_table
+from tools.protocol import load_assigner_module
+
+
+MULTI_HOP_PROTOCOL = REPO_ROOT / "tests" / "test_aimd_multi_hop_image" / "protocol"
+
+
+def synthetic_field(size: int, seed: int) -> str:
+    """An image-heavy notebook of about `size` characters."""
+    rng = random.Random(seed)
+    words = "sample buffer incubate plate reading colony stain lysate spin".split()
+    parts = []
+    length = 0
+    step = 0
+    while length < size:
+        text = " ".join(rng.choices(words, k=rng.randrange(150, 350)))
+        image = f"airalogy.id.file.{seed:04d}{step:06d}-0000-0000-0000-000000000000.png"
+        part = f"\n## Step {step}\n\n{text}\n\n![Step {step}]({image})\n"
+        parts.append(part)
+        length += len(part)
+        step += 1
+    return f"  # Notebook {seed}\n{''.join(parts)}\n\n"
+
+
+def run_strings(module, fields: list[str]) -> tuple[list[str], list[list[str]]]:
+    outputs, ids = [], []
+    upstream = fields[0]
+    for fresh in fields[1:]:
+        downstream = module.build_downstream_aimd(
+            {"upstream_aimd_1": upstream, "upstream_aimd_2": fresh}
+        )
+        outputs.append(downstream)
+        ids.append(get_airalogy_image_ids(downstream))
+        upstream = downstream
+    return outputs, ids
+
+
+def run_ropes(module, fields: list[str]) -> tuple[list[AimdRope], list[list[str]]]:
+    outputs, ids = [], []
+    upstream = AimdRope.of(fields[0])
+    for fresh in fields[1:]:
+        downstream = AimdRope.concat(
+            *module.downstream_aimd_parts(
+                {"upstream_aimd_1": upstream, "upstream_aimd_2": AimdRope.of(fresh)}
+            )
+        )
+        outputs.append(downstream)
+        ids.append(downstream.image_ids())
+        upstream = downstream
+    return outputs, ids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hops", type=int, default=5)
+    parser.add_argument("--field-mb", type=float, default=5.0)
+    args = parser.parse_args()
+
+    module, _ = load_assigner_module(MULTI_HOP_PROTOCOL)
+    size = int(args.field_mb * 1e6)
+    fields = [synthetic_field(size, seed) for seed in range(args.hops + 1)]
+
+    started = time.perf_counter()
+    strings, string_ids = run_strings(module, fields)
+    string_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    ropes, rope_ids = run_ropes(module, fields)
+    rope_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rendered = str(ropes[-1])
+    render_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    ropes[-1].write(io.StringIO())
+    persist_seconds = time.perf_counter() - started
+
+    if rope_ids != string_ids or rendered != strings[-1]:
+        raise SystemExit("rope and string results differ")
+    if any(str(rope) != string for rope, string in zip(ropes, strings)):
+        raise SystemExit("rope and string results differ")
+    del strings, ropes, rendered
+
+    rows = []
+    for label, run, seconds in (
+        ("str (build_downstream_aimd)", run_strings, string_seconds),
+        ("AimdRope", run_ropes, rope_seconds),
+    ):
+        tracemalloc.start()
+        outputs = run(module, fields)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del outputs
+        rows.append([label, f"{seconds * 1e3:.0f}", f"{retained / 1e6:.1f}", f"{peak / 1e6:.1f}"])
+
+    print(
+        f"{args.hops} hops, {args.field_mb:g} MB per fresh field, "
+        f"{len(string_ids[-1])} images in the last downstream value"
+    )
+    print_table(["path", "all_hops_ms", "retained_mb", "peak_mb"], rows)
+    print(
+        f"materializing the last rope: str() {render_seconds * 1e3:.0f} ms, "
+        f"streamed write {persist_seconds * 1e3:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
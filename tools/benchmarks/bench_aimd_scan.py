@@ -0,0 +1,160 @@
+"""Throughput of `tools.aimd_scan.scan_vars` vs. `airalogy.markdown.extract_vars`.
+
+A synthetic AIMD document of `--size-mb` megabytes is generated from sections
+modeled on the fixtures: scalar vars with defaults and `ge`/`le` kwargs,
+Mermaid diagrams, fenced ```` ```aimd ```` examples (whose vars must be
+skipped) and multi-line var tables with `subvars=[var(...)]`. Both parsers
+must report the same vars.
+
+    python -m tools.benchmarks.bench_aimd_scan
+    python -m tools.benchmarks.bench_aimd_scan --size-mb 50 --skip-reference
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from tools.aimd_scan import scan_vars
+from tools.cli import print_table
+
+
+_SECTION = '''## Section {i}
+
+- `s{i}_a`: {{{{var|s{i}_a: int = {i}, ge=0, le=1000000, description="Line {i} input"}}}}
+- `s{i}_b`: {{{{var|s{i}_b: float, description="auto: s{i}_b = s{i}_a / 2"}}}}
+- `s{i}_c`: {{{{var|s{i}_c: str = "value, with = signs", title="C {i}"}}}}
+
+```mermaid
+flowchart LR
+  s{i}_a --> s{i}_b
+  s{i}_b --> s{i}_c
+```
+
+Inline code such as `{{{{var|not_a_var_{i}}}}}` is not a declaration.
+
+```aimd
+{{{{var|example_{i}: str = "skipped"}}}}
+```
+
+{{{{var|table_{i}: list[Row{i}],
+    title="Table {i}",
+    subvars=[
+        var(
+            name: str = "ZHANG San",
+            title="Name",
+            max_length=50
+        ),
+        var(
+            age: int = 18,
+            ge=0
+        ),
+        enrolled: bool = True
+    ]
+}}}}
+
+{filler}
+
+'''
+
+_FILLER = (
+    "Plain protocol text between fields, describing the procedure in enough "
+    "detail that the document is mostly prose, as real protocols are. "
+) * 6
+
+
+def synthetic_aimd(size_bytes: int) -> bytes:
+    parts = []
+    total = 0
+    i = 0
+    while total < size_bytes:
+        part = _SECTION.format(i=i, filler=_FILLER).encode()
+        parts.append(part)
+        total += len(part)
+        i += 1
+    return b"".join(parts)
+
+
+def _normalize(var: dict) -> dict:
+    result = {
+        key: var[key]
+        for key in ("name", "type_annotation", "default_value", "kwargs")
+        if key in var
+    }
+    if var.get("subvars"):
+        result["subvars"] = [_normalize(subvar) for subvar in var["subvars"]]
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=10)
+    parser.add_argument(
+        "--skip-reference",
+        action="store_true",
+        help="Do not run extract_vars (for sizes it cannot handle in memory).",
+    )
+    args = parser.parse_args()
+
+    data = synthetic_aimd(int(args.size_mb * 1024 * 1024))
+    size_mb = len(data) / 1024 / 1024
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "protocol.aimd"
+        path.write_bytes(data)
+
+        def run_file():
+            return list(scan_vars(path))
+
+        def run_mmap():
+            with open(path, "rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapped:
+                return list(scan_vars(mapped))
+
+        def run_reference():
+            from airalogy.markdown import extract_vars
+
+            return extract_vars(path.read_text(encoding="utf-8"))["vars"]
+
+        runs = [("scan_vars (file)", run_file), ("scan_vars (mmap)", run_mmap)]
+        if not args.skip_reference:
+            runs.append(("extract_vars", run_reference))
+
+        results = {}
+        for label, run in runs:
+            started = time.perf_counter()
+            results[label] = run()
+            elapsed = time.perf_counter() - started
+            # Measured on a second run: tracing slows Python-level code down
+            # far more than the C parts of either parser.
+            tracemalloc.start()
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            rows.append(
+                [
+                    label,
+                    len(results[label]),
+                    f"{elapsed:.2f}",
+                    f"{size_mb / elapsed:.1f}",
+                    f"{peak / 1024 / 1024:.1f}",
+                ]
+            )
+
+    if "extract_vars" in results:
+        expected = [_normalize(var) for var in results["extract_vars"]]
+        scanned = [_normalize(var.to_dict()) for var in results["scan_vars (file)"]]
+        if scanned != expected:
+            raise SystemExit("scan_vars and extract_vars disagree")
+
+    print(f"document: {size_mb:.1f} MB")
+    print_table(["parser", "vars", "seconds", "MB/s", "peak MB"], rows)
+
+
+if __name__ == "__main__":
+    main()
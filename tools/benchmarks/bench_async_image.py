@@ -0,0 +1,99 @@
+"""Sequential vs. asyncio image-description path of `test_aimd_image`, against local stubs.
+
+    python -m tools.benchmarks.bench_async_image --images 20 --file-url-latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from tools.cli import print_table
+from tools.stubs import StubServer
+
+
+def make_aimd(images: int) -> str:
+    lines = ["# Image notebook", ""]
+    for i in range(images):
+        file_id = f"airalogy.id.file.{i:08d}-0000-0000-0000-000000000000.png"
+        lines.append(f"Step {i}: ![Image {i}]({file_id})")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--file-url-latency", type=float, default=0.05)
+    parser.add_argument("--completion-latency", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    with StubServer(
+        file_url_latency=args.file_url_latency,
+        completion_latency=args.completion_latency,
+    ) as stub:
+        stub.install_env()
+        from tools import aimd_image
+
+        fields = {
+            "aimd_content": make_aimd(args.images),
+            "qwen_api_key": "stub",
+            "model": "qwen3-vl-flash",
+        }
+
+        # Both paths import `openai` lazily; pay that once, outside either timing.
+        import openai  # noqa: F401
+
+        started = time.perf_counter()
+        image_ids, image_urls = aimd_image.extract_image_data(fields["aimd_content"])
+        resolved = time.perf_counter()
+        sync_description = aimd_image.build_ai_description(
+            fields["aimd_content"],
+            image_urls,
+            api_key="stub",
+            base_url=stub.openai_base_url,
+        )
+        finished = time.perf_counter()
+        sync_timings = {
+            "resolve_urls": resolved - started,
+            "completion": finished - resolved,
+            "total": finished - started,
+        }
+
+        # Start the async path cold as well, rather than from the URLs the
+        # sequential path just cached.
+        aimd_image.FILE_URL_CACHE = aimd_image.FileUrlCache()
+        aimd_image.IMAGE_ID_CACHE = aimd_image.ImageIdCache()
+        result, async_timings = asyncio.run(
+            aimd_image.extract_and_describe_async(
+                fields,
+                base_url=stub.openai_base_url,
+                max_concurrency=args.concurrency,
+            )
+        )
+
+    if not result.success:
+        raise SystemExit(result.error_message)
+    if (
+        result.assigned_fields["image_urls"] != image_urls
+        or result.assigned_fields["ai_description"] != sync_description
+    ):
+        raise SystemExit("Sequential and async paths returned different results.")
+
+    print(f"{len(image_ids)} images, stub requests: {stub.counts}")
+    print_table(
+        ["path", "resolve_urls_s", "completion_s", "total_s"],
+        [
+            [label]
+            + [f"{timings[key]:.3f}" for key in ("resolve_urls", "completion", "total")]
+            for label, timings in (
+                ("sequential", sync_timings),
+                ("async", async_timings),
+            )
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
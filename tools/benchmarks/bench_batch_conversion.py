@@ -0,0 +1,80 @@
+"""Docs/second of `convert_batch` (test_markdown_conversion) versus process-pool size.
+
+Builds a local corpus of generated DOCX and PDF files, serves it from
+`StubServer` as Airalogy files, and converts the whole corpus per worker count.
+
+    python -m tools.benchmarks.bench_batch_conversion --docs 40 --workers 1 2 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+from tools.cli import print_table
+from tools.documents import make_docx, make_pdf, paragraphs, pdf_pages
+from tools.stubs import StubServer
+
+
+def build_corpus(docs: int, pdf_page_count: int) -> dict[str, bytes]:
+    corpus = {}
+    for i in range(docs):
+        if i % 2:
+            corpus[f"airalogy.id.file.{i:08d}-0000-0000-0000-000000000000.docx"] = (
+                make_docx(paragraphs(40, seed=i), title=f"Report {i}")
+            )
+        else:
+            corpus[f"airalogy.id.file.{i:08d}-0000-0000-0000-000000000000.pdf"] = (
+                make_pdf(pdf_pages(pdf_page_count, seed=i))
+            )
+    return corpus
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=40)
+    parser.add_argument("--pdf-pages", type=int, default=5)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1]
+    )
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.docs, args.pdf_pages)
+    with StubServer() as stub:
+        stub.files.update(corpus)
+        stub.install_env()
+        from tools import markdown_conversion
+
+        rows = []
+        for workers in sorted(set(args.workers)):
+            started = time.perf_counter()
+            first_result = None
+            outcomes = []
+            for outcome in markdown_conversion.convert_batch(corpus, max_workers=workers):
+                if first_result is None:
+                    first_result = time.perf_counter() - started
+                outcomes.append(outcome)
+            elapsed = time.perf_counter() - started
+            summary = markdown_conversion.summarize_batch(outcomes)
+            if summary["failed"]:
+                raise SystemExit(f"Conversions failed: {summary['failed']}")
+            rows.append(
+                [
+                    workers,
+                    f"{elapsed:.2f}",
+                    f"{len(outcomes) / elapsed:.1f}",
+                    f"{first_result:.2f}",
+                    summary["markdown_chars"],
+                ]
+            )
+
+    total_mb = sum(len(data) for data in corpus.values()) / 1e6
+    print(f"{len(corpus)} documents, {total_mb:.1f} MB")
+    print_table(
+        ["workers", "seconds", "docs_per_s", "first_result_s", "chars"], rows
+    )
+
+
+if __name__ == "__main__":
+    main()
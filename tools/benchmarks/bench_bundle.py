@@ -0,0 +1,122 @@
+"""Protocol load time from sources vs. from a precompiled bundle.
+
+Cold: every protocol in `tests/` and `examples/` is loaded once in a fresh
+interpreter (after `airalogy` is imported). Warm: the same load repeated
+in-process. "source" reads `protocol.toml`, parses `protocol.aimd` and imports
+`assigner.py`; "bundle" reads `__pycache__/protocol.bundle` (built up front) and
+executes the bundled assigner code.
+
+    python -m tools.benchmarks.bench_bundle
+    python -m tools.benchmarks.bench_bundle --repeat 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from tools.benchmarks._common import REPO_ROOT
+from tools.benchmarks.bench_import_time import protocol_dirs
+from tools.bundle import build_bundle, load_bundle
+from tools.cli import print_table
+from tools.protocol import load_assigner_module, load_defaults, load_metadata
+
+
+_CHILD_SCRIPT = """
+import sys, time
+import tools.bundle, tools.protocol
+import airalogy.markdown
+started = time.perf_counter()
+if sys.argv[2] == "bundle":
+    bundle = tools.bundle.load_bundle(sys.argv[1])
+    bundle.defaults()
+    bundle.load_assigners()
+else:
+    tools.protocol.load_metadata(sys.argv[1])
+    tools.protocol.load_defaults(sys.argv[1])
+    tools.protocol.load_assigner_module(sys.argv[1])
+print((time.perf_counter() - started) * 1e3)
+"""
+
+
+def load_source(protocol_dir: Path) -> None:
+    load_metadata(protocol_dir)
+    load_defaults(protocol_dir)
+    load_assigner_module(protocol_dir)
+
+
+def load_bundled(protocol_dir: Path) -> None:
+    bundle = load_bundle(protocol_dir)
+    bundle.defaults()
+    bundle.load_assigners()
+
+
+def cold_ms(protocol_dir: Path, path: str, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-c", _CHILD_SCRIPT, str(protocol_dir), path],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        samples.append(float(completed.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def warm_ms(protocol_dir: Path, load, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        load(protocol_dir)
+        samples.append((time.perf_counter() - started) * 1e3)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cold-runs", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = []
+    totals = [0.0, 0.0, 0.0, 0.0]
+    for protocol_dir in protocol_dirs():
+        build_bundle(protocol_dir)
+        timings = (
+            cold_ms(protocol_dir, "source", args.cold_runs),
+            cold_ms(protocol_dir, "bundle", args.cold_runs),
+            warm_ms(protocol_dir, load_source, args.repeat),
+            warm_ms(protocol_dir, load_bundled, args.repeat),
+        )
+        totals = [total + value for total, value in zip(totals, timings)]
+        rows.append(
+            [str(protocol_dir.relative_to(REPO_ROOT))]
+            + [f"{value:.2f}" for value in timings]
+            + [f"{timings[0] / timings[1]:.1f}x"]
+        )
+    rows.append(
+        ["total"]
+        + [f"{value:.2f}" for value in totals]
+        + [f"{totals[0] / totals[1]:.1f}x"]
+    )
+    print_table(
+        [
+            "protocol",
+            "cold source ms",
+            "cold bundle ms",
+            "warm source ms",
+            "warm bundle ms",
+            "cold speedup",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
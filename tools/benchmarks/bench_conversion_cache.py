@@ -0,0 +1,70 @@
+"""Cold vs. cached conversion of re-uploaded documents in `test_markdown_conversion`.
+
+Every document is uploaded twice under different file IDs; the second upload
+has identical bytes and should be served from the content-addressed cache.
+
+    python -m tools.benchmarks.bench_conversion_cache --docs 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from tools.cli import print_table
+from tools.documents import make_docx, make_pdf, paragraphs, pdf_pages
+from tools.stubs import StubServer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=10)
+    parser.add_argument("--pdf-pages", type=int, default=5)
+    args = parser.parse_args()
+
+    originals, reuploads = {}, {}
+    for i in range(args.docs):
+        if i % 2:
+            data, suffix = make_docx(paragraphs(40, seed=i)), "docx"
+        else:
+            data, suffix = make_pdf(pdf_pages(args.pdf_pages, seed=i)), "pdf"
+        stem = f"airalogy.id.file.{i:08d}-0000-0000-0000-00000000000"
+        originals[f"{stem}a.{suffix}"] = data
+        reuploads[f"{stem}b.{suffix}"] = data
+
+    with tempfile.TemporaryDirectory() as cache_dir, StubServer() as stub:
+        stub.files.update(originals)
+        stub.files.update(reuploads)
+        stub.install_env()
+        os.environ["MARKDOWN_CONVERSION_CACHE_DIR"] = cache_dir
+        from tools import markdown_conversion
+
+        # Import markitdown up front so the first conversion is not penalized.
+        markdown_conversion.convert_file(next(iter(originals)))
+        markdown_conversion.CONVERSION_CACHE.prune(0)
+
+        rows = []
+        texts = {}
+        for label, uploads in (("first upload", originals), ("re-upload", reuploads)):
+            started = time.perf_counter()
+            for file_id in uploads:
+                texts.setdefault(label, []).append(markdown_conversion.convert_file(file_id)[0])
+            elapsed = time.perf_counter() - started
+            per_doc_ms = elapsed / len(uploads) * 1e3
+            rows.append([label, f"{elapsed:.3f}", f"{per_doc_ms:.1f}"])
+        cache = markdown_conversion.CONVERSION_CACHE
+        cache_bytes = cache.size_bytes()
+
+    if texts["first upload"] != texts["re-upload"]:
+        raise SystemExit("Cached conversions differ from fresh ones.")
+    print(
+        f"{args.docs} documents; cache hits={cache.hits} misses={cache.misses} "
+        f"size={cache_bytes} bytes"
+    )
+    print_table(["pass", "seconds", "ms_per_doc"], rows)
+
+
+if __name__ == "__main__":
+    main()
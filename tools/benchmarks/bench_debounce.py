@@ -0,0 +1,122 @@
+"""Assigner executions for recorded keystroke sequences, with and without debouncing.
+
+Each keystroke of a sequence is an edit of the whole field value (typing
+`1234` into `a1` edits it to 1, 12, 123 and 1234). Timelines are replayed in
+virtual time through `DebouncedTriggerQueue` for several windows; window 0
+applies every keystroke immediately, as today. Final values must match.
+
+    python -m tools.benchmarks.bench_debounce
+    python -m tools.benchmarks.bench_debounce --window 0.2 --window 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from tools.assigner_graph import AssignerGraph
+from tools.benchmarks._common import MULTI_LEVEL_PROTOCOL
+from tools.cli import print_table
+from tools.debounce import DebouncedTriggerQueue
+from tools.incremental import IncrementalSession
+from tools.protocol import load_assigners, load_defaults
+
+
+def typing(field: str, text: str, start: float, interval: float = 0.12) -> list[tuple[float, dict]]:
+    """Keystrokes typing `text` into an int field, one prefix per keystroke."""
+    return [
+        (start + i * interval, {field: int(text[: i + 1])}) for i in range(len(text))
+    ]
+
+
+def correction(field: str, typed: str, fixed: str, start: float) -> list[tuple[float, dict]]:
+    """Type `typed`, backspace it to the common prefix, then type `fixed`."""
+    events = typing(field, typed, start)
+    at = events[-1][0]
+    common = 0
+    while common < min(len(typed), len(fixed)) and typed[common] == fixed[common]:
+        common += 1
+    for length in range(len(typed) - 1, common - 1, -1):
+        at += 0.09
+        if length:
+            events.append((at, {field: int(typed[:length])}))
+    for length in range(max(common, 1), len(fixed) + 1):
+        at += 0.12
+        events.append((at, {field: int(fixed[:length])}))
+    return events
+
+
+TIMELINES = {
+    # Line A: `1234` into a1, a pause, then `56` into a2.
+    "line A": typing("a1", "1234", 0.0) + typing("a2", "56", 2.0),
+    # Line F: f1 and f2 both feed f6 (and f15); tabbing quickly between them.
+    "line F": typing("f1", "42", 0.0) + typing("f2", "17", 0.35) + correction("f4", "250", "205", 2.0),
+    # Line G: g2 and g3 feed shared stage-1 assigners; g1 typed with a typo.
+    "line G": correction("g1", "129", "12", 0.0) + typing("g2", "33", 1.5) + typing("g3", "8", 1.8),
+}
+
+
+def replay(
+    graph: AssignerGraph,
+    defaults: dict,
+    timeline: list[tuple[float, dict]],
+    window: float,
+) -> tuple[IncrementalSession, int, int]:
+    session = IncrementalSession(graph, defaults)
+    session.initialize()
+    queue = DebouncedTriggerQueue(session, window, clock=lambda: 0.0)
+    runs = cascades = 0
+
+    def settle(until: float | None) -> None:
+        nonlocal runs, cascades
+        while (deadline := queue.next_deadline()) is not None and (
+            until is None or deadline <= until
+        ):
+            report = queue.poll(now=deadline)
+            runs += len(report.ran)
+            cascades += 1
+
+    for at, edit in sorted(timeline, key=lambda event: event[0]):
+        settle(at)
+        queue.edit(edit, now=at)
+    settle(None)
+    return session, runs, cascades
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--protocol", default=str(MULTI_LEVEL_PROTOCOL))
+    parser.add_argument(
+        "--window", type=float, action="append", dest="windows", help="Debounce window in seconds."
+    )
+    args = parser.parse_args()
+
+    graph = AssignerGraph(load_assigners(args.protocol))
+    defaults = load_defaults(args.protocol)
+    defaults.update(b4=0, h6=0, h7=0, h8=0)
+
+    rows = []
+    for label, timeline in TIMELINES.items():
+        baseline = None
+        for window in [0.0] + (args.windows or [0.15, 0.3, 0.6]):
+            session, runs, cascades = replay(graph, defaults, timeline, window)
+            if baseline is None:
+                baseline = (session.values, runs)
+            elif session.values != baseline[0]:
+                raise SystemExit(f"{label}: final values differ with window {window}")
+            rows.append(
+                [
+                    label,
+                    len(timeline),
+                    f"{window:.2f}",
+                    cascades,
+                    runs,
+                    f"{1 - runs / baseline[1]:.0%}" if baseline[1] else "-",
+                ]
+            )
+    print_table(
+        ["timeline", "keystrokes", "window_s", "cascades", "assigner runs", "saved"], rows
+    )
+
+
+if __name__ == "__main__":
+    main()
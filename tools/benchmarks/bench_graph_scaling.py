@@ -0,0 +1,132 @@
+"""Trigger resolution cost vs. protocol size: declaration scan, graph traversal and precomputed bitsets.
+
+Synthetic protocols have one output field per assigner, each reading one to
+three fields (inputs or outputs of recent assigners); 90% are `auto`, 5%
+`auto_first` (half of them already completed) and 5% `manual`. Each edit
+changes one field, and all three strategies must agree on which assigners
+it triggers:
+
+- scan: every propagation step scans all assigner declarations for readers
+  of the dirty fields (what resolving a trigger costs without an index);
+- traverse: reverse index plus traversal and a final sort (`downstream`);
+- bitset: OR of the precompiled per-field closures (`triggered`); the
+  closures for this `skip` set are compiled by the first edit, and that
+  cost is included.
+
+    python -m tools.benchmarks.bench_graph_scaling --sizes 100 1000 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from airalogy.assigner import AssignerResult
+
+from tools.assigner_graph import AssignerGraph
+from tools.cli import print_table
+from tools.protocol import AssignerSpec
+
+
+def _noop(dependent_fields: dict) -> AssignerResult:
+    return AssignerResult(assigned_fields={})
+
+
+def synthetic_specs(size: int, seed: int = 0, window: int = 50) -> tuple[list[AssignerSpec], list[str]]:
+    """Assigners plus the input fields they start from."""
+    rng = random.Random(seed)
+    inputs = [f"in{i}" for i in range(max(1, size // 10))]
+    specs = []
+    for i in range(size):
+        pool = inputs[:5] + [f"out{j}" for j in range(max(0, i - window), i)]
+        mode = rng.choices(["auto", "auto_first", "manual"], weights=[90, 5, 5])[0]
+        reads = rng.sample(pool if i else inputs, k=min(len(pool), rng.randint(1, 3)))
+        if rng.random() < 0.3:
+            reads.append(rng.choice(inputs))
+        specs.append(AssignerSpec(f"a{i}", (f"out{i}",), tuple(dict.fromkeys(reads)), mode, _noop))
+    return specs, inputs
+
+
+def scan(specs: list[AssignerSpec], fields: list[str], completed: set[str]) -> list[str]:
+    reached: list[str] = []
+    seen: set[str] = set()
+    dirty = set(fields)
+    while dirty:
+        next_dirty = set()
+        for spec in specs:
+            if spec.name in seen or dirty.isdisjoint(spec.dependent_fields):
+                continue
+            if spec.mode == "manual" or spec.name in completed:
+                continue
+            seen.add(spec.name)
+            reached.append(spec.name)
+            next_dirty.update(spec.assigned_fields)
+        dirty = next_dirty
+    return reached
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10_000])
+    parser.add_argument("--edits", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        specs, inputs = synthetic_specs(size, args.seed)
+        started = time.perf_counter()
+        graph = AssignerGraph(specs)
+        compile_ms = (time.perf_counter() - started) * 1e3
+
+        rng = random.Random(args.seed)
+        completed = {
+            spec.name for spec in specs if spec.mode == "auto_first" and rng.random() < 0.5
+        }
+        skip = graph.mask(completed)
+
+        def follow(spec: AssignerSpec) -> bool:
+            return spec.mode != "manual" and spec.name not in completed
+
+        fields = inputs + [f"out{i}" for i in range(size)]
+        edits = [[rng.choice(fields)] for _ in range(args.edits)]
+
+        results = {}
+        timings = {}
+        for label, resolve in (
+            ("scan", lambda edit: scan(specs, edit, completed)),
+            ("traverse", lambda edit: [spec.name for spec in graph.downstream(edit, follow)]),
+            ("bitset", lambda edit: [spec.name for spec in graph.triggered(edit, skip)]),
+        ):
+            started = time.perf_counter()
+            results[label] = [resolve(edit) for edit in edits]
+            timings[label] = (time.perf_counter() - started) / len(edits) * 1e6
+        if any(
+            set(cone) != set(expected)
+            for label in ("traverse", "bitset")
+            for cone, expected in zip(results[label], results["scan"])
+        ) or results["bitset"] != results["traverse"]:
+            raise SystemExit(f"{size} assigners: strategies disagree")
+
+        affected = sum(map(len, results["bitset"])) / len(edits)
+        rows.append(
+            [
+                size,
+                f"{compile_ms:.1f}",
+                f"{affected:.1f}",
+                f"{timings['scan']:.1f}",
+                f"{timings['traverse']:.1f}",
+                f"{timings['bitset']:.1f}",
+            ]
+        )
+
+    print(f"{args.edits} single-field edits per size")
+    print_table(
+        ["assigners", "compile_ms", "avg affected", "scan_us", "traverse_us", "bitset_us"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
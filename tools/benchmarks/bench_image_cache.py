@@ -0,0 +1,85 @@
+"""Hit ratios and bytes saved of the `test_aimd_image` caches under replayed traffic.
+
+    python -m tools.benchmarks.bench_image_cache --runs 200 --docs 20 --url-ttl 120
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from tools.cli import print_table
+from tools.stubs import StubServer
+
+
+def make_documents(docs: int, images_per_doc: int, pool: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    documents = []
+    for d in range(docs):
+        lines = [f"# Submission {d}", ""]
+        for i in rng.sample(range(pool), images_per_doc):
+            file_id = f"airalogy.id.file.{i:08d}-0000-0000-0000-000000000000.png"
+            lines.append(f"Observation {i}: ![Image {i}]({file_id})")
+            lines.append("Lorem ipsum " * 20)
+        documents.append("\n".join(lines))
+    return documents
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--images-per-doc", type=int, default=5)
+    parser.add_argument("--image-pool", type=int, default=40)
+    parser.add_argument("--url-ttl", type=float, default=None)
+    parser.add_argument(
+        "--sqlite", action="store_true", help="Back the caches with SQLite."
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    documents = make_documents(
+        args.docs, args.images_per_doc, args.image_pool, args.seed
+    )
+    rng = random.Random(args.seed)
+    # Popular submissions get re-run far more often than the long tail.
+    weights = [1 / (rank + 1) for rank in range(len(documents))]
+    replay = rng.choices(documents, weights=weights, k=args.runs)
+
+    with tempfile.TemporaryDirectory() as tmp, StubServer(url_ttl=args.url_ttl) as stub:
+        stub.install_env()
+        if args.sqlite:
+            os.environ["AIMD_IMAGE_CACHE_DB"] = str(Path(tmp) / "cache.sqlite3")
+        from tools import aimd_image
+
+        started = time.perf_counter()
+        for content in replay:
+            aimd_image.extract_image_data(content)
+        elapsed = time.perf_counter() - started
+
+    stats = aimd_image.cache_stats()
+    print(
+        f"{args.runs} runs over {args.docs} documents in {elapsed:.2f}s; "
+        f"get_file_url requests: {stub.counts.get('get_file_url', 0)}"
+    )
+    print_table(
+        ["cache", "hits", "misses", "hit_ratio", "served_bytes"],
+        [
+            [
+                name,
+                entry["hits"],
+                entry["misses"],
+                f"{entry['hit_ratio']:.3f}",
+                entry["served_bytes"],
+            ]
+            for name, entry in stats.items()
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
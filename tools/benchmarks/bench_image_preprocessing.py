@@ -0,0 +1,148 @@
+"""Bytes sent and latency of `extract_and_describe`: image URLs vs. deduplicated, downscaled data URIs.
+
+The fixture is a generated set of camera-sized JPEG photos, a PNG screenshot
+and a small icon, referenced from an AIMD in which one image ID appears twice
+and two IDs carry byte-identical uploads (as in `test_aimd_multi_hop_image`).
+`StubServer` charges `--image-latency` seconds per MB of image data the
+model reads, whether fetched from a URL or inlined.
+
+    python -m tools.benchmarks.bench_image_preprocessing --calls 5 --max-dimension 768
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import time
+
+from tools.cli import print_table
+from tools.stubs import StubServer
+
+
+def _file_id(index: int, suffix: str) -> str:
+    return f"airalogy.id.file.{index:08d}-0000-0000-0000-000000000000.{suffix}"
+
+
+def make_images(seed: int = 0) -> dict[str, bytes]:
+    """Generated uploads by file ID, including one byte-identical re-upload."""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    images = {}
+    for index in range(3):
+        # Smooth gradient plus sensor-like noise: compresses like a photo.
+        photo = Image.linear_gradient("L").resize((4032, 3024)).convert("RGB")
+        noise = Image.effect_noise((4032, 3024), 24).convert("RGB")
+        photo = Image.blend(photo, noise, 0.3 + 0.1 * index)
+        out = io.BytesIO()
+        photo.save(out, format="JPEG", quality=92)
+        images[_file_id(index, "jpg")] = out.getvalue()
+
+    screenshot = Image.new("RGB", (2560, 1440), "white")
+    draw = ImageDraw.Draw(screenshot)
+    for row in range(0, 1440, 24):
+        draw.rectangle((40, row + 4, 40 + rng.randrange(400, 2400), row + 16), fill="#333")
+    out = io.BytesIO()
+    screenshot.save(out, format="PNG")
+    images[_file_id(3, "png")] = out.getvalue()
+
+    icon = Image.new("RGBA", (256, 256), (0, 0, 0, 0))
+    ImageDraw.Draw(icon).ellipse((16, 16, 240, 240), fill=(30, 120, 200, 255))
+    out = io.BytesIO()
+    icon.save(out, format="PNG")
+    images[_file_id(4, "png")] = out.getvalue()
+
+    # The same photo uploaded a second time gets a new file ID.
+    images[_file_id(5, "jpg")] = images[_file_id(0, "jpg")]
+    return images
+
+
+def make_aimd(file_ids: list[str]) -> str:
+    references = file_ids + [file_ids[0]]  # the first image, referenced again
+    lines = ["# Imaging run", ""]
+    for index, file_id in enumerate(references):
+        lines.append(f"Step {index}: ![Image {index}]({file_id})")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=3)
+    parser.add_argument(
+        "--max-dimension", type=int, action="append", dest="max_dimensions",
+        help="Downscaling bound(s) to compare (default: 2048, 1024, 512).",
+    )
+    parser.add_argument("--image-latency", type=float, default=0.2, help="Stub seconds per image MB.")
+    parser.add_argument("--completion-latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    images = make_images()
+    with StubServer(
+        completion_latency=args.completion_latency,
+        image_latency_per_mb=args.image_latency,
+    ) as stub:
+        stub.files.update(images)
+        stub.install_env()
+        from tools import aimd_image
+
+        aimd = make_aimd(list(images))
+
+        def describe_urls() -> list[str]:
+            # What `extract_and_describe` sent before: one URL per image ID
+            # (the parser already collapses repeated IDs), re-uploads included.
+            _, image_urls = aimd_image.extract_image_data(aimd)
+            aimd_image.build_ai_description(aimd, image_urls, api_key="stub", base_url=stub.openai_base_url)
+            return image_urls
+
+        def describe(max_dimension: int):
+            def call() -> list[str]:
+                os.environ["AIMD_IMAGE_MAX_DIMENSION"] = str(max_dimension)
+                image_ids, image_urls = aimd_image.extract_image_data(aimd)
+                sent = aimd_image.model_images(image_ids, image_urls)
+                aimd_image.build_ai_description(aimd, sent, api_key="stub", base_url=stub.openai_base_url)
+                return sent
+
+            return call
+
+        aimd_image.extract_image_data(aimd)  # warm the URL and image ID caches
+        rows = []
+        paths = [("URLs (before)", describe_urls)]
+        paths += [
+            (f"data URIs, <= {bound} px", describe(bound))
+            for bound in args.max_dimensions or [2048, 1024, 512]
+        ]
+        for label, call in paths:
+            latencies = []
+            for _ in range(args.calls):
+                before = stub.image_bytes
+                started = time.perf_counter()
+                sent = call()
+                latencies.append(time.perf_counter() - started)
+                model_bytes = stub.image_bytes - before
+            request_bytes = len(json.dumps(aimd_image._build_messages(aimd, sent)))
+            rows.append(
+                [
+                    label,
+                    len(sent),
+                    f"{request_bytes / 1e3:.1f}",
+                    f"{model_bytes / 1e6:.2f}",
+                    f"{statistics.median(latencies) * 1e3:.0f}",
+                ]
+            )
+        aimd_image.OPENAI_CLIENTS.close()
+        os.environ.pop("AIMD_IMAGE_MAX_DIMENSION", None)
+
+    references = aimd.count("![")
+    print(
+        f"{references} image references, {len(images)} uploads, "
+        f"{sum(map(len, images.values())) / 1e6:.1f} MB; {args.calls} calls per path"
+    )
+    print_table(["path", "images sent", "request_kb", "model_image_mb", "e2e_p50_ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
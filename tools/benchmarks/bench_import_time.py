@@ -0,0 +1,147 @@
+"""Cold-load time of every protocol in `tests/` and `examples/` (regression-gated).
+
+Each protocol is loaded in a fresh interpreter under `python -X importtime`:
+after the shared dependencies (`airalogy`) are imported, the time to read
+`protocol.toml`, parse `protocol.aimd` and import `assigner.py` is measured,
+together with the modules that import pulled in. The run fails when a protocol
+exceeds its entry in `import_time_budget.json` by more than `--tolerance`
+(plus `--slack-ms`).
+
+    python -m tools.benchmarks.bench_import_time
+    python -m tools.benchmarks.bench_import_time --update-budget
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from tools.benchmarks._common import REPO_ROOT
+from tools.cli import print_table
+
+
+BUDGET_FILE = Path(__file__).with_name("import_time_budget.json")
+MARKER = "--- protocol load ---"
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+_CHILD_SCRIPT = f"""
+import sys, time
+import tools.protocol
+import airalogy.markdown
+sys.stderr.write({MARKER!r} + "\\n")
+started = time.perf_counter()
+tools.protocol.load_metadata(sys.argv[1])
+tools.protocol.load_defaults(sys.argv[1])
+tools.protocol.load_assigner_module(sys.argv[1])
+print((time.perf_counter() - started) * 1e3)
+"""
+
+
+def protocol_dirs() -> list[Path]:
+    return sorted(
+        path.parent
+        for root in ("tests", "examples")
+        for path in (REPO_ROOT / root).rglob("protocol.aimd")
+    )
+
+
+def measure(protocol_dir: Path) -> tuple[float, list[tuple[str, float]]]:
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        # Loading a protocol must not need platform credentials.
+        if not key.startswith("AIRALOGY_")
+    }
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD_SCRIPT, str(protocol_dir)],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(
+            f"Loading {protocol_dir} failed:\n{completed.stderr[-2000:]}"
+        )
+
+    imports = []
+    after_marker = False
+    for line in completed.stderr.splitlines():
+        if line == MARKER:
+            after_marker = True
+            continue
+        match = _IMPORTTIME_LINE.match(line)
+        # Only top-level entries: their cumulative time includes their children.
+        if after_marker and match and len(match.group(3)) == 1:
+            imports.append((match.group(4), int(match.group(2)) / 1e3))
+    return float(completed.stdout.strip()), imports
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="Allowed slowdown over the budget, as a fraction (default: 0.5).",
+    )
+    parser.add_argument(
+        "--slack-ms",
+        type=float,
+        default=5.0,
+        help="Absolute slack added to every budget, for timer noise (default: 5).",
+    )
+    parser.add_argument(
+        "--update-budget",
+        action="store_true",
+        help=f"Write the measured times to {BUDGET_FILE.name}.",
+    )
+    args = parser.parse_args()
+
+    budget = json.loads(BUDGET_FILE.read_text()) if BUDGET_FILE.is_file() else {}
+    measured: dict[str, float] = {}
+    rows = []
+    regressions = []
+    for protocol_dir in protocol_dirs():
+        name = protocol_dir.relative_to(REPO_ROOT).as_posix()
+        runs = [measure(protocol_dir) for _ in range(args.repeat)]
+        load_ms = statistics.median(run[0] for run in runs)
+        measured[name] = round(load_ms, 2)
+        heaviest = sorted(runs[0][1], key=lambda item: -item[1])[:3]
+        limit = budget.get(name)
+        status = "-"
+        if limit is not None:
+            allowed = limit * (1 + args.tolerance) + args.slack_ms
+            status = "ok" if load_ms <= allowed else "REGRESSED"
+            if load_ms > allowed:
+                regressions.append(f"{name}: {load_ms:.1f} ms > {allowed:.1f} ms")
+        rows.append(
+            [
+                name,
+                f"{load_ms:.1f}",
+                "-" if limit is None else f"{limit:.1f}",
+                status,
+                ", ".join(f"{module} {ms:.1f}" for module, ms in heaviest) or "-",
+            ]
+        )
+
+    print_table(
+        ["protocol", "load_ms", "budget_ms", "status", "heaviest imports (ms)"], rows
+    )
+
+    if args.update_budget:
+        BUDGET_FILE.write_text(json.dumps(measured, indent=2) + "\n")
+        print(f"Wrote {BUDGET_FILE.relative_to(REPO_ROOT)}")
+    elif regressions:
+        raise SystemExit("Cold-load regressions:\n" + "\n".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
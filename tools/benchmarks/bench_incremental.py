@@ -0,0 +1,83 @@
+"""Assigner invocations and latency per single-field edit: incremental vs. full rerun.
+
+    python -m tools.benchmarks.bench_incremental
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from tools.assigner_graph import AssignerGraph
+from tools.benchmarks._common import MULTI_LEVEL_PROTOCOL
+from tools.cli import parse_overrides, print_table
+from tools.executor import run_serial
+from tools.incremental import IncrementalSession
+from tools.protocol import load_assigners, load_defaults
+
+
+DEFAULT_EDITS = ["a1=5", "b1=3", "c1=9", "f1=4", "f3=6", "f5=1", "g2=8", "h1='omega'"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--protocol", default=str(MULTI_LEVEL_PROTOCOL))
+    parser.add_argument(
+        "--edit",
+        dest="edits",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help=f"Single-field edit to replay (default: {' '.join(DEFAULT_EDITS)}).",
+    )
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    graph = AssignerGraph(load_assigners(args.protocol))
+    defaults = load_defaults(args.protocol)
+    # Keep the sleeping assigners out of the latency numbers.
+    defaults.update(b4=0, h6=0, h7=0, h8=0)
+
+    rows = []
+    for edit in args.edits or DEFAULT_EDITS:
+        ((name, value),) = parse_overrides([edit]).items()
+
+        session = IncrementalSession(graph, defaults)
+        session.initialize()
+        baseline = dict(session.values)
+        incremental_times = []
+        for i in range(args.repeat):
+            # Alternate between the edited and the original value so that
+            # every iteration is a real change.
+            report = session.update({name: value if i % 2 == 0 else baseline[name]})
+            incremental_times.append(report.elapsed)
+            if i == 0:
+                ran = report.ran
+
+        full_times = []
+        for i in range(args.repeat):
+            values = dict(defaults)
+            values[name] = value if i % 2 == 0 else defaults[name]
+            started = time.perf_counter()
+            full = run_serial(graph, values, include_manual=False)
+            full_times.append(time.perf_counter() - started)
+
+        rows.append(
+            [
+                edit,
+                len(ran),
+                len(full.results),
+                f"{statistics.median(incremental_times) * 1e6:.1f}",
+                f"{statistics.median(full_times) * 1e6:.1f}",
+                " ".join(ran) or "-",
+            ]
+        )
+
+    print_table(
+        ["edit", "incr_calls", "full_calls", "incr_us", "full_us", "rerun"], rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Tail latency of fast assigners sharing a worker with slow ones, per execution policy.
+
+One dispatcher thread stands in for a worker serving several protocols: it
+submits an open-loop stream of fast Line A calls (`test_multi_level_assigner`)
+mixed with blocking `line_b_slow_auto` calls (`b4` seconds of sleep) and
+CPU-bound `convert_pdf` conversions (`test_markdown_conversion`, against
+`StubServer`). Latency is measured from each call's scheduled arrival, so
+time spent queued behind a slow assigner counts.
+
+    python -m tools.benchmarks.bench_isolation
+    python -m tools.benchmarks.bench_isolation --duration 10 --pages 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import threading
+import time
+
+from tools.benchmarks._common import MULTI_LEVEL_PROTOCOL, REPO_ROOT
+from tools.cli import percentile, print_table
+from tools.documents import make_pdf, pdf_pages
+from tools.isolation import AssignerRunner
+from tools.protocol import AssignerSpec, load_assigners
+from tools.stubs import StubServer
+
+
+CONVERSION_PROTOCOL = REPO_ROOT / "tests" / "test_markdown_conversion" / "protocol"
+FILE_ID = "airalogy.id.file.00000000-0000-0000-0000-000000000000.pdf"
+
+POLICIES = {
+    "all inline": lambda spec: "inline",
+    "all thread": lambda spec: "thread",
+    "all process": lambda spec: "process",
+    "declared": lambda spec: spec.execution,
+}
+
+
+def workload(
+    specs: dict[str, AssignerSpec], duration: float, fast_interval: float, slow_interval: float, delay: int
+) -> list[tuple[float, str, AssignerSpec, dict]]:
+    """`(arrival, kind, spec, inputs)`, sorted by arrival."""
+    calls = []
+    fast = [
+        (specs["line_a3"], lambda i: {"a1": i, "a2": 2}),
+        (specs["line_a4"], lambda i: {"a3": i}),
+        (specs["line_a5"], lambda i: {"a4": i}),
+    ]
+    for i in range(int(duration / fast_interval)):
+        spec, inputs = fast[i % len(fast)]
+        calls.append((i * fast_interval, "fast", spec, inputs(i)))
+    for i in range(int(duration / slow_interval)):
+        at = i * slow_interval
+        calls.append((at, "sleep", specs["line_b_slow_auto"], {"b5": i, "b4": delay}))
+        calls.append((at + slow_interval / 2, "pdf", specs["convert_pdf"], {"pdf_file_id": FILE_ID}))
+    return sorted(calls, key=lambda call: call[0])
+
+
+def replay(runner: AssignerRunner, calls, policy) -> dict[str, list[float]]:
+    latencies: dict[str, list[float]] = {}
+    failures: list[str] = []
+    lock = threading.Lock()
+    outstanding = threading.Semaphore(0)
+
+    def done(kind: str, due: float, future) -> None:
+        finished = time.perf_counter()
+        error = future.exception() or (None if future.result().success else future.result().error_message)
+        with lock:
+            latencies.setdefault(kind, []).append(finished - due)
+            if error:
+                failures.append(f"{kind}: {error}")
+        outstanding.release()
+
+    calls = [
+        (at, kind, dataclasses.replace(spec, execution=policy(spec)), inputs)
+        for at, kind, spec, inputs in calls
+    ]
+    started = time.perf_counter()
+    for at, kind, spec, inputs in calls:
+        due = started + at
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        future = runner.submit(spec, inputs)
+        future.add_done_callback(lambda future, kind=kind, due=due: done(kind, due, future))
+    for _ in calls:
+        outstanding.acquire()
+    if failures:
+        raise SystemExit(f"{len(failures)} calls failed, e.g. {failures[0]}")
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=6.0, help="Seconds of arrivals per policy.")
+    parser.add_argument("--fast-interval", type=float, default=0.005)
+    parser.add_argument("--slow-interval", type=float, default=2.0)
+    parser.add_argument("--delay", type=int, default=1, help="b4: seconds line_b_slow_auto sleeps.")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--process-workers", type=int, default=4)
+    args = parser.parse_args()
+
+    specs = {spec.name: spec for spec in load_assigners(MULTI_LEVEL_PROTOCOL)}
+    specs.update((spec.name, spec) for spec in load_assigners(CONVERSION_PROTOCOL))
+    calls = workload(specs, args.duration, args.fast_interval, args.slow_interval, args.delay)
+
+    rows = []
+    with StubServer() as stub:
+        stub.files[FILE_ID] = make_pdf(pdf_pages(args.pages))
+        # Before the runner exists: process workers inherit the environment.
+        stub.install_env()
+        preload = [MULTI_LEVEL_PROTOCOL / "assigner.py", CONVERSION_PROTOCOL / "assigner.py"]
+        for label, policy in POLICIES.items():
+            with AssignerRunner(process_workers=args.process_workers, preload=preload) as runner:
+                runner.warm()
+                latencies = replay(runner, calls, policy)
+            fast = [seconds * 1e3 for seconds in latencies["fast"]]
+            rows.append(
+                [
+                    label,
+                    len(fast),
+                    f"{percentile(fast, 0.50):.2f}",
+                    f"{percentile(fast, 0.95):.2f}",
+                    f"{percentile(fast, 0.99):.2f}",
+                    f"{max(fast):.0f}",
+                    f"{percentile(latencies['sleep'], 0.50):.2f}",
+                    f"{percentile(latencies['pdf'], 0.50):.2f}",
+                ]
+            )
+
+    print(
+        f"{len(calls)} calls over {args.duration:g} s: Line A every {args.fast_interval * 1e3:g} ms, "
+        f"line_b_slow_auto ({args.delay} s) and convert_pdf ({args.pages} pages) every {args.slow_interval:g} s"
+    )
+    print_table(
+        [
+            "policy",
+            "fast calls",
+            "fast p50_ms",
+            "fast p95_ms",
+            "fast p99_ms",
+            "fast max_ms",
+            "sleep p50_s",
+            "pdf p50_s",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Throughput and latency of a class submitting `test_aimd_image` at once: direct completions vs. `DescriptionScheduler`.
+
+`--students` submissions arrive together; a `--duplicate-share` of them
+submit the class template unchanged (identical requests), the others their
+own notes. `--waves - 1` more rounds of the same submissions (students
+pressing Assign again) follow, each once the previous one is done. The stub
+endpoint admits `--provider-rate` completions per second (bursts of
+`--provider-burst`) and `--provider-concurrency` at a time, and answers 429
+with `Retry-After` beyond that.
+
+- direct: `build_ai_description` per submission, with the OpenAI client's
+  default retries (2, honoring `Retry-After`);
+- scheduler: `DescriptionScheduler.describe` without a client-side rate
+  (deduplication, cache, bounded concurrency, backoff with jitter);
+- scheduler + rate: the same, with its token bucket set to the provider rate.
+
+Throughput counts successful descriptions per second of wall-clock time;
+latencies are those of successful submissions.
+
+    python -m tools.benchmarks.bench_llm_scheduler --students 120 --provider-rate 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tools.cli import percentile, print_table
+from tools.stubs import StubServer
+
+
+TEMPLATE = "# Lab report\n\nObserve the stained sample and describe the colonies."
+
+
+def submissions(students: int, duplicate_share: float, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        TEMPLATE if rng.random() < duplicate_share else f"{TEMPLATE}\n\nStudent {index}: notes."
+        for index in range(students)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=120)
+    parser.add_argument("--duplicate-share", type=float, default=0.3)
+    parser.add_argument("--waves", type=int, default=2)
+    parser.add_argument("--provider-rate", type=float, default=10.0)
+    parser.add_argument("--provider-burst", type=int, default=5)
+    parser.add_argument("--provider-concurrency", type=int, default=8)
+    parser.add_argument("--completion-latency", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    contents = submissions(args.students, args.duplicate_share, args.seed)
+    with StubServer(
+        completion_latency=args.completion_latency,
+        rate_limit=args.provider_rate,
+        rate_burst=args.provider_burst,
+        max_concurrent_completions=args.provider_concurrency,
+    ) as stub:
+        stub.install_env()
+        from tools import aimd_image
+
+        def direct(content: str) -> str:
+            return aimd_image.build_ai_description(
+                content, [], api_key="stub", base_url=stub.openai_base_url
+            )
+
+        rows = []
+        for label, rate in (
+            ("direct", None),
+            ("scheduler", None),
+            ("scheduler + rate", args.provider_rate),
+        ):
+            scheduler = aimd_image.DescriptionScheduler(
+                rate, burst=args.provider_burst, max_concurrency=args.provider_concurrency
+            )
+
+            def scheduled(content: str) -> str:
+                return scheduler.describe(
+                    content, [], api_key="stub", base_url=stub.openai_base_url
+                )
+
+            describe = direct if label == "direct" else scheduled
+
+            def submit(content: str) -> float | None:
+                started = time.perf_counter()
+                try:
+                    describe(content)
+                except Exception:
+                    return None
+                return time.perf_counter() - started
+
+            # Let the provider's bucket refill between runs.
+            time.sleep(args.provider_burst / args.provider_rate)
+            stub.counts.clear()
+            started = time.perf_counter()
+            results = []
+            with ThreadPoolExecutor(args.students) as pool:
+                for _ in range(args.waves):
+                    results.extend(pool.map(submit, contents))
+            wall = time.perf_counter() - started
+
+            latencies = [seconds * 1e3 for seconds in results if seconds is not None]
+            stats = scheduler.stats() if label != "direct" else {}
+            rows.append(
+                [
+                    label,
+                    len(latencies),
+                    len(results) - len(latencies),
+                    stub.counts.get("chat_completions", 0),
+                    stub.counts.get("rate_limited", 0),
+                    stats.get("deduplicated", "-"),
+                    stats.get("cache_hits", "-"),
+                    f"{len(latencies) / wall:.1f}",
+                    f"{percentile(latencies, 0.50):.0f}" if latencies else "-",
+                    f"{percentile(latencies, 0.99):.0f}" if latencies else "-",
+                ]
+            )
+        aimd_image.OPENAI_CLIENTS.close()
+
+    print(
+        f"{args.waves} waves of {args.students} simultaneous submissions "
+        f"({len(set(contents))} distinct), provider limit "
+        f"{args.provider_rate:g}/s (burst {args.provider_burst}), "
+        f"{args.provider_concurrency} concurrent, {args.completion_latency * 1e3:.0f} ms per completion"
+    )
+    print_table(
+        [
+            "path",
+            "ok",
+            "failed",
+            "upstream requests",
+            "429s",
+            "deduplicated",
+            "cache hits",
+            "ok/s",
+            "p50_ms",
+            "p99_ms",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Memoized vs. plain incremental evaluation of the Line H chain.
+
+Replays edits that toggle Line H inputs back and forth; with memoization the
+sleeping `line_h_*` assigners are served from the cache after the first round,
+and early cutoff keeps delay-only edits from rerunning downstream assigners.
+
+    python -m tools.benchmarks.bench_memo --delay 1
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from tools.assigner_graph import AssignerGraph
+from tools.benchmarks._common import MULTI_LEVEL_PROTOCOL
+from tools.cli import print_table
+from tools.incremental import IncrementalSession
+from tools.memo import AssignerMemo
+from tools.protocol import load_assigners, load_defaults, load_metadata
+
+
+PURE_ASSIGNERS = [
+    "line_h_piece_builder",
+    "line_h_joiner",
+    "line_h_splitter",
+    "line_h_recombine",
+    "line_g_stage2a",
+    "line_g_stage2b",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--protocol", default=str(MULTI_LEVEL_PROTOCOL))
+    parser.add_argument("--delay", type=int, default=1, help="h6/h7/h8 seconds")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--maxsize", type=int, default=128)
+    args = parser.parse_args()
+
+    graph = AssignerGraph(load_assigners(args.protocol))
+    version = load_metadata(args.protocol)["version"]
+    defaults = load_defaults(args.protocol)
+    defaults.update(b4=0, h6=args.delay, h7=args.delay, h8=args.delay)
+
+    edits = [
+        {"h1": "omega"},
+        {"h1": defaults["h1"]},
+        {"h3": "kappa"},
+        {"h3": defaults["h3"]},
+        # A delay-only edit reruns the piece builder, but its outputs are unchanged.
+        {"h6": 0},
+        {"h6": args.delay},
+    ]
+
+    rows = []
+    for label, memo in (
+        ("plain", None),
+        ("memo", AssignerMemo(args.maxsize, include=PURE_ASSIGNERS)),
+    ):
+        session = IncrementalSession(
+            graph,
+            defaults,
+            memo=memo,
+            protocol_version=version,
+            early_cutoff=memo is not None,
+        )
+        session.initialize()
+        elapsed = calls = hits = cut_off = 0
+        for _ in range(args.rounds):
+            for edit in edits:
+                report = session.update(edit)
+                elapsed += report.elapsed
+                calls += len(report.ran)
+                hits += len(report.memo_hits)
+                cut_off += len(report.cut_off)
+        stats = memo.stats() if memo else {}
+        rows.append(
+            [
+                label,
+                f"{elapsed:.2f}",
+                calls,
+                hits,
+                cut_off,
+                stats.get("hit_ratio", "-"),
+                stats.get("evictions", "-"),
+            ]
+        )
+        final = session.values["h19"]
+
+    print(f"{args.rounds} rounds x {len(edits)} edits, final h19={final}")
+    print_table(
+        ["mode", "seconds", "calls", "memo_hits", "cut_off", "hit_ratio", "evictions"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
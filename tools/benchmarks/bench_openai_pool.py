@@ -0,0 +1,86 @@
+"""Per-call latency of `build_ai_description` with and without the pooled OpenAI client.
+
+    python -m tools.benchmarks.bench_openai_pool --calls 100 --concurrency 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tools.cli import percentile, print_table
+from tools.stubs import StubServer
+
+
+AIMD = "# Notes\n\nA short AIMD with no images."
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--completion-latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with StubServer(completion_latency=args.completion_latency) as stub:
+        stub.install_env()
+        from openai import OpenAI
+
+        from tools import aimd_image
+
+        def unpooled() -> str:
+            # What `build_ai_description` did before: a fresh client per call.
+            client = OpenAI(api_key="stub", base_url=stub.openai_base_url)
+            completion = client.chat.completions.create(
+                model="qwen3-vl-flash",
+                messages=aimd_image._build_messages(AIMD, []),
+            )
+            return aimd_image._completion_text(completion)
+
+        def pooled() -> str:
+            return aimd_image.build_ai_description(
+                AIMD, [], api_key="stub", base_url=stub.openai_base_url
+            )
+
+        def timed(call) -> float:
+            started = time.perf_counter()
+            call()
+            return time.perf_counter() - started
+
+        rows = []
+        for label, call in (("unpooled", unpooled), ("pooled", pooled)):
+            sequential = [timed(call) for _ in range(args.calls)]
+            with ThreadPoolExecutor(args.concurrency) as pool:
+                started = time.perf_counter()
+                concurrent = list(pool.map(lambda _: timed(call), range(args.calls)))
+                concurrent_wall = time.perf_counter() - started
+            rows.append(
+                [
+                    label,
+                    f"{statistics.median(sequential) * 1e3:.2f}",
+                    f"{percentile(sequential, 0.99) * 1e3:.2f}",
+                    f"{statistics.median(concurrent) * 1e3:.2f}",
+                    f"{percentile(concurrent, 0.99) * 1e3:.2f}",
+                    f"{concurrent_wall:.2f}",
+                ]
+            )
+        aimd_image.OPENAI_CLIENTS.close()
+
+    print(f"{args.calls} sequential + {args.calls} concurrent calls each")
+    print_table(
+        [
+            "client",
+            "seq_p50_ms",
+            "seq_p99_ms",
+            "conc_p50_ms",
+            "conc_p99_ms",
+            "conc_wall_s",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Wall-clock of serial vs. level-parallel execution of a whole assigner file.
+
+    python -m tools.benchmarks.bench_parallel_executor --set b4=2 --set h6=1
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+
+from tools.assigner_graph import AssignerGraph
+from tools.benchmarks._common import MULTI_LEVEL_PROTOCOL
+from tools.cli import parse_overrides, print_table
+from tools.executor import run_level_parallel, run_serial
+from tools.protocol import load_assigners, load_defaults
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--protocol", default=str(MULTI_LEVEL_PROTOCOL))
+    parser.add_argument(
+        "--set",
+        dest="overrides",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Override an input value (default: b4=2, h6=1, h7=1, h8=1).",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    graph = AssignerGraph(load_assigners(args.protocol))
+    values = load_defaults(args.protocol)
+    values.update(
+        parse_overrides(args.overrides or ["b4=2", "h6=1", "h7=1", "h8=1"])
+    )
+
+    print(
+        f"{len(graph.specs)} assigners in {len(graph.levels())} levels "
+        f"(widest level: {max(len(level) for level in graph.levels())})"
+    )
+
+    rows = []
+    reports = {}
+    for label, run in (
+        ("serial", lambda: run_serial(graph, values)),
+        (
+            "level-parallel",
+            lambda: run_level_parallel(graph, values, max_workers=args.workers),
+        ),
+    ):
+        timings = []
+        for _ in range(args.repeat):
+            reports[label] = run()
+            timings.append(reports[label].elapsed)
+        rows.append(
+            [
+                label,
+                f"{statistics.median(timings):.3f}",
+                f"{min(timings):.3f}",
+                len(reports[label].results),
+                len(reports[label].skipped),
+            ]
+        )
+    print_table(["mode", "median_s", "min_s", "ran", "skipped"], rows)
+
+    serial, parallel = reports["serial"], reports["level-parallel"]
+    volatile = {"b7", "b8", "b10", "b11", "b13", "b14"}
+    mismatched = sorted(
+        key
+        for key in serial.values.keys() | parallel.values.keys()
+        if key not in volatile and serial.values.get(key) != parallel.values.get(key)
+    )
+    if mismatched:
+        raise SystemExit(f"Serial and parallel results differ for: {mismatched}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Time-to-first-chunk and peak RSS of whole-document vs. streaming PDF conversion.
+
+Each path runs in a fresh subprocess so that peak RSS is measured per path.
+
+    python -m tools.benchmarks.bench_pdf_streaming --pages 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from tools.benchmarks._common import REPO_ROOT
+from tools.cli import print_table
+from tools.documents import make_pdf, pdf_pages
+from tools.stubs import StubServer
+
+
+FILE_ID = "airalogy.id.file.00000000-0000-0000-0000-000000000000.pdf"
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(path: str, max_chars: int | None) -> None:
+    from tools import markdown_conversion
+
+    # Pull in the conversion dependencies before measuring.
+    import markitdown  # noqa: F401
+    import pdfminer.high_level  # noqa: F401
+
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+    first_chunk = None
+    chars = 0
+    if path == "whole":
+        text = markdown_conversion.convert_file(FILE_ID)[0]
+        first_chunk = time.perf_counter() - started
+        chars = len(text)
+    else:
+        for chunk in markdown_conversion.iter_pdf_markdown(FILE_ID, max_chars=max_chars):
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - started
+            chars += len(chunk)
+    print(
+        json.dumps(
+            {
+                "first_chunk": first_chunk,
+                "total": time.perf_counter() - started,
+                "chars": chars,
+                "baseline_rss_mb": baseline,
+                "peak_rss_mb": _peak_rss_mb(),
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--max-chars", type=int, default=20_000)
+    parser.add_argument(
+        "--child", choices=["whole", "stream"], help=argparse.SUPPRESS
+    )
+    parser.add_argument("--child-max-chars", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.child_max_chars)
+        return
+
+    with StubServer() as stub:
+        stub.files[FILE_ID] = make_pdf(pdf_pages(args.pages))
+        env = {**os.environ, **stub.env()}
+        rows = []
+        for label, extra in (
+            ("whole document", ["--child", "whole"]),
+            ("stream", ["--child", "stream"]),
+            (
+                f"stream, max {args.max_chars} chars",
+                ["--child", "stream", "--child-max-chars", str(args.max_chars)],
+            ),
+        ):
+            output = subprocess.run(
+                [sys.executable, "-m", __spec__.name, *extra],
+                env=env,
+                cwd=REPO_ROOT,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            rows.append(
+                [
+                    label,
+                    f"{result['first_chunk']:.2f}",
+                    f"{result['total']:.2f}",
+                    result["chars"],
+                    f"{result['peak_rss_mb'] - result['baseline_rss_mb']:.1f}",
+                    f"{result['peak_rss_mb']:.1f}",
+                ]
+            )
+
+    print(f"{args.pages}-page PDF, {len(stub.files[FILE_ID]) / 1e6:.1f} MB")
+    print_table(
+        [
+            "path",
+            "first_chunk_s",
+            "total_s",
+            "chars",
+            "rss_growth_mb",
+            "peak_rss_mb",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Throughput and memory of streaming record export to Parquet / Arrow IPC.
+
+Records of `examples/meeting_notes/en` (scalars, `CurrentTime`, `list[str]`)
+and `tests/test_typed_var_table` (three var tables, flattened into child
+tables) are generated lazily and written with `RecordExporter`. Each run is a
+fresh subprocess, so RSS growth shows that memory is bounded by the batch
+size rather than the record count. Requires `pyarrow`.
+
+    python -m tools.benchmarks.bench_record_export
+    python -m tools.benchmarks.bench_record_export --records 5000000 --format parquet
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+from tools.benchmarks._common import REPO_ROOT
+from tools.cli import print_table
+
+
+PROTOCOLS = {
+    "meeting_notes": REPO_ROOT / "examples" / "meeting_notes" / "en",
+    "typed_var_table": REPO_ROOT / "tests" / "test_typed_var_table",
+}
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def meeting_notes_records(count: int) -> Iterator[dict]:
+    start = datetime.datetime(2024, 1, 1, 9, tzinfo=datetime.timezone.utc)
+    for i in range(count):
+        begin = start + datetime.timedelta(hours=i)
+        yield {
+            "id": f"airalogy.id.record.{i:08d}",
+            "data": {
+                "var": {
+                    "title": f"Weekly sync {i}",
+                    "start_time": begin.isoformat(),
+                    "end_time": (begin + datetime.timedelta(minutes=45)).isoformat(),
+                    "location": f"Room {i % 12}",
+                    "attendees": [f"member_{(i + k) % 50}" for k in range(i % 6 + 1)],
+                    "recorder": f"member_{i % 50}",
+                    "content": f"Discussed item {i} and agreed on the next steps.",
+                }
+            },
+        }
+
+
+def typed_var_table_records(count: int) -> Iterator[dict]:
+    for i in range(count):
+        yield {
+            "id": f"airalogy.id.record.{i:08d}",
+            "data": {
+                "var": {
+                    "students": [
+                        {"name": f"Student {i}-{k}", "age": 18 + k, "enrolled": k % 2 == 0}
+                        for k in range(5)
+                    ],
+                    "course_scores": [
+                        {"course_name": f"Course {k}", "score": 60.0 + k, "passed": True}
+                        for k in range(3)
+                    ],
+                    "quick_table": [{"col_a": "a", "col_b": "b", "col_c": str(i)}],
+                }
+            },
+        }
+
+
+GENERATORS = {
+    "meeting_notes": meeting_notes_records,
+    "typed_var_table": typed_var_table_records,
+}
+
+
+def child(protocol: str, format: str, records: int, batch_size: int) -> None:
+    from tools.record_export import _pyarrow, export_records
+
+    _pyarrow()  # import before measuring
+    with tempfile.TemporaryDirectory() as out_dir:
+        baseline = _peak_rss_mb()
+        started = time.perf_counter()
+        summary = export_records(
+            PROTOCOLS[protocol],
+            GENERATORS[protocol](records),
+            out_dir,
+            format=format,
+            batch_size=batch_size,
+        )
+        elapsed = time.perf_counter() - started
+        size = sum(path.stat().st_size for path in Path(out_dir).iterdir())
+    print(
+        json.dumps(
+            {
+                "elapsed": elapsed,
+                "records": summary.records,
+                "child_rows": sum(summary.rows.values()),
+                "bytes": size,
+                "rss_growth_mb": _peak_rss_mb() - baseline,
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=65_536)
+    parser.add_argument(
+        "--format", choices=["parquet", "arrow"], action="append", dest="formats"
+    )
+    parser.add_argument("--child", choices=sorted(PROTOCOLS), help=argparse.SUPPRESS)
+    parser.add_argument("--child-format", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.child_format, args.records, args.batch_size)
+        return
+
+    rows = []
+    for protocol in PROTOCOLS:
+        for format in args.formats or ["parquet", "arrow"]:
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    __spec__.name,
+                    "--child",
+                    protocol,
+                    "--child-format",
+                    format,
+                    "--records",
+                    str(args.records),
+                    "--batch-size",
+                    str(args.batch_size),
+                ],
+                cwd=REPO_ROOT,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            rows.append(
+                [
+                    protocol,
+                    format,
+                    result["records"],
+                    result["child_rows"],
+                    f"{result['elapsed']:.2f}",
+                    f"{result['records'] / result['elapsed']:,.0f}",
+                    f"{result['bytes'] / 1e6:.1f}",
+                    f"{result['rss_growth_mb']:.1f}",
+                ]
+            )
+    print_table(
+        [
+            "protocol",
+            "format",
+            "records",
+            "child rows",
+            "seconds",
+            "records/s",
+            "output MB",
+            "rss_growth_mb",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
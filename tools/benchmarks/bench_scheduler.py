@@ -0,0 +1,162 @@
+"""Wasted work under rapid re-edits: latest-wins scheduler vs. a plain trigger queue.
+
+Edits are replayed on a timeline against `AssignerScheduler` over
+`test_multi_level_assigner`, once with `latest_wins=True` and once with
+`latest_wins=False` (every result lands and triggers downstream work, as
+when each edit simply queues its assigners):
+
+- Line B: `b1` is edited and `b5` re-assigned three times while
+  `line_b_slow_auto` (delay `b4`) is still running.
+- Line H: `h1`/`h2`/`h3` are edited while the delayed piece builder, joiner
+  and splitter (`h6`/`h7`/`h8`) are running.
+- Line H with a `line_h_joiner` timeout shorter than its delay.
+
+Final values are checked against a serial run on the final inputs.
+
+    python -m tools.benchmarks.bench_scheduler
+    python -m tools.benchmarks.bench_scheduler --delay 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from tools.assigner_graph import AssignerGraph
+from tools.benchmarks._common import MULTI_LEVEL_PROTOCOL
+from tools.cli import print_table
+from tools.executor import run_serial
+from tools.protocol import load_assigners, load_defaults
+from tools.scheduler import AssignerScheduler, SchedulerReport
+
+
+def line_b(delay: float) -> tuple[dict, list[tuple[float, dict | str]]]:
+    edits = []
+    for step, b1 in enumerate((3, 4, 5)):
+        at = step * delay / 3
+        edits += [(at, {"b1": b1}), (at, "line_b5_manual")]
+    return {"b4": int(delay)}, edits
+
+
+def line_h(delay: float) -> tuple[dict, list[tuple[float, dict | str]]]:
+    return {"h6": int(delay), "h7": int(delay), "h8": int(delay)}, [
+        (0.0, {"h1": "alpha1"}),
+        (delay * 0.4, {"h1": "alpha2"}),
+        (delay * 1.5, {"h2": "beta2"}),
+        (delay * 1.7, {"h3": "gamma3"}),
+    ]
+
+
+LINE_FIELDS = {
+    "line B": ["b5", "b6", "b12"],
+    "line H": ["h9", "h10", "h11", "h12", "h13", "h18", "h19"],
+    "line H, joiner timeout": ["h9", "h10", "h11"],
+}
+
+
+def replay(
+    graph: AssignerGraph,
+    defaults: dict,
+    overrides: dict,
+    edits: list[tuple[float, dict | str]],
+    *,
+    latest_wins: bool,
+    timeouts: dict[str, float] | None = None,
+) -> tuple[AssignerScheduler, float]:
+    values = {**defaults, "b4": 0, "h6": 0, "h7": 0, "h8": 0}
+    scheduler = AssignerScheduler(graph, values, timeouts=timeouts, latest_wins=latest_wins)
+    scheduler.initialize()
+    scheduler.assign("line_b5_manual")
+    scheduler.wait()
+    scheduler.edit(overrides)
+    scheduler.wait()
+    scheduler.report = SchedulerReport()
+
+    started = time.perf_counter()
+    for at, edit in edits:
+        time.sleep(max(0.0, started + at - time.perf_counter()))
+        if isinstance(edit, str):
+            scheduler.assign(edit)
+        else:
+            scheduler.edit(edit)
+    scheduler.wait()
+    elapsed = time.perf_counter() - started
+    scheduler.wait(drain=True)
+    scheduler.close()
+    return scheduler, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--protocol", default=str(MULTI_LEVEL_PROTOCOL))
+    parser.add_argument(
+        "--delay", type=float, default=1.0, help="Seconds slept by each delayed assigner."
+    )
+    args = parser.parse_args()
+
+    graph = AssignerGraph(load_assigners(args.protocol))
+    defaults = load_defaults(args.protocol)
+    scenarios = [
+        ("line B", *line_b(args.delay), None),
+        ("line H", *line_h(args.delay), None),
+        ("line H, joiner timeout", *line_h(args.delay), {"line_h_joiner": args.delay / 2}),
+    ]
+
+    rows = []
+    for label, overrides, edits, timeouts in scenarios:
+        wasted = {}
+        for latest_wins in (False, True):
+            scheduler, elapsed = replay(
+                graph, defaults, overrides, edits, latest_wins=latest_wins, timeouts=timeouts
+            )
+            report = scheduler.report
+            inputs = {
+                name: value
+                for name, value in scheduler.values.items()
+                if graph.writer.get(name) is None
+            }
+            expected = run_serial(graph, inputs).values
+            fields = LINE_FIELDS[label]
+            consistent = all(scheduler.values.get(f) == expected.get(f) for f in fields)
+            if timeouts:
+                # The joiner never completes, so its outputs keep their old values.
+                consistent = report.count("line_h_joiner", "timed_out") > 0 and all(
+                    scheduler.values.get(f) == expected.get(f) for f in fields
+                )
+            wasted[latest_wins] = report.wasted_seconds
+            statuses = {}
+            for run in report.runs:
+                statuses[run.status] = statuses.get(run.status, 0) + 1
+            rows.append(
+                [
+                    label,
+                    "latest-wins" if latest_wins else "trigger queue",
+                    len(report.runs),
+                    " ".join(f"{k}={v}" for k, v in sorted(statuses.items())),
+                    sum(run.stale for run in report.runs if run.status == "applied"),
+                    f"{report.busy_seconds:.2f}",
+                    f"{report.wasted_seconds:.2f}",
+                    f"{elapsed:.2f}",
+                    "yes" if consistent else "NO",
+                ]
+            )
+        rows.append(["", "saved", "", "", "", "", f"{wasted[False] - wasted[True]:.2f}", "", ""])
+
+    print_table(
+        [
+            "scenario",
+            "scheduler",
+            "runs",
+            "statuses",
+            "stale applied",
+            "busy_s",
+            "wasted_s",
+            "wall_s",
+            "consistent",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
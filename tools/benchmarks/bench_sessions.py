@@ -0,0 +1,223 @@
+"""Throughput, latency percentiles and memory of concurrent simulated sessions per protocol.
+
+A session is one user filling in a record: it starts from the AIMD defaults
+(plus the fixture inputs below), runs the initial cascade, replays `--edits`
+random edits of the protocol's integer input fields and finally triggers
+every manual assigner once. `--sessions` sessions run on `--concurrency`
+threads sharing one loaded protocol, as in a worker. The Airalogy file
+service and the OpenAI endpoint are served by `StubServer`.
+
+Each protocol runs in a fresh subprocess, so that peak RSS is per protocol.
+
+    python -m tools.benchmarks.bench_sessions
+    python -m tools.benchmarks.bench_sessions --sessions 500 --concurrency 32 \\
+        --protocol tests/test_multi_level_assigner
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tools.benchmarks._common import REPO_ROOT
+from tools.cli import percentile, print_table
+
+
+DOCX_ID = "airalogy.id.file.00000000-0000-0000-0000-000000000000.docx"
+PDF_ID = "airalogy.id.file.00000000-0000-0000-0000-000000000000.pdf"
+IMAGE_AIMD = "\n".join(
+    f"Step {i}: ![Image {i}](airalogy.id.file.{i:08d}-0000-0000-0000-000000000000.png)"
+    for i in range(4)
+)
+
+# Inputs a user would provide, by protocol ID.
+SESSION_INPUTS = {
+    # Keep the sleeping assigners out of the numbers.
+    "test_multi_level_assigner": {"b4": 0, "h6": 0, "h7": 0, "h8": 0},
+    "test_aimd_image": {"aimd_content": IMAGE_AIMD, "qwen_api_key": "stub"},
+    "test_markdown_conversion": {"docx_file_id": DOCX_ID, "pdf_file_id": PDF_ID},
+    "test_aimd_multi_hop_image": {
+        "upstream_aimd_1": "Step 1\n\n" + IMAGE_AIMD,
+        "upstream_aimd_2": "Step 2: the same images again.\n\n" + IMAGE_AIMD,
+    },
+}
+
+
+def _protocols() -> list[str]:
+    return sorted(
+        str(path.parent.relative_to(REPO_ROOT))
+        for pattern in ("tests/*/protocol/protocol.aimd", "examples/**/protocol/protocol.aimd")
+        for path in REPO_ROOT.glob(pattern)
+    )
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(protocol: str, sessions: int, concurrency: int, edits: int, seed: int) -> None:
+    from tools.assigner_graph import AssignerGraph
+    from tools.documents import make_docx, make_pdf, paragraphs, pdf_pages
+    from tools.incremental import IncrementalSession
+    from tools.protocol import load_assigners, load_defaults, load_metadata
+    from tools.stubs import StubServer
+
+    with StubServer(completion_latency=0.05) as stub:
+        stub.files[DOCX_ID] = make_docx(paragraphs(10))
+        stub.files[PDF_ID] = make_pdf(pdf_pages(2))
+        stub.install_env()
+
+        started = time.perf_counter()
+        graph = AssignerGraph(load_assigners(protocol))
+        values = load_defaults(protocol)
+        inputs = SESSION_INPUTS.get(load_metadata(protocol)["id"], {})
+        values.update(inputs)
+        load_seconds = time.perf_counter() - started
+
+        assigned = {name for spec in graph.specs.values() for name in spec.assigned_fields}
+        editable = sorted(
+            name
+            for name, value in values.items()
+            if type(value) is int and name not in assigned and name not in inputs
+        )
+        manual = [spec.name for spec in graph.topological_order() if spec.mode == "manual"]
+
+        lock = threading.Lock()
+        operations: list[float] = []
+        durations: list[float] = []
+        counts = {"runs": 0, "failed": 0}
+
+        def session(index: int) -> None:
+            rng = random.Random(seed * 1_000_003 + index)
+            latencies = []
+            reports = []
+            session_started = time.perf_counter()
+            state = IncrementalSession(graph, values)
+
+            def timed(call, *args) -> None:
+                op_started = time.perf_counter()
+                reports.append(call(*args))
+                latencies.append(time.perf_counter() - op_started)
+
+            timed(state.initialize)
+            for _ in range(edits if editable else 0):
+                timed(state.update, {rng.choice(editable): rng.randrange(1, 10)})
+            for name in manual:
+                timed(state.assign, name)
+            elapsed = time.perf_counter() - session_started
+            with lock:
+                operations.extend(latencies)
+                durations.append(elapsed)
+                counts["runs"] += sum(len(report.ran) for report in reports)
+                counts["failed"] += sum(len(report.failed) for report in reports)
+
+        # One session up front, so that lazy imports do not land in the numbers.
+        session(-1)
+        operations.clear()
+        durations.clear()
+        counts.update(runs=0, failed=0)
+
+        baseline = _peak_rss_mb()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(session, range(sessions)))
+        wall = time.perf_counter() - started
+
+    print(
+        json.dumps(
+            {
+                "load_seconds": load_seconds,
+                "wall": wall,
+                "operations": operations,
+                "durations": durations,
+                **counts,
+                "baseline_rss_mb": baseline,
+                "peak_rss_mb": _peak_rss_mb(),
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--protocol", dest="protocols", action="append",
+        help="Protocol directory (default: every protocol under tests/ and examples/).",
+    )
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--edits", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.sessions, args.concurrency, args.edits, args.seed)
+        return
+
+    rows = []
+    for protocol in args.protocols or _protocols():
+        output = subprocess.run(
+            [
+                sys.executable, "-m", __spec__.name,
+                "--child", protocol,
+                "--sessions", str(args.sessions),
+                "--concurrency", str(args.concurrency),
+                "--edits", str(args.edits),
+                "--seed", str(args.seed),
+            ],
+            cwd=REPO_ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        operations = [seconds * 1e3 for seconds in result["operations"]]
+        rows.append(
+            [
+                protocol,
+                result["runs"],
+                result["failed"],
+                f"{args.sessions / result['wall']:.1f}",
+                f"{len(operations) / result['wall']:.0f}",
+                f"{percentile(operations, 0.50):.2f}",
+                f"{percentile(operations, 0.95):.2f}",
+                f"{percentile(operations, 0.99):.2f}",
+                f"{percentile(result['durations'], 0.50) * 1e3:.1f}",
+                f"{result['peak_rss_mb'] - result['baseline_rss_mb']:.1f}",
+                f"{result['peak_rss_mb']:.1f}",
+            ]
+        )
+
+    print(
+        f"{args.sessions} sessions per protocol on {args.concurrency} threads, "
+        f"{args.edits} edits each"
+    )
+    print_table(
+        [
+            "protocol",
+            "assigner runs",
+            "failed",
+            "sessions/s",
+            "ops/s",
+            "op_p50_ms",
+            "op_p95_ms",
+            "op_p99_ms",
+            "session_p50_ms",
+            "rss_growth_mb",
+            "peak_rss_mb",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
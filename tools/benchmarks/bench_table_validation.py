@@ -0,0 +1,118 @@
+"""Rows/second of columnar vs. row-by-row validation of typed var tables.
+
+Generates `--rows` rows for the `students` (str/int/bool with `max_length` and
+`ge`) and `course_scores` (str/float/bool) tables of `test_typed_var_table`.
+A `--invalid-ratio` share of the rows is broken (too-long names, negative ages,
+missing columns) and as many again need pydantic coercion (`"18"` for an int).
+Both paths must report the same failing rows and values.
+
+    python -m tools.benchmarks.bench_table_validation
+    python -m tools.benchmarks.bench_table_validation --rows 1000000 --invalid-ratio 0
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from pydantic import BaseModel, TypeAdapter
+
+from tools.benchmarks._common import REPO_ROOT
+from tools.cli import print_table
+from tools.var_table import row_models, validate_rows, validate_table
+
+
+def student_rows(count: int, invalid_ratio: float, rng: random.Random) -> list[dict]:
+    rows = []
+    for i in range(count):
+        row = {"name": f"Student {i}", "age": rng.randint(6, 30), "enrolled": i % 3 != 0}
+        roll = rng.random()
+        if roll < invalid_ratio / 3:
+            row["name"] = "x" * 60
+        elif roll < invalid_ratio * 2 / 3:
+            row["age"] = -rng.randint(1, 5)
+        elif roll < invalid_ratio:
+            row.pop("name")
+            row["age"] = "unknown"
+        elif roll < invalid_ratio * 2:
+            row["age"] = str(row["age"])
+        rows.append(row)
+    return rows
+
+
+def course_rows(count: int, invalid_ratio: float, rng: random.Random) -> list[dict]:
+    rows = []
+    for i in range(count):
+        row = {
+            "course_name": f"Course {i % 40}",
+            "score": round(rng.uniform(0, 100), 1),
+            "passed": rng.random() < 0.8,
+        }
+        roll = rng.random()
+        if roll < invalid_ratio:
+            row["score"] = "n/a"
+        elif roll < invalid_ratio * 2:
+            row["score"] = int(row["score"])
+        rows.append(row)
+    return rows
+
+
+def _list_adapter(model: type[BaseModel], rows: list[dict]) -> None:
+    # Whole-table validation in a single pydantic-core call, for reference. It
+    # builds model instances and reports errors by location, so its output is
+    # not compared.
+    try:
+        TypeAdapter(list[model]).validate_python(rows)
+    except Exception:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--invalid-ratio", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    models = row_models(REPO_ROOT / "tests" / "test_typed_var_table")
+    rng = random.Random(args.seed)
+    tables = {
+        "students": student_rows(args.rows, args.invalid_ratio, rng),
+        "course_scores": course_rows(args.rows, args.invalid_ratio, rng),
+    }
+
+    rows = []
+    for name, table in tables.items():
+        model = models[name]
+        timings = {}
+        results = {}
+        for label, run in (
+            ("row-by-row", validate_rows),
+            ("columnar", validate_table),
+            ("TypeAdapter(list)", _list_adapter),
+        ):
+            started = time.perf_counter()
+            results[label] = run(model, table)
+            timings[label] = time.perf_counter() - started
+        reference, columnar = results["row-by-row"], results["columnar"]
+        if reference.errors != columnar.errors or reference.columns != columnar.columns:
+            raise SystemExit(f"{name}: columnar and row-by-row validation disagree")
+        for label, elapsed in timings.items():
+            rows.append(
+                [
+                    name,
+                    label,
+                    f"{elapsed:.3f}",
+                    f"{len(table) / elapsed:,.0f}",
+                    len(columnar.errors) if label != "TypeAdapter(list)" else "-",
+                    columnar.fallback_rows if label == "columnar" else "-",
+                ]
+            )
+    print_table(
+        ["table", "path", "seconds", "rows/s", "failed rows", "fallback rows"], rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Trace three protocols and print per-span p50/p95/p99; write a Chrome trace.
+
+- `test_multi_level_assigner`: initial load, the `b5` Assign button and a few
+  edits through `IncrementalSession`, every assigner traced (`--delay` sets
+  `b4`/`h6`/`h7`/`h8`).
+- `test_markdown_conversion`: `convert_docx`/`convert_pdf` against
+  `StubServer`, with `convert_file` traced inside them.
+- `test_aimd_image`: `extract_image_data` and `build_ai_description` traced
+  against `StubServer`.
+
+Also reports the tracing overhead per assigner call. The trace goes to the
+system temporary directory unless `--out` says otherwise.
+
+    python -m tools.benchmarks.bench_tracing --out trace.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from tools.assigner_graph import AssignerGraph
+from tools.benchmarks._common import MULTI_LEVEL_PROTOCOL, REPO_ROOT
+from tools.cli import print_table
+from tools.documents import make_docx, make_pdf, paragraphs, pdf_pages
+from tools.incremental import IncrementalSession
+from tools.protocol import load_assigners, load_defaults
+from tools.stubs import StubServer
+from tools.tracing import SUMMARY_HEADERS, Tracer
+
+
+CONVERSION_PROTOCOL = REPO_ROOT / "tests" / "test_markdown_conversion" / "protocol"
+EDITS = [{"a1": 5}, {"b4": 0}, {"f1": 4}, {"g2": 8}, {"h1": "omega"}, {"h6": 0}]
+
+
+def trace_multi_level(tracer: Tracer, delay: int) -> None:
+    graph = AssignerGraph(tracer.wrap(load_assigners(MULTI_LEVEL_PROTOCOL)))
+    defaults = load_defaults(MULTI_LEVEL_PROTOCOL)
+    defaults.update(b4=delay, h6=delay, h7=delay, h8=delay)
+    session = IncrementalSession(graph, defaults)
+    session.initialize()
+    session.assign("line_b5_manual")
+    for edit in EDITS:
+        session.update(edit)
+
+
+def trace_conversion(tracer: Tracer, stub: StubServer) -> None:
+    docx_id = "airalogy.id.file.00000000-0000-0000-0000-000000000001.docx"
+    pdf_id = "airalogy.id.file.00000000-0000-0000-0000-000000000002.pdf"
+    stub.files[docx_id] = make_docx(paragraphs(40, seed=1))
+    stub.files[pdf_id] = make_pdf(pdf_pages(3))
+    from tools import markdown_conversion
+
+    specs = {
+        spec.name: spec for spec in tracer.wrap(load_assigners(CONVERSION_PROTOCOL))
+    }
+    with tracer.patch(markdown_conversion, "convert_file"):
+        specs["convert_docx"].func({"docx_file_id": docx_id})
+        specs["convert_pdf"].func({"pdf_file_id": pdf_id})
+
+
+def trace_image(tracer: Tracer, stub: StubServer, images: int) -> None:
+    from tools import aimd_image
+
+    aimd = "\n".join(
+        f"![Image {i}](airalogy.id.file.{i:08d}-0000-0000-0000-000000000000.png)"
+        for i in range(images)
+    )
+    # The assigner itself always calls DashScope; drive its two steps directly.
+    with tracer.patch(aimd_image, "extract_image_data", "build_ai_description"):
+        with tracer.span("extract_and_describe (stub)", "assigner"):
+            _, urls = aimd_image.extract_image_data(aimd)
+            aimd_image.build_ai_description(aimd, urls, api_key="stub", base_url=stub.openai_base_url)
+
+
+def overhead_us(calls: int) -> tuple[float, float]:
+    specs = {spec.name: spec for spec in load_assigners(MULTI_LEVEL_PROTOCOL)}
+    plain = specs["line_a3"]
+    (traced,) = Tracer().wrap([plain])
+    timings = []
+    for spec in (plain, traced):
+        started = time.perf_counter()
+        for i in range(calls):
+            spec.func({"a1": i, "a2": 4})
+        timings.append((time.perf_counter() - started) / calls * 1e6)
+    return timings[0], timings[1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "airalogy-trace.json",
+        help="Chrome trace JSON output path (default: %(default)s).",
+    )
+    parser.add_argument("--delay", type=int, default=1)
+    parser.add_argument("--images", type=int, default=8)
+    args = parser.parse_args()
+
+    tracer = Tracer()
+    trace_multi_level(tracer, args.delay)
+    with StubServer(file_url_latency=0.02, completion_latency=0.2) as stub:
+        stub.install_env()
+        trace_conversion(tracer, stub)
+        trace_image(tracer, stub, args.images)
+
+    tracer.write_chrome_trace(args.out)
+    print_table(SUMMARY_HEADERS, tracer.summary())
+    plain, traced = overhead_us(20_000)
+    print(
+        f"\n{len(tracer.spans)} spans written to {args.out}; tracing overhead "
+        f"{traced - plain:.1f} us/call ({plain:.1f} -> {traced:.1f} us for line_a3)"
+    )
+
+
+if __name__ == "__main__":
+    main()
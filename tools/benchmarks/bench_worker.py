@@ -0,0 +1,251 @@
+"""Session-start latency and per-session memory at 1k concurrent sessions: per-session loading vs. `ProtocolWorker`.
+
+Sessions are spread round-robin over `--protocol` directories (by default
+`meeting_notes` in English and Chinese, `diary` and
+`test_multi_level_assigner`), started from `--concurrency` threads and all
+kept open; each then applies `--edits` edits of fields no assigner writes.
+
+- per-session load: every session start loads `protocol.aimd`,
+  `protocol.toml` and `assigner.py` itself, builds the assigner graph and
+  runs the initial cascade in its own `IncrementalSession`;
+- worker: `ProtocolWorker.open_session`, loading each protocol once and
+  starting sessions from the shared baseline.
+
+Each path runs in a fresh subprocess. Start latency and RSS growth come from
+a first pass; retained bytes per session from a second pass of the same
+sessions under `tracemalloc` (for the worker, with its protocols loaded).
+
+    python -m tools.benchmarks.bench_worker --sessions 1000 --concurrency 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from tools.benchmarks._common import REPO_ROOT
+from tools.cli import percentile, print_table
+
+
+DEFAULT_PROTOCOLS = [
+    "examples/meeting_notes/en",
+    "examples/meeting_notes/zh",
+    "examples/diary",
+    "tests/test_multi_level_assigner",
+]
+# Delays of the sleeping `test_multi_level_assigner` assigners; never edited.
+FIXED_FIELDS = {"b4", "h6", "h7", "h8"}
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class PerSessionLoad:
+    """What a worker without shared state does on every session start."""
+
+    def __init__(self) -> None:
+        self.sessions: dict[int, Any] = {}
+
+    def open_session(self, protocol_dir: str, index: int) -> None:
+        from tools.assigner_graph import AssignerGraph
+        from tools.incremental import IncrementalSession
+        from tools.protocol import load_assigners, load_defaults, load_metadata
+
+        load_metadata(protocol_dir)
+        session = IncrementalSession(
+            AssignerGraph(load_assigners(protocol_dir)), load_defaults(protocol_dir)
+        )
+        session.initialize()
+        self.sessions[index] = session
+
+    def update(self, index: int, changes: dict[str, Any]) -> None:
+        self.sessions[index].update(changes)
+
+    def close(self) -> None:
+        self.sessions.clear()
+
+
+class SharedWorker:
+    def __init__(self) -> None:
+        from tools.worker import ProtocolWorker
+
+        self.worker = ProtocolWorker()
+        self.sessions: dict[int, int] = {}
+
+    def open_session(self, protocol_dir: str, index: int) -> None:
+        self.sessions[index], _ = self.worker.open_session(protocol_dir)
+
+    def update(self, index: int, changes: dict[str, Any]) -> None:
+        self.worker.update(self.sessions[index], changes)
+
+    def close(self) -> None:
+        for session_id in self.sessions.values():
+            self.worker.close_session(session_id)
+        self.sessions.clear()
+
+
+def _editable(protocol_dir: str) -> list[tuple[str, Any]]:
+    """Fields a user types into, with their default as a sample of their kind of value."""
+    from tools.bundle import load_bundle
+
+    bundle = load_bundle(protocol_dir)
+    assigned = {name for spec in bundle.load_assigners() for name in spec.assigned_fields}
+    defaults = bundle.defaults()
+    return [
+        (var["name"], defaults.get(var["name"]))
+        for var in bundle.var_schema
+        if var["name"] not in assigned
+        and var["name"] not in FIXED_FIELDS
+        and isinstance(defaults.get(var["name"]), (int, str, type(None)))
+    ]
+
+
+def _run(
+    path: PerSessionLoad | SharedWorker,
+    protocols: list[str],
+    editable: dict[str, list[tuple[str, Any]]],
+    sessions: int,
+    concurrency: int,
+    edits: int,
+    seed: int,
+) -> list[float]:
+    def start(index: int) -> float:
+        started = time.perf_counter()
+        path.open_session(protocols[index % len(protocols)], index)
+        return time.perf_counter() - started
+
+    def edit(index: int) -> None:
+        rng = random.Random(seed * 1_000_003 + index)
+        fields = editable[protocols[index % len(protocols)]]
+        for _ in range(edits if fields else 0):
+            name, sample = rng.choice(fields)
+            if type(sample) is int:
+                value = rng.randrange(1, 10)
+            else:
+                value = f"session {index}: note {rng.randrange(10**6)}"
+            path.update(index, {name: value})
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(start, range(sessions)))
+        list(pool.map(edit, range(sessions)))
+    return latencies
+
+
+def child(
+    kind: str, protocols: list[str], sessions: int, concurrency: int, edits: int, seed: int
+) -> None:
+    editable = {protocol: _editable(protocol) for protocol in protocols}
+    gc.collect()
+    path = PerSessionLoad() if kind == "per-session load" else SharedWorker()
+
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+    latencies = _run(path, protocols, editable, sessions, concurrency, edits, seed)
+    wall = time.perf_counter() - started
+    peak = _peak_rss_mb()
+
+    path.close()
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    _run(path, protocols, editable, sessions, concurrency, edits, seed)
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = path.worker.stats() if isinstance(path, SharedWorker) else {}
+    print(
+        json.dumps(
+            {
+                "latencies": latencies,
+                "wall": wall,
+                "rss_growth_mb": peak - baseline,
+                "bytes_per_session": (retained - before) / sessions,
+                "loads": stats.get("loads", sessions),
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--protocol", dest="protocols", action="append",
+        help=f"Protocol directory (default: {', '.join(DEFAULT_PROTOCOLS)}).",
+    )
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--edits", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    protocols = args.protocols or DEFAULT_PROTOCOLS
+
+    if args.child:
+        child(args.child, protocols, args.sessions, args.concurrency, args.edits, args.seed)
+        return
+
+    rows = []
+    for kind in ("per-session load", "worker"):
+        output = subprocess.run(
+            [
+                sys.executable, "-m", __spec__.name,
+                "--child", kind,
+                *(option for protocol in protocols for option in ("--protocol", protocol)),
+                "--sessions", str(args.sessions),
+                "--concurrency", str(args.concurrency),
+                "--edits", str(args.edits),
+                "--seed", str(args.seed),
+            ],
+            cwd=REPO_ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        latencies = [seconds * 1e3 for seconds in result["latencies"]]
+        rows.append(
+            [
+                kind,
+                result["loads"],
+                f"{percentile(latencies, 0.50):.3f}",
+                f"{percentile(latencies, 0.99):.3f}",
+                f"{max(latencies):.1f}",
+                f"{args.sessions / result['wall']:.0f}",
+                f"{result['bytes_per_session'] / 1024:.1f}",
+                f"{result['rss_growth_mb']:.1f}",
+            ]
+        )
+
+    print(
+        f"{args.sessions} open sessions over {len(protocols)} protocols on "
+        f"{args.concurrency} threads, {args.edits} edits each"
+    )
+    print_table(
+        [
+            "path",
+            "protocol loads",
+            "start_p50_ms",
+            "start_p99_ms",
+            "start_max_ms",
+            "sessions/s",
+            "kib/session",
+            "rss_growth_mb",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Precompiled protocol bundles.
+
+A bundle packs everything needed to load a protocol directory into one file:
+the `protocol.toml` metadata, the parsed AIMD var schema and the compiled
+code of `assigner.py`, stamped with the size, mtime and SHA-256 of every
+source file and with the Python and `airalogy` versions that built it.
+Loading reads that one file; the bundle is rebuilt automatically when a
+source file's hash or either version changes, and restamped when a file was
+only touched. The assigners themselves come from executing the bundled
+code, since their functions cannot be stored.
+
+    python -m tools.bundle build tests/test_multi_level_assigner examples/diary
+    python -m tools.bundle check tests/test_multi_level_assigner
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import marshal
+import os
+import pickle
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import airalogy
+
+from tools.protocol import (
+    AssignerSpec,
+    _import_assigners,
+    defaults_from_vars,
+    load_metadata,
+    resolve_protocol_dir,
+)
+
+
+BUNDLE_FORMAT_VERSION = 4
+BUNDLE_NAME = "protocol.bundle"
+_MAGIC = b"AIRALOGY-PROTOCOL-BUNDLE"
+_SOURCES = ("protocol.aimd", "protocol.toml", "assigner.py")
+
+
+@dataclass(frozen=True)
+class SourceStamp:
+    size: int
+    mtime_ns: int
+    sha256: str
+
+
+@dataclass
+class ProtocolBundle:
+    protocol_dir: Path
+    sources: dict[str, SourceStamp]
+    metadata: dict[str, Any]
+    var_schema: list[dict[str, Any]]
+    assigner_code: bytes | None
+    python_version: str = field(default=sys.version.split()[0])
+    # The parsed var schema and the assigner decorators come from airalogy.
+    airalogy_version: str = field(default=airalogy.__version__)
+
+    def defaults(self) -> dict[str, Any]:
+        return defaults_from_vars(self.var_schema)
+
+    def load_assigners(self) -> list[AssignerSpec]:
+        """Execute the bundled `assigner.py` code and return its assigners."""
+        if self.assigner_code is None:
+            return []
+        _, specs = _import_assigners(
+            self.protocol_dir / "assigner.py", marshal.loads(self.assigner_code)
+        )
+        return specs
+
+
+def bundle_path(protocol_dir: str | Path) -> Path:
+    # `__pycache__` is already ignored by git, and it is where Python keeps
+    # the analogous bytecode cache.
+    return resolve_protocol_dir(protocol_dir) / "__pycache__" / BUNDLE_NAME
+
+
+def _stamp(path: Path, data: bytes | None = None) -> SourceStamp:
+    stat = path.stat()
+    if data is None:
+        data = path.read_bytes()
+    return SourceStamp(stat.st_size, stat.st_mtime_ns, hashlib.sha256(data).hexdigest())
+
+
+def build_bundle(protocol_dir: str | Path) -> ProtocolBundle:
+    """Compile a protocol directory and write its bundle next to the sources."""
+    from airalogy.markdown import extract_vars
+
+    protocol_dir = resolve_protocol_dir(protocol_dir).resolve()
+    sources: dict[str, SourceStamp] = {}
+    contents: dict[str, bytes] = {}
+    for name in _SOURCES:
+        path = protocol_dir / name
+        if path.is_file():
+            contents[name] = path.read_bytes()
+            sources[name] = _stamp(path, contents[name])
+
+    assigner_code = None
+    if "assigner.py" in contents:
+        code = compile(contents["assigner.py"], str(protocol_dir / "assigner.py"), "exec")
+        assigner_code = marshal.dumps(code)
+
+    bundle = ProtocolBundle(
+        protocol_dir=protocol_dir,
+        sources=sources,
+        metadata=load_metadata(protocol_dir),
+        var_schema=extract_vars(contents["protocol.aimd"].decode("utf-8"))["vars"],
+        assigner_code=assigner_code,
+    )
+    _write(bundle)
+    return bundle
+
+
+def _write(bundle: ProtocolBundle) -> None:
+    path = bundle_path(bundle.protocol_dir)
+    path.parent.mkdir(exist_ok=True)
+    payload = pickle.dumps(
+        (BUNDLE_FORMAT_VERSION, bundle), protocol=pickle.HIGHEST_PROTOCOL
+    )
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_bytes(_MAGIC + payload)
+    os.replace(tmp_path, path)
+
+
+def _read(path: Path) -> ProtocolBundle | None:
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    if not data.startswith(_MAGIC):
+        return None
+    try:
+        version, bundle = pickle.loads(memoryview(data)[len(_MAGIC) :])
+    except Exception:
+        return None
+    if (
+        version != BUNDLE_FORMAT_VERSION
+        or bundle.python_version != sys.version.split()[0]
+        or bundle.airalogy_version != airalogy.__version__
+    ):
+        return None
+    return bundle
+
+
+def stale_sources(bundle: ProtocolBundle) -> list[str]:
+    """Source files whose content no longer matches the bundle."""
+    return check_sources(bundle)[0]
+
+
+def check_sources(
+    bundle: ProtocolBundle,
+) -> tuple[list[str], dict[str, SourceStamp]]:
+    """Stale source files, and fresh stamps for files only touched since the build.
+
+    The bundle is left as is; store the fresh stamps in `bundle.sources` (and
+    write it) so that later checks trust their size and mtime again.
+    """
+    stale = []
+    restamped = {}
+    for name in _SOURCES:
+        path = bundle.protocol_dir / name
+        stamp = bundle.sources.get(name)
+        if stamp is None or not path.is_file():
+            if (stamp is None) != (not path.is_file()):
+                stale.append(name)
+            continue
+        stat = path.stat()
+        # Like `.pyc` files, trust an unchanged size and mtime; otherwise
+        # compare content hashes, so that a mere `touch` does not rebuild.
+        if stat.st_size == stamp.size and stat.st_mtime_ns == stamp.mtime_ns:
+            continue
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        if digest != stamp.sha256:
+            stale.append(name)
+        else:
+            restamped[name] = SourceStamp(stat.st_size, stat.st_mtime_ns, digest)
+    return stale, restamped
+
+
+def load_bundle(protocol_dir: str | Path) -> ProtocolBundle:
+    """Load a protocol from its bundle, (re)building the bundle when it is stale."""
+    protocol_dir = resolve_protocol_dir(protocol_dir).resolve()
+    bundle = _read(bundle_path(protocol_dir))
+    if bundle is None or bundle.protocol_dir != protocol_dir:
+        return build_bundle(protocol_dir)
+    stale, restamped = check_sources(bundle)
+    if stale:
+        return build_bundle(protocol_dir)
+    if restamped:
+        bundle.sources.update(restamped)
+        _write(bundle)
+    return bundle
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["build", "check"])
+    parser.add_argument("protocols", nargs="+", type=Path)
+    args = parser.parse_args()
+
+    failed = False
+    for protocol_dir in args.protocols:
+        path = bundle_path(protocol_dir)
+        if args.command == "build":
+            bundle = build_bundle(protocol_dir)
+            print(
+                f"{path}: {path.stat().st_size} bytes, {len(bundle.var_schema)} vars, "
+                f"{len(bundle.load_assigners())} assigners"
+            )
+            continue
+        bundle = _read(path)
+        if bundle is None:
+            print(f"{path}: missing or unreadable")
+            failed = True
+        elif stale := stale_sources(bundle):
+            print(f"{path}: stale ({', '.join(stale)} changed)")
+            failed = True
+        else:
+            print(f"{path}: up to date")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Helpers shared by the command-line tools and the benchmarks."""
+
+from __future__ import annotations
+
+import ast
+import math
+from typing import Any
+
+
+def parse_overrides(items: list[str]) -> dict[str, Any]:
+    """Turn `["b4=2", "h1=alpha"]` into `{"b4": 2, "h1": "alpha"}`."""
+    overrides: dict[str, Any] = {}
+    for item in items:
+        name, sep, raw = item.partition("=")
+        if not sep:
+            raise ValueError(f"Expected NAME=VALUE, got {item!r}")
+        try:
+            overrides[name] = ast.literal_eval(raw)
+        except (ValueError, SyntaxError):
+            overrides[name] = raw
+    return overrides
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Nearest-rank percentile, `q` in [0, 1]."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def print_table(headers: list[str], rows: list[list[Any]]) -> None:
+    cells = [headers] + [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for index, row in enumerate(cells):
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+        if index == 0:
+            print("  ".join("-" * width for width in widths))
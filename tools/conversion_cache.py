@@ -0,0 +1,68 @@
+"""Inspect and prune the conversion cache of `tools.markdown_conversion`.
+
+    python -m tools.conversion_cache --dir ~/.cache/md_conversion stats
+    python -m tools.conversion_cache --dir ~/.cache/md_conversion list
+    python -m tools.conversion_cache --dir ~/.cache/md_conversion prune --max-bytes 100000000
+    python -m tools.conversion_cache --dir ~/.cache/md_conversion clear
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from tools.markdown_conversion import ConversionCache
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--dir",
+        default=os.environ.get("MARKDOWN_CONVERSION_CACHE_DIR"),
+        help="Cache directory (default: $MARKDOWN_CONVERSION_CACHE_DIR).",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Entry count and total size.")
+    commands.add_parser("list", help="Entries, least recently used first.")
+    prune = commands.add_parser("prune", help="Evict LRU entries down to a size.")
+    prune.add_argument("--max-bytes", type=int, required=True)
+    commands.add_parser("clear", help="Remove every entry.")
+    args = parser.parse_args()
+    if not args.dir:
+        parser.error("--dir is required when MARKDOWN_CONVERSION_CACHE_DIR is unset")
+
+    cache = ConversionCache(Path(args.dir).expanduser())
+
+    if args.command == "stats":
+        entries = cache.entries()
+        print(
+            json.dumps(
+                {
+                    "directory": str(cache.directory),
+                    "entries": len(entries),
+                    "bytes": sum(stat.st_size for _, stat in entries),
+                },
+                indent=2,
+            )
+        )
+    elif args.command == "list":
+        for path, stat in cache.entries():
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            last_used = datetime.fromtimestamp(stat.st_mtime)
+            backend = f"{entry['backend']}=={entry['backend_version']}"
+            print(
+                f"{path.stem[:16]}  {stat.st_size:>10}  "
+                f"{last_used.isoformat(timespec='seconds')}  {backend}  "
+                f"{entry['source_filename']}"
+            )
+    elif args.command == "prune":
+        print(f"Removed {cache.prune(args.max_bytes)} entries.")
+    elif args.command == "clear":
+        print(f"Removed {cache.prune(0)} entries.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from typing import Any
+
+from tools.incremental import IncrementalSession, UpdateReport
+
+
+class DebouncedTriggerQueue:
+    """Debounces field edits before handing them to an `IncrementalSession`.
+
+    Each edit to a field (re)starts that field's quiet `window`; only the
+    latest value is kept. When `poll` finds fields whose window has passed,
+    it applies them in one `session.update`, so the downstream cascade runs
+    once per settled state. Pending fields that feed an assigner in the same
+    cascade form one group, held until every field of the group has settled:
+    applying the settled ones first would run that assigner on a value that
+    is still being typed, and again a moment later.
+
+    Time comes from `clock` (seconds); `edit` and `poll` also take an explicit
+    `now`, which lets recorded edit timelines be replayed without sleeping.
+    """
+
+    def __init__(
+        self,
+        session: IncrementalSession,
+        window: float = 0.3,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.session = session
+        self.window = window
+        self.clock = clock
+        self._pending: dict[str, Any] = {}
+        self._deadline: dict[str, float] = {}
+
+    def edit(self, changes: dict[str, Any], now: float | None = None) -> None:
+        now = self.clock() if now is None else now
+        for name, value in changes.items():
+            self._pending[name] = value
+            self._deadline[name] = now + self.window
+
+    def next_deadline(self) -> float | None:
+        """When the next group of pending fields settles, or None if nothing is pending."""
+        return min(
+            (max(self._deadline[name] for name in group) for group in self._groups()),
+            default=None,
+        )
+
+    def _cone(self, fields: set[str]) -> set[str]:
+        return {spec.name for spec in self.session.triggered(fields)}
+
+    def _groups(self) -> list[set[str]]:
+        """Pending fields, grouped by overlapping downstream cones."""
+        groups: list[tuple[set[str], set[str]]] = []
+        for name in sorted(self._pending):
+            fields, cone = {name}, self._cone({name})
+            for group in [group for group in groups if not group[1].isdisjoint(cone)]:
+                groups.remove(group)
+                fields |= group[0]
+                cone |= group[1]
+            groups.append((fields, cone))
+        return [fields for fields, _ in groups]
+
+    def _apply(self, fields: set[str]) -> UpdateReport:
+        changes = {name: self._pending.pop(name) for name in sorted(fields)}
+        for name in fields:
+            del self._deadline[name]
+        return self.session.update(changes)
+
+    def poll(self, now: float | None = None) -> UpdateReport | None:
+        """Apply the groups that have wholly settled by `now`; None if none have."""
+        now = self.clock() if now is None else now
+        due = {
+            name
+            for group in self._groups()
+            if all(self._deadline[name] <= now for name in group)
+            for name in group
+        }
+        if not due:
+            return None
+        return self._apply(due)
+
+    def flush(self) -> UpdateReport | None:
+        """Apply every pending edit now, e.g. before the record is submitted."""
+        if not self._pending:
+            return None
+        return self._apply(set(self._pending))
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from airalogy.assigner import AssignerResult
+
+from tools.assigner_graph import AssignerGraph
+from tools.protocol import AssignerSpec
+
+
+@dataclass
+class RunReport:
+    values: dict[str, Any]
+    results: dict[str, AssignerResult] = field(default_factory=dict)
+    skipped: list[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def failed(self) -> dict[str, str]:
+        return {
+            name: result.error_message or ""
+            for name, result in self.results.items()
+            if not result.success
+        }
+
+
+def _is_ready(spec: AssignerSpec, values: dict[str, Any]) -> bool:
+    return all(values.get(field) is not None for field in spec.dependent_fields)
+
+
+def _inputs(spec: AssignerSpec, values: dict[str, Any]) -> dict[str, Any]:
+    return {field: values[field] for field in spec.dependent_fields}
+
+
+def _call(spec: AssignerSpec, inputs: dict[str, Any]) -> AssignerResult:
+    """Run one assigner; an exception it raises becomes a failed result."""
+    try:
+        return spec.func(inputs)
+    except Exception as e:
+        return AssignerResult(success=False, error_message=repr(e))
+
+
+def _record(
+    report: RunReport, spec: AssignerSpec, result: AssignerResult
+) -> None:
+    report.results[spec.name] = result
+    if result.success and result.assigned_fields:
+        # An assigner may leave some of its declared fields unset.
+        report.values.update(
+            {
+                field: result.assigned_fields[field]
+                for field in spec.assigned_fields
+                if field in result.assigned_fields
+            }
+        )
+
+
+def _runnable(graph: AssignerGraph, include_manual: bool) -> list[list[AssignerSpec]]:
+    return [
+        [spec for spec in level if include_manual or spec.mode != "manual"]
+        for level in graph.levels()
+    ]
+
+
+def run_serial(
+    graph: AssignerGraph,
+    values: dict[str, Any],
+    *,
+    include_manual: bool = True,
+) -> RunReport:
+    """Run every assigner once, one at a time, in topological order."""
+    report = RunReport(values=dict(values))
+    started = time.perf_counter()
+    for level in _runnable(graph, include_manual):
+        for spec in level:
+            if not _is_ready(spec, report.values):
+                report.skipped.append(spec.name)
+                continue
+            _record(report, spec, _call(spec, _inputs(spec, report.values)))
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def run_level_parallel(
+    graph: AssignerGraph,
+    values: dict[str, Any],
+    *,
+    include_manual: bool = True,
+    max_workers: int | None = None,
+) -> RunReport:
+    """Run every assigner once; all ready assigners of a level share a thread pool."""
+    report = RunReport(values=dict(values))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for level in _runnable(graph, include_manual):
+            ready = []
+            for spec in level:
+                if _is_ready(spec, report.values):
+                    ready.append(spec)
+                else:
+                    report.skipped.append(spec.name)
+            # Assigners of one level never read each other's outputs, so their
+            # inputs can all be taken before any of them runs.
+            futures = [
+                (spec, pool.submit(_call, spec, _inputs(spec, report.values)))
+                for spec in ready
+            ]
+            for spec, future in futures:
+                _record(report, spec, future.result())
+    report.elapsed = time.perf_counter() - started
+    return report
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from airalogy.assigner import AssignerResult
+
+from tools.assigner_graph import AssignerGraph
+from tools.memo import AssignerMemo
+from tools.protocol import AssignerSpec
+
+
+@dataclass
+class UpdateReport:
+    changed: list[str]
+    ran: list[str] = field(default_factory=list)
+    memo_hits: list[str] = field(default_factory=list)
+    cut_off: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+class IncrementalSession:
+    """Keeps the last field values of one record and reruns only what an edit affects.
+
+    Trigger semantics follow the assigner modes:
+
+    - `auto` reruns whenever one of its dependent fields changes;
+    - `auto_first` runs once and is never rerun after its first success;
+    - `manual` never runs on its own (see `assign`), so propagation stops there.
+
+    With a `memo`, assigners whose inputs were seen before (for the same
+    `protocol_version`) reuse the cached outputs instead of running. With
+    `early_cutoff`, an assigner whose outputs come out unchanged does not
+    trigger its downstream assigners.
+    """
+
+    def __init__(
+        self,
+        graph: AssignerGraph,
+        values: dict[str, Any] | None = None,
+        *,
+        memo: AssignerMemo | None = None,
+        protocol_version: str = "",
+        early_cutoff: bool = False,
+    ):
+        self.graph = graph
+        self.values: dict[str, Any] = dict(values or {})
+        self.completed_auto_first: set[str] = set()
+        self.memo = memo
+        self.protocol_version = protocol_version
+        self.early_cutoff = early_cutoff
+
+    def _call(self, spec: AssignerSpec, report: UpdateReport) -> AssignerResult:
+        inputs = {name: self.values[name] for name in spec.dependent_fields}
+        if self.memo is None or not self.memo.enabled_for(spec.name):
+            report.ran.append(spec.name)
+            return spec.func(inputs)
+
+        key = self.memo.key(spec.name, self.protocol_version, inputs)
+        outputs = self.memo.get(key)
+        if outputs is not None:
+            report.memo_hits.append(spec.name)
+            return AssignerResult(assigned_fields=outputs)
+        report.ran.append(spec.name)
+        result = spec.func(inputs)
+        if result.success:
+            outputs = {
+                name: result.assigned_fields[name] for name in spec.assigned_fields
+            }
+            self.memo.put(key, outputs)
+        return result
+
+    def _run(self, spec: AssignerSpec, report: UpdateReport) -> set[str] | None:
+        """Run one assigner; return the fields it changed, or None if it failed."""
+        result = self._call(spec, report)
+        if not result.success:
+            report.failed[spec.name] = result.error_message or ""
+            return None
+        if spec.mode == "auto_first":
+            self.completed_auto_first.add(spec.name)
+        outputs = {name: result.assigned_fields[name] for name in spec.assigned_fields}
+        changed = {
+            name
+            for name, value in outputs.items()
+            if not self.early_cutoff
+            or name not in self.values
+            or self.values[name] != value
+        }
+        self.values.update(outputs)
+        if not changed:
+            report.cut_off.append(spec.name)
+        return changed
+
+    def _is_ready(self, spec: AssignerSpec) -> bool:
+        return all(self.values.get(name) is not None for name in spec.dependent_fields)
+
+    def triggered(self, fields: set[str]) -> list[AssignerSpec]:
+        """The assigners an edit of `fields` triggers now, in topological order."""
+        return self.graph.triggered(
+            fields,
+            skip=self.graph.mask(self.completed_auto_first),
+        )
+
+    def _propagate(self, dirty: set[str], report: UpdateReport) -> None:
+        for spec in self.triggered(dirty):
+            # The cone is computed up front; an upstream failure, an early
+            # cutoff or a missing input can still leave a member's inputs
+            # unchanged, so skip it.
+            if dirty.isdisjoint(spec.dependent_fields) or not self._is_ready(spec):
+                continue
+            dirty.update(self._run(spec, report) or ())
+
+    def initialize(self) -> UpdateReport:
+        """Run every triggerable assigner whose inputs are present, as on first load."""
+        report = UpdateReport(changed=[])
+        started = time.perf_counter()
+        dirty = {name for name, value in self.values.items() if value is not None}
+        self._propagate(dirty, report)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def update(self, changes: dict[str, Any]) -> UpdateReport:
+        """Apply user edits and rerun the downstream cone of the fields that changed."""
+        report = UpdateReport(
+            changed=[
+                name
+                for name, value in changes.items()
+                if name not in self.values or self.values[name] != value
+            ]
+        )
+        started = time.perf_counter()
+        self.values.update(changes)
+        self._propagate(set(report.changed), report)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def assign(self, name: str) -> UpdateReport:
+        """Run an assigner on demand (the Assign button) and propagate its outputs.
+
+        An assigner whose dependent fields are not all set is not run; it is
+        reported in `failed` with the missing fields.
+        """
+        spec = self.graph.specs[name]
+        report = UpdateReport(changed=[])
+        started = time.perf_counter()
+        if not self._is_ready(spec):
+            missing = [f for f in spec.dependent_fields if self.values.get(f) is None]
+            report.failed[name] = f"missing dependent fields: {', '.join(missing)}"
+            report.elapsed = time.perf_counter() - started
+            return report
+        changed = self._run(spec, report)
+        if changed:
+            report.changed = sorted(changed)
+            self._propagate(changed, report)
+        report.elapsed = time.perf_counter() - started
+        return report
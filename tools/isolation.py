@@ -0,0 +1,122 @@
+"""Run each assigner inline, on a thread pool or on a warm process pool.
+
+The policy of an assigner is its `AssignerSpec.execution`, declared in the
+protocol's `assigner.py` next to the `@assigner` functions:
+
+    ASSIGNER_EXECUTION = {
+        "line_b_slow_auto": "thread",  # blocks (sleeps, waits on I/O)
+        "convert_pdf": "process",  # CPU-bound; would hold the GIL
+    }
+
+Assigners not listed run `inline`, in the caller's thread. Process workers
+import the protocol themselves from `AssignerSpec.path` and call the function
+by name, so only the inputs and the `AssignerResult` cross the process
+boundary. Workers are started up front (`warm`) and keep their imported
+protocols for their lifetime, so no call pays for a fork or an import.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import multiprocessing
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from airalogy.assigner import AssignerResult
+
+from tools.protocol import AssignerSpec, _import_assigners
+
+
+# Protocols imported by this process when it is a pool worker.
+_WORKER_ASSIGNERS: dict[Path, dict[str, Callable]] = {}
+
+
+def _worker_assigners(path: Path) -> dict[str, Callable]:
+    assigners = _WORKER_ASSIGNERS.get(path)
+    if assigners is None:
+        _, specs = _import_assigners(path)
+        assigners = _WORKER_ASSIGNERS[path] = {spec.name: spec.func for spec in specs}
+    return assigners
+
+
+def _preload(paths: tuple[Path, ...]) -> None:
+    for path in paths:
+        _worker_assigners(path)
+
+
+def _call(path: Path, name: str, inputs: dict[str, Any]) -> AssignerResult:
+    return _worker_assigners(path)[name](inputs)
+
+
+class AssignerRunner:
+    """Submits assigner calls according to their execution policy.
+
+    `submit` returns a `Future[AssignerResult]` whatever the policy; an
+    inline call has already finished when it returns. Exceptions raised by an
+    assigner are re-raised by `Future.result()` as they would be inline.
+    `preload` lists `assigner.py` paths every process worker imports on start.
+    """
+
+    def __init__(
+        self,
+        *,
+        thread_workers: int | None = None,
+        process_workers: int | None = None,
+        preload: Iterable[str | Path] = (),
+    ):
+        self.process_workers = process_workers or os.cpu_count() or 1
+        self._threads = ThreadPoolExecutor(
+            max_workers=thread_workers, thread_name_prefix="assigner"
+        )
+        # `forkserver`: forking a process that already runs threads (this
+        # pool, HTTP clients, ...) can deadlock the child.
+        self._processes = ProcessPoolExecutor(
+            max_workers=self.process_workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=_preload,
+            initargs=(tuple(Path(path).resolve() for path in preload),),
+        )
+
+    def warm(self) -> None:
+        """Start every process worker now rather than on its first call."""
+        futures = [self._processes.submit(os.getpid) for _ in range(self.process_workers)]
+        for future in futures:
+            future.result()
+
+    def submit(self, spec: AssignerSpec, inputs: dict[str, Any]) -> Future[AssignerResult]:
+        if spec.execution == "thread":
+            return self._threads.submit(spec.func, inputs)
+        if spec.execution == "process":
+            if spec.path is None:
+                raise ValueError(f"{spec.name} has no assigner.py to import in a worker")
+            return self._processes.submit(_call, spec.path.resolve(), spec.name, inputs)
+        future: Future[AssignerResult] = Future()
+        try:
+            future.set_result(spec.func(inputs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def wrap(self, specs: Iterable[AssignerSpec]) -> list[AssignerSpec]:
+        """Copies of `specs` whose functions run through this runner and wait."""
+        return [
+            dataclasses.replace(spec, func=self._blocking(spec)) for spec in specs
+        ]
+
+    def _blocking(self, spec: AssignerSpec) -> Callable:
+        if spec.execution == "inline":
+            return spec.func
+        return lambda inputs: self.submit(spec, inputs).result()
+
+    def close(self) -> None:
+        self._threads.shutdown(wait=True, cancel_futures=True)
+        self._processes.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> AssignerRunner:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,379 @@
+"""Document conversion behind `test_markdown_conversion`, outside the protocol itself.
+
+`convert_docx` and `convert_pdf` in
+`tests/test_markdown_conversion/protocol/assigner.py` turn an upload into
+Markdown with `convert_file`. Set `MARKDOWN_CONVERSION_CACHE_DIR` to reuse
+the conversions of byte-identical uploads (`ConversionCache`, inspected with
+`python -m tools.conversion_cache`). `iter_pdf_markdown` streams a PDF page
+by page, and `convert_batch` converts many uploads on a process pool.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+from airalogy import Airalogy
+
+
+@functools.cache
+def _airalogy_client() -> Airalogy:
+    # Created on first use so that importing this module needs no credentials.
+    return Airalogy()
+
+
+DEFAULT_BACKEND = "markitdown"
+_BATCH_DOWNLOAD_WORKERS = 8
+
+# Set to a directory to reuse conversions of byte-identical uploads.
+_CACHE_DIR_ENV = "MARKDOWN_CONVERSION_CACHE_DIR"
+_CACHE_MAX_BYTES_ENV = "MARKDOWN_CONVERSION_CACHE_MAX_BYTES"
+_DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _load_to_markdown() -> Callable[..., Any]:
+    try:
+        from airalogy.convert import to_markdown
+    except ImportError as exc:
+        raise RuntimeError(
+            "Document conversion API is unavailable in this runtime. "
+            "Please upgrade Airalogy to a version that provides `airalogy.convert.to_markdown`, "
+            "and install `airalogy[markitdown]` for PDF/DOCX support. "
+            f"Import error: {exc}"
+        ) from exc
+    return to_markdown
+
+
+def _backend_version(backend: str) -> str:
+    try:
+        return metadata.version(backend)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class ConversionCache:
+    """Content-addressed store of conversion results on local disk.
+
+    Entries are keyed by the SHA-256 of the document bytes plus the backend name
+    and version, so re-uploads of the same document (new file ID, same bytes)
+    are not converted again. Each entry is one JSON file; when the directory
+    grows past `max_bytes`, the least recently used entries are removed. The
+    directory is scanned once to learn its size, which writes then keep
+    track of, so it is only scanned again when that size goes over the limit.
+    """
+
+    def __init__(
+        self, directory: str | Path, max_bytes: int = _DEFAULT_CACHE_MAX_BYTES
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size: int | None = None
+
+    @staticmethod
+    def key(data: bytes, backend: str = DEFAULT_BACKEND) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        return hashlib.sha256(
+            f"{digest}:{backend}:{_backend_version(backend)}".encode()
+        ).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            os.utime(path)  # mark as recently used
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: dict[str, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self._size is None:
+            self._size = self.size_bytes()
+        path = self._path(key)
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        # Write to a temporary file first so readers never see a partial entry.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+                written = f.tell()
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self._size += written - replaced
+        if self._size > self.max_bytes:
+            self.prune(self.max_bytes)
+
+    def entries(self) -> list[tuple[Path, os.stat_result]]:
+        """Cached entries, least recently used first."""
+        if not self.directory.is_dir():
+            return []
+        found = [(path, path.stat()) for path in self.directory.glob("*.json")]
+        return sorted(found, key=lambda item: item[1].st_mtime)
+
+    def size_bytes(self) -> int:
+        return sum(stat.st_size for _, stat in self.entries())
+
+    def prune(self, max_bytes: int) -> int:
+        """Evict least recently used entries until at most `max_bytes` remain."""
+        entries = self.entries()
+        total = sum(stat.st_size for _, stat in entries)
+        removed = 0
+        for path, stat in entries:
+            if total <= max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+            removed += 1
+        self._size = total
+        return removed
+
+
+def _conversion_cache_from_env() -> ConversionCache | None:
+    directory = os.environ.get(_CACHE_DIR_ENV)
+    if not directory:
+        return None
+    max_bytes = int(
+        os.environ.get(_CACHE_MAX_BYTES_ENV) or _DEFAULT_CACHE_MAX_BYTES
+    )
+    return ConversionCache(directory, max_bytes)
+
+
+CONVERSION_CACHE = _conversion_cache_from_env()
+
+
+def _cached_conversion(data: bytes) -> tuple[str | None, dict[str, Any] | None]:
+    if CONVERSION_CACHE is None:
+        return None, None
+    key = CONVERSION_CACHE.key(data)
+    return key, CONVERSION_CACHE.get(key)
+
+
+def _store_conversion(
+    key: str | None, data: bytes, source_filename: str, result: Any
+) -> tuple[str, list[str]]:
+    text = (result.text or "").strip()
+    warnings: list[str] = list(getattr(result, "warnings", None) or [])
+    if CONVERSION_CACHE is not None and key is not None:
+        CONVERSION_CACHE.put(
+            key,
+            {
+                "text": text,
+                "source_filename": source_filename,
+                "warnings": warnings,
+                "backend": DEFAULT_BACKEND,
+                "backend_version": _backend_version(DEFAULT_BACKEND),
+                "source_bytes": len(data),
+                "created_at": time.time(),
+            },
+        )
+    return text, warnings
+
+
+def convert_file(file_id: str) -> tuple[str, str, list[str]]:
+    to_markdown = _load_to_markdown()
+    if CONVERSION_CACHE is None:
+        result = to_markdown(
+            file_id, backend=DEFAULT_BACKEND, client=_airalogy_client()
+        )
+        source_filename = result.source_filename or file_id
+        warnings: list[str] = list(getattr(result, "warnings", None) or [])
+        text = (result.text or "").strip()
+        return text, source_filename, warnings
+
+    data = _airalogy_client().download_file_bytes(file_id)
+    key, cached = _cached_conversion(data)
+    if cached is not None:
+        # Same bytes under a new file ID: the name follows the current upload.
+        return cached["text"], file_id, cached["warnings"]
+    result = to_markdown(data, backend=DEFAULT_BACKEND, filename=file_id)
+    source_filename = result.source_filename or file_id
+    text, warnings = _store_conversion(key, data, source_filename, result)
+    return text, source_filename, warnings
+
+
+def iter_pdf_markdown(file_id: str, max_chars: int | None = None) -> Iterator[str]:
+    """Yield the Markdown of a PDF page by page, as each page is parsed.
+
+    Unlike `convert_file`, the full document text is never held in memory. When
+    `max_chars` is given, output stops once that many characters have been
+    yielded (the last chunk is truncated) and the remaining pages are not parsed.
+    """
+    try:
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+    except ImportError as exc:
+        raise RuntimeError(
+            "Streaming PDF conversion requires `pdfminer.six`, "
+            "which is installed with `airalogy[markitdown]`. "
+            f"Import error: {exc}"
+        ) from exc
+
+    data = _airalogy_client().download_file_bytes(file_id)
+    emitted = 0
+    for page in extract_pages(io.BytesIO(data)):
+        text = "".join(
+            element.get_text()
+            for element in page
+            if isinstance(element, LTTextContainer)
+        ).strip()
+        if not text:
+            continue
+        if max_chars is not None and emitted + len(text) >= max_chars:
+            if max_chars > emitted:
+                yield text[: max_chars - emitted]
+            return
+        emitted += len(text)
+        yield text
+
+
+@dataclass
+class ConversionOutcome:
+    file_id: str
+    text: str = ""
+    source_filename: str = ""
+    warnings: list[str] = field(default_factory=list)
+    download_seconds: float = 0.0
+    convert_seconds: float = 0.0
+    error: str | None = None
+
+
+def _download(file_id: str) -> tuple[bytes, float]:
+    started = time.perf_counter()
+    data = _airalogy_client().download_file_bytes(file_id)
+    return data, time.perf_counter() - started
+
+
+def convert_batch(
+    file_ids: Iterable[str],
+    max_workers: int | None = None,
+    download_workers: int = _BATCH_DOWNLOAD_WORKERS,
+) -> Iterator[ConversionOutcome]:
+    """Convert many uploaded documents, yielding each outcome as soon as it is ready.
+
+    Downloads run on a thread pool; the CPU-bound conversions run on a process
+    pool of `max_workers`. Duplicate file IDs are converted once, and documents
+    already in `CONVERSION_CACHE` are not converted at all. Failures are
+    reported per file through `ConversionOutcome.error` instead of raising.
+    """
+    # Imported here: `concurrent.futures` loads its executors (and with them
+    # `multiprocessing`) lazily, and only batch conversion needs them.
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    to_markdown = _load_to_markdown()
+    unique_ids = list(dict.fromkeys(fid.strip() for fid in file_ids if fid.strip()))
+
+    downloads = ThreadPoolExecutor(download_workers)
+    # Not `fork`: the download threads are already running (and may hold
+    # locks) when the pool starts its workers.
+    converters = ProcessPoolExecutor(
+        max_workers, mp_context=multiprocessing.get_context("forkserver")
+    )
+    try:
+        downloading: dict[Future, str] = {
+            downloads.submit(_download, file_id): file_id for file_id in unique_ids
+        }
+        converting: dict[Future, tuple[str, bytes, str | None, float, float]] = {}
+        while downloading or converting:
+            done, _ = wait([*downloading, *converting], return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in downloading:
+                    file_id = downloading.pop(future)
+                    try:
+                        data, download_seconds = future.result()
+                    except Exception as exc:
+                        yield ConversionOutcome(
+                            file_id, error=f"Download failed: {exc}"
+                        )
+                        continue
+                    key, cached = _cached_conversion(data)
+                    if cached is not None:
+                        yield ConversionOutcome(
+                            file_id,
+                            text=cached["text"],
+                            source_filename=file_id,
+                            warnings=cached["warnings"],
+                            download_seconds=download_seconds,
+                        )
+                        continue
+                    # Submit `to_markdown` itself rather than a function of this
+                    # module, so that workers do not need to import the protocol.
+                    conversion = converters.submit(
+                        to_markdown, data, backend=DEFAULT_BACKEND, filename=file_id
+                    )
+                    converting[conversion] = (
+                        file_id,
+                        data,
+                        key,
+                        download_seconds,
+                        time.perf_counter(),
+                    )
+                    continue
+
+                file_id, data, key, download_seconds, submitted_at = converting.pop(
+                    future
+                )
+                convert_seconds = time.perf_counter() - submitted_at
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    yield ConversionOutcome(
+                        file_id,
+                        download_seconds=download_seconds,
+                        convert_seconds=convert_seconds,
+                        error=(
+                            f"Conversion failed with backend={DEFAULT_BACKEND!r}: {exc}"
+                        ),
+                    )
+                    continue
+                source_filename = result.source_filename or file_id
+                text, warnings = _store_conversion(key, data, source_filename, result)
+                yield ConversionOutcome(
+                    file_id,
+                    text=text,
+                    source_filename=source_filename,
+                    warnings=warnings,
+                    download_seconds=download_seconds,
+                    convert_seconds=convert_seconds,
+                )
+    finally:
+        downloads.shutdown(wait=False, cancel_futures=True)
+        converters.shutdown(wait=True, cancel_futures=True)
+
+
+def summarize_batch(outcomes: Iterable[ConversionOutcome]) -> dict[str, Any]:
+    """Aggregate per-file warnings, failures and timings of `convert_batch` outcomes."""
+    outcomes = list(outcomes)
+    converted = [outcome for outcome in outcomes if outcome.error is None]
+    return {
+        "files": len(outcomes),
+        "converted": len(converted),
+        "failed": {o.file_id: o.error for o in outcomes if o.error is not None},
+        "warnings": {o.file_id: o.warnings for o in converted if o.warnings},
+        "download_seconds": sum(o.download_seconds for o in outcomes),
+        "convert_seconds": sum(o.convert_seconds for o in outcomes),
+        "markdown_chars": sum(len(o.text) for o in converted),
+    }
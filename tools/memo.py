@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Collection, Hashable, Mapping
+from typing import Any
+
+
+def canonicalize(values: Mapping[str, Any]) -> str:
+    """Order-independent text form of field values, used as part of a cache key."""
+    return json.dumps(values, sort_keys=True, separators=(",", ":"), default=repr)
+
+
+class AssignerMemo:
+    """Bounded LRU cache of successful assigner outputs.
+
+    Entries are keyed by (assigner name, protocol version, canonicalized
+    dependent-field values), so only assigners that are pure functions of their
+    `dependent_fields` may be memoized. Memoization is opt-in: only the
+    assigners named in `include` are cached, none by default.
+    """
+
+    def __init__(self, maxsize: int = 1024, *, include: Collection[str] = ()):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be > 0")
+        self.maxsize = maxsize
+        self.include = frozenset(include)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def enabled_for(self, assigner_name: str) -> bool:
+        return assigner_name in self.include
+
+    @staticmethod
+    def key(
+        assigner_name: str, protocol_version: str, inputs: Mapping[str, Any]
+    ) -> Hashable:
+        return (assigner_name, protocol_version, canonicalize(inputs))
+
+    def get(self, key: Hashable) -> dict[str, Any] | None:
+        with self._lock:
+            outputs = self._entries.get(key)
+            if outputs is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(outputs)
+
+    def put(self, key: Hashable, outputs: Mapping[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = dict(outputs)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hit_ratio, 4),
+        }
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import sys
+import threading
+import tomllib
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from types import CodeType, ModuleType
+from typing import Any
+
+from airalogy.assigner import AssignerResult, DefaultAssigner
+from pydantic import BaseModel
+
+
+_REGISTRY_LOCK = threading.Lock()
+
+EXECUTION_POLICIES = ("inline", "thread", "process")
+"""Where an assigner runs; see `tools.isolation.AssignerRunner`."""
+
+
+@dataclass(frozen=True)
+class AssignerSpec:
+    """One `@assigner` function together with the metadata it was declared with."""
+
+    name: str
+    assigned_fields: tuple[str, ...]
+    dependent_fields: tuple[str, ...]
+    mode: str
+    func: Callable[[dict[str, Any]], AssignerResult]
+    execution: str = "inline"
+    """One of `EXECUTION_POLICIES`, from the module's `ASSIGNER_EXECUTION` dict."""
+    path: Path | None = None
+    """The `assigner.py` the function was loaded from."""
+
+
+def resolve_protocol_dir(path: str | Path) -> Path:
+    """Accept either a protocol directory or its parent (e.g. `tests/test_x`)."""
+    path = Path(path)
+    if (path / "protocol.aimd").is_file():
+        return path
+    if (path / "protocol" / "protocol.aimd").is_file():
+        return path / "protocol"
+    raise FileNotFoundError(f"No protocol.aimd found under {path}")
+
+
+@contextmanager
+def _isolated_registry() -> Iterator[dict[str, tuple[list[str], Callable, str]]]:
+    # `@assigner` registers into class-level dicts shared by every module, and
+    # refuses to register the same assigned field twice. Swap in fresh dicts so
+    # that protocols can be (re)loaded side by side.
+    with _REGISTRY_LOCK:
+        saved = DefaultAssigner.assigned_info, DefaultAssigner.dependent_info
+        DefaultAssigner.assigned_info, DefaultAssigner.dependent_info = {}, {}
+        try:
+            yield DefaultAssigner.assigned_info
+        finally:
+            DefaultAssigner.assigned_info, DefaultAssigner.dependent_info = saved
+
+
+def _module_name(assigner_path: Path) -> str:
+    digest = hashlib.sha1(str(assigner_path.resolve()).encode()).hexdigest()[:12]
+    return f"_protocol_assigner_{digest}"
+
+
+def _import_assigners(
+    assigner_path: Path, code: CodeType | None = None
+) -> tuple[ModuleType, list[AssignerSpec]]:
+    name = _module_name(assigner_path)
+    spec = importlib.util.spec_from_file_location(name, assigner_path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot import {assigner_path}")
+    module = importlib.util.module_from_spec(spec)
+
+    with _isolated_registry() as registry:
+        sys.modules[name] = module
+        try:
+            if code is None:
+                spec.loader.exec_module(module)
+            else:
+                exec(code, module.__dict__)
+        except BaseException:
+            sys.modules.pop(name, None)
+            raise
+        registered = dict(registry)
+
+    # `@assigner` takes no extra arguments, so the execution policy is declared
+    # next to the assigners as `ASSIGNER_EXECUTION = {"convert_pdf": "process"}`.
+    execution = dict(getattr(module, "ASSIGNER_EXECUTION", None) or {})
+    for attr, policy in execution.items():
+        if policy not in EXECUTION_POLICIES:
+            raise ImportError(
+                f"Unknown execution policy {policy!r} for {attr} in {assigner_path}; "
+                f"expected one of {EXECUTION_POLICIES}"
+            )
+
+    wrappers = {
+        getattr(value, "__wrapped__", None): attr
+        for attr, value in vars(module).items()
+        if callable(value)
+    }
+    assigned: dict[Callable, list[str]] = {}
+    declared: dict[Callable, tuple[list[str], str]] = {}
+    for field, (dependent_fields, raw_func, mode) in registered.items():
+        assigned.setdefault(raw_func, []).append(field)
+        declared[raw_func] = (dependent_fields, mode)
+
+    specs = []
+    for raw_func, fields in assigned.items():
+        attr = wrappers.get(raw_func)
+        if attr is None:
+            raise ImportError(
+                f"Assigner {raw_func.__name__} in {assigner_path} is not exposed at module level."
+            )
+        dependent_fields, mode = declared[raw_func]
+        specs.append(
+            AssignerSpec(
+                name=attr,
+                assigned_fields=tuple(fields),
+                dependent_fields=tuple(dependent_fields),
+                mode=mode,
+                func=getattr(module, attr),
+                execution=execution.pop(attr, "inline"),
+                path=assigner_path,
+            )
+        )
+    if execution:
+        raise ImportError(
+            f"ASSIGNER_EXECUTION in {assigner_path} names unknown assigners: {sorted(execution)}"
+        )
+    return module, specs
+
+
+def load_assigner_module(
+    protocol_dir: str | Path,
+) -> tuple[ModuleType | None, list[AssignerSpec]]:
+    """Import `assigner.py` of a protocol and collect its assigners in declaration order."""
+    protocol_dir = resolve_protocol_dir(protocol_dir)
+    assigner_path = protocol_dir / "assigner.py"
+    if not assigner_path.is_file():
+        return None, []
+    return _import_assigners(assigner_path)
+
+
+def load_assigners(protocol_dir: str | Path) -> list[AssignerSpec]:
+    return load_assigner_module(protocol_dir)[1]
+
+
+def load_defaults(protocol_dir: str | Path) -> dict[str, Any]:
+    """Default values declared in `protocol.aimd` (`{{var|a1: int = 3}}` -> `{"a1": 3}`)."""
+    from airalogy.markdown import extract_vars
+
+    protocol_dir = resolve_protocol_dir(protocol_dir)
+    text = (protocol_dir / "protocol.aimd").read_text(encoding="utf-8")
+    return defaults_from_vars(extract_vars(text)["vars"])
+
+
+def defaults_from_vars(var_schema: list[dict[str, Any]]) -> dict[str, Any]:
+    return {
+        var["name"]: var["default_value"]
+        for var in var_schema
+        if "default_value" in var
+    }
+
+
+def load_var_model(protocol_dir: str | Path) -> type[BaseModel]:
+    """The pydantic `VarModel` that `airalogy` generates from `protocol.aimd`."""
+    from airalogy.markdown import generate_model
+
+    protocol_dir = resolve_protocol_dir(protocol_dir)
+    source = generate_model((protocol_dir / "protocol.aimd").read_text(encoding="utf-8"))
+    namespace: dict[str, Any] = {}
+    # `dont_inherit`: this module's `from __future__ import annotations` would
+    # otherwise turn the generated annotations into strings.
+    exec(compile(source, "<VarModel>", "exec", dont_inherit=True), namespace)
+    return namespace["VarModel"]
+
+
+def load_metadata(protocol_dir: str | Path) -> dict[str, Any]:
+    """The `[airalogy_protocol]` table of `protocol.toml`."""
+    protocol_dir = resolve_protocol_dir(protocol_dir)
+    with (protocol_dir / "protocol.toml").open("rb") as f:
+        return tomllib.load(f)["airalogy_protocol"]
@@ -0,0 +1,255 @@
+"""Stream Airalogy records of one protocol into columnar files (Parquet or Arrow IPC).
+
+Column types are taken up front from the `VarModel` that `airalogy` generates
+from `protocol.aimd`, not inferred from the data: `int` -> int64,
+`CurrentTime` -> UTC timestamp, `list[str]` -> list<string>, and so on. Var
+tables (`list[Student]`) are flattened into one child table per var, keyed by
+`record_id` and `row_index`. `IgnoreStr` vars are never persisted, so they
+are not exported. Values of types with no Arrow counterpart are written as
+JSON strings.
+
+Records are buffered `batch_size` at a time, so memory stays bounded however
+many records are written. Requires `pyarrow` (`uv pip install pyarrow`), which
+is not a dependency of this repository.
+
+    with RecordExporter("examples/meeting_notes/en", "out/", format="parquet") as exporter:
+        for record in records:  # {"id": ..., "data": {"var": {...}}}
+            exporter.write(record)
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import typing
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from tools.protocol import load_var_model
+
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+RECORDS_TABLE = "records"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError(
+            "Columnar export requires pyarrow; install it with `uv pip install pyarrow`."
+        ) from e
+    return pyarrow
+
+
+def _scalar_type(pa, annotation: Any):
+    """Arrow type for a scalar annotation, or None to store it as JSON."""
+    if not isinstance(annotation, type):
+        return None
+    # `bool` before `int`, `datetime` before `date`: subclasses first.
+    for python_type, arrow_type in (
+        (bool, pa.bool_()),
+        (int, pa.int64()),
+        (float, pa.float64()),
+        (str, pa.string()),
+        (datetime.datetime, pa.timestamp("us", tz="UTC")),
+        (datetime.date, pa.date32()),
+    ):
+        if issubclass(annotation, python_type):
+            return arrow_type
+    return None
+
+
+@dataclass
+class _Column:
+    name: str
+    type: Any
+    json: bool = False
+    values: list[Any] = field(default_factory=list)
+
+    def to_array(self, pa):
+        values = self.values
+        if self.json:
+            values = [
+                None if value is None else json.dumps(value, default=str)
+                for value in values
+            ]
+        try:
+            return pa.array(values, type=self.type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            if not pa.types.is_temporal(self.type):
+                raise
+            # Records read from JSON carry ISO 8601 strings; Arrow parses them
+            # in bulk when casting.
+            return pa.array(values, type=pa.string()).cast(self.type)
+
+
+def _columns(pa, model: type[BaseModel]) -> tuple[list[_Column], dict[str, type[BaseModel]]]:
+    columns = []
+    tables = {}
+    for name, info in model.model_fields.items():
+        extra = info.json_schema_extra if isinstance(info.json_schema_extra, dict) else {}
+        if extra.get("airalogy_type") == "IgnoreStr":
+            continue
+        annotation = info.annotation
+        if typing.get_origin(annotation) is list:
+            (item,) = typing.get_args(annotation) or (Any,)
+            if isinstance(item, type) and issubclass(item, BaseModel):
+                tables[name] = item
+                continue
+            item_type = _scalar_type(pa, item)
+            if item_type is not None:
+                columns.append(_Column(name, pa.list_(item_type)))
+                continue
+        arrow_type = _scalar_type(pa, annotation)
+        if arrow_type is None:
+            columns.append(_Column(name, pa.string(), json=True))
+        else:
+            columns.append(_Column(name, arrow_type))
+    return columns, tables
+
+
+class _TableWriter:
+    """Buffers the rows of one output table and writes them a batch at a time."""
+
+    def __init__(self, pa, path: Path, format: str, keys: list[_Column], columns: list[_Column]):
+        self.pa = pa
+        self.columns = keys + columns
+        self.keys = keys
+        self.value_columns = columns
+        self.schema = pa.schema([pa.field(column.name, column.type) for column in self.columns])
+        if format == "parquet":
+            self.writer = pa.parquet.ParquetWriter(path, self.schema)
+        else:
+            self.writer = pa.ipc.new_file(path, self.schema)
+        self.path = path
+        self.buffered = 0
+        self.rows = 0
+
+    def append(self, keys: tuple[Any, ...], values: Mapping[str, Any]) -> None:
+        for column, key in zip(self.keys, keys):
+            column.values.append(key)
+        for column in self.value_columns:
+            column.values.append(values.get(column.name))
+        self.buffered += 1
+
+    def flush(self) -> None:
+        if not self.buffered:
+            return
+        batch = self.pa.RecordBatch.from_arrays(
+            [column.to_array(self.pa) for column in self.columns], schema=self.schema
+        )
+        self.writer.write_batch(batch)
+        for column in self.columns:
+            column.values.clear()
+        self.rows += self.buffered
+        self.buffered = 0
+
+    def close(self) -> None:
+        self.flush()
+        self.writer.close()
+
+
+@dataclass
+class ExportSummary:
+    records: int
+    rows: dict[str, int]
+    """Rows written per var table (child table)."""
+    paths: dict[str, Path]
+
+
+class RecordExporter:
+    """Write records of one protocol into `<out_dir>/records.<ext>` plus one file per var table."""
+
+    def __init__(
+        self,
+        protocol_dir: str | Path,
+        out_dir: str | Path,
+        *,
+        format: str = "parquet",
+        batch_size: int = 65_536,
+    ):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format {format!r}; expected one of {sorted(FORMATS)}")
+        pa = _pyarrow()
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.summary: ExportSummary | None = None
+
+        columns, tables = _columns(pa, load_var_model(protocol_dir))
+        suffix = FORMATS[format]
+        self._records = _TableWriter(
+            pa,
+            out_dir / f"{RECORDS_TABLE}{suffix}",
+            format,
+            [_Column("record_id", pa.string())],
+            columns,
+        )
+        self._tables = {}
+        for name, row_model in tables.items():
+            row_columns, nested = _columns(pa, row_model)
+            # Var tables do not nest; keep anything unexpected as JSON.
+            row_columns += [_Column(key, pa.string(), json=True) for key in nested]
+            self._tables[name] = _TableWriter(
+                pa,
+                out_dir / f"{name}{suffix}",
+                format,
+                [_Column("record_id", pa.string()), _Column("row_index", pa.int32())],
+                row_columns,
+            )
+
+    def write(self, record: Mapping[str, Any]) -> None:
+        """Add one record (`{"id": ..., "data": {"var": {...}}}`)."""
+        record_id = record["id"]
+        values = record["data"]["var"]
+        self._records.append((record_id,), values)
+        if self._records.buffered >= self.batch_size:
+            self._records.flush()
+        for name, table in self._tables.items():
+            for index, row in enumerate(values.get(name) or ()):
+                table.append((record_id, index), row)
+            if table.buffered >= self.batch_size:
+                table.flush()
+
+    def close(self) -> ExportSummary:
+        if self.summary is not None:
+            return self.summary
+        writers = {RECORDS_TABLE: self._records, **self._tables}
+        for writer in writers.values():
+            writer.close()
+        self.summary = ExportSummary(
+            records=self._records.rows,
+            rows={name: table.rows for name, table in self._tables.items()},
+            paths={name: writer.path for name, writer in writers.items()},
+        )
+        return self.summary
+
+    def __enter__(self) -> RecordExporter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def export_records(
+    protocol_dir: str | Path,
+    records: Iterable[Mapping[str, Any]],
+    out_dir: str | Path,
+    *,
+    format: str = "parquet",
+    batch_size: int = 65_536,
+) -> ExportSummary:
+    exporter = RecordExporter(protocol_dir, out_dir, format=format, batch_size=batch_size)
+    try:
+        for record in records:
+            exporter.write(record)
+    finally:
+        summary = exporter.close()
+    return summary
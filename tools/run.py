@@ -0,0 +1,152 @@
+"""Run a protocol headlessly and check the values its AIMD documents.
+
+Loads a protocol directory, fills every field with the default declared in
+`protocol.aimd` (`{{var|a1: int = 3}}`), applies `--set` overrides, runs the
+assigner graph the way the platform does on first load (`auto` and
+`auto_first` assigners cascade; `manual` ones only run when named with
+`--assign`), then compares the results with the values documented next to
+the fields, e.g. `{{var|g20: int, ...}} (expected 1352)`.
+
+    python -m tools.run tests/test_multi_level_assigner --set b4=0
+    python -m tools.run examples/meeting_notes/en --values
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from tools.assigner_graph import AssignerGraph
+from tools.cli import parse_overrides, print_table
+from tools.incremental import IncrementalSession, UpdateReport
+from tools.protocol import load_assigners, load_defaults, resolve_protocol_dir
+from tools.tracing import SUMMARY_HEADERS, Tracer
+
+
+_EXPECTED = re.compile(
+    r"\{\{var\|\s*([A-Za-z_]\w*)[^}]*\}\}[^\S\n]*\(expected[^\S\n]+([^)\n]+)\)"
+)
+
+
+def expected_values(protocol_dir: str | Path) -> dict[str, Any]:
+    """Values documented as `(expected ...)` right after a var declaration."""
+    protocol_dir = resolve_protocol_dir(protocol_dir)
+    text = (protocol_dir / "protocol.aimd").read_text(encoding="utf-8")
+    expected = {}
+    for match in _EXPECTED.finditer(text):
+        raw = match.group(2).strip()
+        try:
+            expected[match.group(1)] = ast.literal_eval(raw)
+        except (ValueError, SyntaxError):
+            expected[match.group(1)] = raw
+    return expected
+
+
+@dataclass
+class Check:
+    name: str
+    expected: Any
+    actual: Any
+
+    @property
+    def ok(self) -> bool:
+        return self.actual == self.expected or (
+            isinstance(self.expected, str) and str(self.actual) == self.expected
+        )
+
+
+@dataclass
+class ProtocolRun:
+    protocol_dir: Path
+    values: dict[str, Any]
+    reports: list[UpdateReport] = field(default_factory=list)
+    checks: list[Check] = field(default_factory=list)
+    tracer: Tracer | None = None
+
+    @property
+    def failed(self) -> dict[str, str]:
+        return {name: error for report in self.reports for name, error in report.failed.items()}
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed and all(check.ok for check in self.checks)
+
+
+def run_protocol(
+    protocol_dir: str | Path,
+    overrides: dict[str, Any] | None = None,
+    *,
+    assign: Iterable[str] = (),
+    verify: bool = True,
+    tracer: Tracer | None = None,
+) -> ProtocolRun:
+    protocol_dir = resolve_protocol_dir(protocol_dir)
+    specs = load_assigners(protocol_dir)
+    if tracer is not None:
+        specs = tracer.wrap(specs)
+    graph = AssignerGraph(specs)
+    values = load_defaults(protocol_dir)
+    values.update(overrides or {})
+
+    session = IncrementalSession(graph, values)
+    run = ProtocolRun(protocol_dir, session.values, tracer=tracer)
+    run.reports.append(session.initialize())
+    for name in assign:
+        if name not in graph.specs:
+            raise KeyError(f"{protocol_dir} has no assigner {name!r}")
+        run.reports.append(session.assign(name))
+    if verify:
+        run.checks = [
+            Check(name, expected, session.values.get(name))
+            for name, expected in expected_values(protocol_dir).items()
+        ]
+    return run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("protocols", nargs="+", type=Path)
+    parser.add_argument(
+        "--set", dest="overrides", action="append", default=[], metavar="NAME=VALUE"
+    )
+    parser.add_argument(
+        "--assign", action="append", default=[], metavar="ASSIGNER",
+        help="Run a (manual) assigner after the initial cascade.",
+    )
+    parser.add_argument("--no-verify", dest="verify", action="store_false")
+    parser.add_argument("--values", action="store_true", help="Print the final values as JSON.")
+    args = parser.parse_args()
+    overrides = parse_overrides(args.overrides)
+
+    failed = False
+    for protocol_dir in args.protocols:
+        run = run_protocol(
+            protocol_dir, overrides, assign=args.assign, verify=args.verify, tracer=Tracer()
+        )
+        ran = sum(len(report.ran) for report in run.reports)
+        print(f"{run.protocol_dir}: {ran} assigner runs, {len(run.failed)} failed")
+        if run.tracer.spans:
+            print_table(SUMMARY_HEADERS, run.tracer.summary())
+        for name, error in run.failed.items():
+            print(f"  FAILED {name}: {error}")
+        if run.checks:
+            passed = sum(check.ok for check in run.checks)
+            print(f"  expected values: {passed}/{len(run.checks)} match")
+            for check in run.checks:
+                if not check.ok:
+                    print(f"  MISMATCH {check.name}: expected {check.expected!r}, got {check.actual!r}")
+        if args.values:
+            print(json.dumps(run.values, indent=2, ensure_ascii=False, default=str))
+        failed |= not run.ok
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
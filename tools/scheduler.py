@@ -0,0 +1,325 @@
+"""Background scheduling of auto assigners with latest-edit-wins semantics.
+
+Timeouts bound how long a result is waited for, not how long an assigner
+runs: assigners run on a thread pool and Python threads cannot be
+interrupted, so a timed-out run keeps its worker busy until the function
+returns, and its late result is discarded. Assigners that may hang must
+bound their own blocking calls (e.g. HTTP client timeouts), or size
+`max_workers` for the runs that can be stuck at once.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from airalogy.assigner import AssignerResult
+
+from tools.assigner_graph import AssignerGraph
+from tools.protocol import AssignerSpec
+
+
+@dataclass(eq=False)
+class RunRecord:
+    """One invocation of an assigner by `AssignerScheduler`."""
+
+    name: str
+    inputs: dict[str, Any]
+    generations: dict[str, int]
+    """Generation of every input field when the run was started."""
+    started: float
+    finished: float | None = None
+    status: str = "running"
+    """`applied`, `failed`, `superseded`, `cancelled` or `timed_out` once over."""
+    error: str | None = None
+    stale: bool = False
+    """Whether an input had changed again by the time the run finished."""
+
+    @property
+    def duration(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+
+@dataclass
+class SchedulerReport:
+    runs: list[RunRecord] = field(default_factory=list)
+
+    def count(self, name: str, status: str | None = None) -> int:
+        return sum(
+            1
+            for run in self.runs
+            if run.name == name and (status is None or run.status == status)
+        )
+
+    @property
+    def busy_seconds(self) -> float:
+        return sum(run.duration for run in self.runs if run.status != "cancelled")
+
+    @property
+    def wasted_seconds(self) -> float:
+        """Time spent in runs whose outputs did not end up in the final values.
+
+        Only the last applied run of each assigner counts as useful work.
+        """
+        useful = {}
+        for run in self.runs:
+            if run.status == "applied":
+                useful[run.name] = run
+        return sum(
+            run.duration
+            for run in self.runs
+            if run.status != "cancelled" and useful.get(run.name) is not run
+        )
+
+
+class AssignerScheduler:
+    """Runs auto assigners in the background as fields are edited, latest edit wins.
+
+    Every field carries a generation counter that is bumped whenever its value
+    changes. A run records the generations of its inputs when it starts; if
+    any of them has moved on by the time it finishes, its result is discarded
+    (`superseded`) and never triggers downstream assigners. An edit that
+    invalidates a queued run cancels it, and one that invalidates a running
+    run starts the replacement right away instead of waiting for it. An
+    assigner is only started once none of its upstream assigners is pending,
+    so a chain like `b5 -> b6 -> b12` computes each link once per edit.
+
+    Runs exceeding their timeout (`timeouts[name]`, else `default_timeout`)
+    are reported as `timed_out` and their late results discarded. The run
+    itself is not stopped: threads cannot be interrupted, so superseded and
+    timed-out runs still occupy a worker until they return.
+
+    With `latest_wins=False` the scheduler behaves like a plain trigger queue:
+    every result lands and triggers its downstream assigners as soon as it
+    finishes, stale or not. That mode exists for comparison.
+    """
+
+    def __init__(
+        self,
+        graph: AssignerGraph,
+        values: dict[str, Any] | None = None,
+        *,
+        timeouts: dict[str, float] | None = None,
+        default_timeout: float | None = None,
+        max_workers: int | None = None,
+        latest_wins: bool = True,
+    ):
+        self.graph = graph
+        self.values: dict[str, Any] = dict(values or {})
+        self.generation: dict[str, int] = {}
+        self.timeouts = dict(timeouts or {})
+        self.default_timeout = default_timeout
+        self.latest_wins = latest_wins
+        self.completed_auto_first: set[str] = set()
+        self.report = SchedulerReport()
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Condition()
+        self._pending: set[str] = set()
+        self._live: dict[str, tuple[RunRecord, Future]] = {}
+        self._in_flight = 0
+        # Runs whose status is still `running`, with their timeout timer.
+        self._running: dict[RunRecord, threading.Timer | None] = {}
+        self._ancestors = self._compute_ancestors()
+
+    def _compute_ancestors(self) -> dict[str, frozenset[str]]:
+        ancestors: dict[str, frozenset[str]] = {}
+        for spec in self.graph.topological_order():
+            found = set(self.graph.upstream[spec.name])
+            for up in self.graph.upstream[spec.name]:
+                found |= ancestors[up]
+            ancestors[spec.name] = frozenset(found)
+        return ancestors
+
+    def _triggerable(self, spec: AssignerSpec) -> bool:
+        if spec.mode == "auto":
+            return True
+        if spec.mode == "auto_first":
+            return spec.name not in self.completed_auto_first
+        return False
+
+    def _is_ready(self, spec: AssignerSpec) -> bool:
+        return all(self.values.get(name) is not None for name in spec.dependent_fields)
+
+    # All methods below that start with `_` expect `self._lock` to be held.
+
+    def _set(self, changes: dict[str, Any]) -> list[str]:
+        changed = [
+            name
+            for name, value in changes.items()
+            if name not in self.values or self.values[name] != value
+        ]
+        self.values.update(changes)
+        for name in changed:
+            self.generation[name] = self.generation.get(name, 0) + 1
+        return changed
+
+    def _trigger(self, fields: Iterable[str]) -> None:
+        for name in fields:
+            for reader in self.graph.readers.get(name, ()):
+                spec = self.graph.specs[reader]
+                if not self._triggerable(spec):
+                    continue
+                self._pending.add(reader)
+                if self.latest_wins and reader in self._live:
+                    self._supersede(reader)
+
+    def _settle(self, run: RunRecord, status: str) -> None:
+        run.status = status
+        timer = self._running.pop(run, None)
+        if timer is not None:
+            timer.cancel()
+
+    def _supersede(self, name: str) -> None:
+        run, future = self._live.pop(name)
+        if future.cancel():
+            self._settle(run, "cancelled")
+            run.finished = time.perf_counter()
+            self._in_flight -= 1
+        else:
+            # Still running; `_finish` discards its result.
+            self._settle(run, "superseded")
+
+    def _dispatch(self) -> None:
+        # In topological order, so that an ancestor is decided before its
+        # descendants: still pending or running, it holds them back.
+        blocked = set(self._live)
+        for name in sorted(self._pending, key=self.graph.order.__getitem__):
+            if name not in self._pending:
+                continue  # started by a nested `_finish`
+            spec = self.graph.specs[name]
+            if self.latest_wins and (
+                name in self._live or not self._ancestors[name].isdisjoint(blocked)
+            ):
+                blocked.add(name)
+                continue
+            self._pending.discard(name)
+            if self._is_ready(spec):
+                blocked.add(name)
+                self._start(spec)
+
+    def _busy(self) -> bool:
+        return bool(self._pending or self._running)
+
+    def _start(self, spec: AssignerSpec) -> None:
+        run = RunRecord(
+            name=spec.name,
+            inputs={name: self.values[name] for name in spec.dependent_fields},
+            generations={name: self.generation.get(name, 0) for name in spec.dependent_fields},
+            started=time.perf_counter(),
+        )
+        self.report.runs.append(run)
+        self._in_flight += 1
+        future = self._pool.submit(spec.func, run.inputs)
+        self._live[spec.name] = (run, future)
+        timeout = self.timeouts.get(spec.name, self.default_timeout)
+        timer = None
+        if timeout is not None:
+            timer = threading.Timer(timeout, self._expire, (spec.name, run, timeout))
+            timer.daemon = True
+            timer.start()
+        self._running[run] = timer
+        future.add_done_callback(lambda future: self._finish(spec, run, future))
+
+    def _expire(self, name: str, run: RunRecord, timeout: float) -> None:
+        with self._lock:
+            if run.status != "running":
+                return
+            self._settle(run, "timed_out")
+            run.error = f"Timed out after {timeout:g} s"
+            if self._live.get(name, (None,))[0] is run:
+                del self._live[name]
+            self._dispatch()
+            self._lock.notify_all()
+
+    def _finish(self, spec: AssignerSpec, run: RunRecord, future: Future) -> None:
+        if future.cancelled():
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            result = AssignerResult(success=False, error_message=repr(e))
+        with self._lock:
+            run.finished = time.perf_counter()
+            self._in_flight -= 1
+            if self._live.get(spec.name, (None,))[0] is run:
+                del self._live[spec.name]
+
+            run.stale = any(
+                self.generation.get(name, 0) != generation
+                for name, generation in run.generations.items()
+            )
+            if run.status != "running":
+                pass  # superseded or timed out while running
+            elif self.latest_wins and run.stale:
+                self._settle(run, "superseded")
+            elif not result.success:
+                self._settle(run, "failed")
+                run.error = result.error_message
+            else:
+                self._settle(run, "applied")
+                if spec.mode == "auto_first":
+                    self.completed_auto_first.add(spec.name)
+                self._trigger(
+                    self._set(
+                        {name: result.assigned_fields[name] for name in spec.assigned_fields}
+                    )
+                )
+            self._dispatch()
+            self._lock.notify_all()
+
+    def edit(self, changes: dict[str, Any]) -> list[str]:
+        """Apply user edits and schedule the affected assigners; returns immediately."""
+        with self._lock:
+            changed = self._set(changes)
+            self._trigger(changed)
+            self._dispatch()
+            return changed
+
+    def initialize(self) -> None:
+        """Schedule every triggerable assigner, as on first load."""
+        with self._lock:
+            for spec in self.graph.topological_order():
+                if self._triggerable(spec):
+                    self._pending.add(spec.name)
+            self._dispatch()
+
+    def assign(self, name: str) -> None:
+        """Schedule an assigner regardless of its mode (the Assign button)."""
+        with self._lock:
+            self._pending.add(name)
+            if self.latest_wins and name in self._live:
+                self._supersede(name)
+            self._dispatch()
+
+    def idle(self) -> bool:
+        with self._lock:
+            return not self._busy()
+
+    def wait(self, timeout: float | None = None, *, drain: bool = False) -> bool:
+        """Block until nothing is pending or running; True unless `timeout` expired.
+
+        With `drain`, also wait for superseded and timed-out runs to return.
+        """
+        with self._lock:
+            return self._lock.wait_for(
+                lambda: not self._busy() and (not drain or not self._in_flight),
+                timeout,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            for timer in self._running.values():
+                if timer is not None:
+                    timer.cancel()
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> AssignerScheduler:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
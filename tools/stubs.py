@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+
+class StubServer:
+    """Local HTTP server standing in for the Airalogy file service and an
+    OpenAI-compatible (DashScope) chat completions endpoint.
+
+    - `GET /airalogy/get_file_url/<file_id>` returns `{"url": ...}` pointing
+      back at this server (with an `Expires=` query when `url_ttl` is set).
+    - `GET /airalogy/download/<file_id>` serves bytes registered in `files`.
+    - `POST /v1/chat/completions` returns a completion that echoes how many
+      images the request carried. With `"stream": true` it answers with
+      server-sent events instead, one `chat.completion.chunk` per word of the
+      same text (plus `extra_tokens` filler words), `token_latency` apart;
+      a non-streamed answer waits for all of them before it is sent. Reading
+      the attached images costs `image_latency_per_mb` per MB, whether they
+      are inlined as data URIs or point at `files` served by this stub; the
+      total is kept in `image_bytes`. With `rate_limit` (completions per
+      second, bursts of up to `rate_burst`) or `max_concurrent_completions`,
+      requests over the limit get a 429 `rate_limit_exceeded` error with
+      `Retry-After`, as a provider would answer; they are counted under
+      `rate_limited`.
+
+    Use as a context manager; `env()` gives the variables `Airalogy()` reads,
+    plus the endpoint override of `test_aimd_image`.
+    """
+
+    def __init__(
+        self,
+        *,
+        file_url_latency: float = 0.0,
+        completion_latency: float = 0.0,
+        token_latency: float = 0.0,
+        extra_tokens: int = 0,
+        image_latency_per_mb: float = 0.0,
+        url_ttl: float | None = None,
+        rate_limit: float | None = None,
+        rate_burst: int = 1,
+        max_concurrent_completions: int | None = None,
+    ):
+        self.file_url_latency = file_url_latency
+        self.url_ttl = url_ttl
+        self.files: dict[str, bytes] = {}
+        self.completion_latency = completion_latency
+        self.token_latency = token_latency
+        self.extra_tokens = extra_tokens
+        self.image_latency_per_mb = image_latency_per_mb
+        self.image_bytes = 0
+        self.rate_limit = rate_limit
+        self.rate_burst = rate_burst
+        self.max_concurrent_completions = max_concurrent_completions
+        self._tokens = float(rate_burst)
+        self._refilled = time.monotonic()
+        self._in_flight = 0
+        self.counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def openai_base_url(self) -> str:
+        return f"{self.url}/v1"
+
+    def env(self) -> dict[str, str]:
+        return {
+            "AIRALOGY_ENDPOINT": self.url,
+            "AIRALOGY_API_KEY": "stub-key",
+            "AIRALOGY_PROTOCOL_ID": "stub-protocol",
+            "AIMD_IMAGE_OPENAI_BASE_URL": self.openai_base_url,
+        }
+
+    def install_env(self) -> None:
+        os.environ.update(self.env())
+
+    def count(self, route: str) -> None:
+        with self._lock:
+            self.counts[route] = self.counts.get(route, 0) + 1
+
+    def __enter__(self) -> StubServer:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def admit_completion(self) -> float | None:
+        """Take a slot for one completion, or return the seconds to retry after."""
+        with self._lock:
+            if (
+                self.max_concurrent_completions is not None
+                and self._in_flight >= self.max_concurrent_completions
+            ):
+                return 1.0 / self.rate_limit if self.rate_limit else 0.1
+            if self.rate_limit is not None:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.rate_burst, self._tokens + (now - self._refilled) * self.rate_limit
+                )
+                self._refilled = now
+                if self._tokens < 1:
+                    return (1 - self._tokens) / self.rate_limit
+                self._tokens -= 1
+            self._in_flight += 1
+            return None
+
+    def release_completion(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def image_size(self, url: str) -> int:
+        """Bytes the model reads for one attached image URL."""
+        if url.startswith("data:"):
+            encoded = url.partition(",")[2]
+            return len(encoded) * 3 // 4 - encoded[-2:].count("=")
+        prefix = f"{self.url}/files/"
+        if url.startswith(prefix):
+            return len(self.files.get(url[len(prefix) :].partition("?")[0], b""))
+        return 0
+
+    def completion_text(self, request: dict[str, Any]) -> str:
+        images = sum(
+            1
+            for message in request.get("messages", [])
+            if isinstance(message.get("content"), list)
+            for part in message["content"]
+            if part.get("type") == "image_url"
+        )
+        return f"Stub description of {images} image(s)." + " detail" * self.extra_tokens
+
+    def completion_payload(self, request: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {
+                        "role": "assistant",
+                        "content": self.completion_text(request),
+                    },
+                }
+            ],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }
+
+    def completion_chunks(self, request: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        """The `chat.completion.chunk` events of a streamed completion."""
+        chunk = {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+        }
+        words = self.completion_text(request).split(" ")
+        for index, word in enumerate(words):
+            delta = {"content": word if index == 0 else f" {word}"}
+            if index == 0:
+                delta["role"] = "assistant"
+            yield {
+                **chunk,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+            }
+        yield {**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without TCP_NODELAY
+            # every response pays a delayed-ACK stall (~40 ms).
+            disable_nagle_algorithm = True
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _send_json(
+                self, payload: Any, status: int = 200, headers: dict[str, str] | None = None
+            ) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_events(self, events: Iterator[dict[str, Any]]) -> None:
+                # Server-sent events over chunked encoding, so that the
+                # connection stays usable for the next request.
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def send(data: str) -> None:
+                    body = f"data: {data}\n\n".encode()
+                    self.wfile.write(f"{len(body):x}\r\n".encode() + body + b"\r\n")
+                    self.wfile.flush()
+
+                for index, event in enumerate(events):
+                    if index:
+                        time.sleep(stub.token_latency)
+                    send(json.dumps(event))
+                send("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _read_json(self) -> dict[str, Any]:
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def do_GET(self) -> None:
+                prefix = "/airalogy/get_file_url/"
+                if self.path.startswith(prefix):
+                    stub.count("get_file_url")
+                    time.sleep(stub.file_url_latency)
+                    file_id = self.path[len(prefix) :]
+                    url = f"{stub.url}/files/{file_id}"
+                    if stub.url_ttl is not None:
+                        url += f"?Expires={int(time.time() + stub.url_ttl)}"
+                    self._send_json({"url": url})
+                    return
+                prefix = "/airalogy/download/"
+                file_id = self.path[len(prefix) :]
+                if self.path.startswith(prefix) and file_id in stub.files:
+                    stub.count("download")
+                    body = stub.files[file_id]
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/octet-stream")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                self._send_json({"error": "not found"}, status=404)
+
+            def do_POST(self) -> None:
+                if self.path.endswith("/chat/completions"):
+                    stub.count("chat_completions")
+                    request = self._read_json()
+                    retry_after = stub.admit_completion()
+                    if retry_after is not None:
+                        stub.count("rate_limited")
+                        error = {
+                            "message": "Rate limit exceeded, please retry later.",
+                            "type": "rate_limit_exceeded",
+                            "code": "rate_limit_exceeded",
+                        }
+                        self._send_json(
+                            {"error": error},
+                            status=429,
+                            headers={
+                                "Retry-After": f"{retry_after:.3f}",
+                                "retry-after-ms": f"{retry_after * 1e3:.0f}",
+                            },
+                        )
+                        return
+                    try:
+                        self._complete(request)
+                    finally:
+                        stub.release_completion()
+                    return
+                self._send_json({"error": "not found"}, status=404)
+
+            def _complete(self, request: dict[str, Any]) -> None:
+                images = sum(
+                    stub.image_size(part["image_url"]["url"])
+                    for message in request.get("messages", [])
+                    if isinstance(message.get("content"), list)
+                    for part in message["content"]
+                    if part.get("type") == "image_url"
+                )
+                with stub._lock:
+                    stub.image_bytes += images
+                time.sleep(stub.completion_latency + stub.image_latency_per_mb * images / 1e6)
+                if request.get("stream"):
+                    self._send_events(stub.completion_chunks(request))
+                else:
+                    # The whole text is generated before anything is sent.
+                    words = len(stub.completion_text(request).split(" "))
+                    time.sleep(stub.token_latency * words)
+                    self._send_json(stub.completion_payload(request))
+
+        return Handler
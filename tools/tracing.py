@@ -0,0 +1,222 @@
+"""Per-assigner tracing: spans with timings, sizes and outcomes.
+
+`Tracer.wrap` instruments the assigners of a protocol; `Tracer.patch`
+instruments helper functions the assigners call (`convert_file`,
+`build_ai_description`, ...), so their time shows up nested under the
+assigner that called them. Spans export to Chrome trace JSON (open in
+`chrome://tracing` or https://ui.perfetto.dev) and aggregate into a
+p50/p95/p99 table per span name.
+
+Payload sizes are JSON-encoded lengths, which cost as much as the payload
+is large; they are measured on the first call of each assigner and then on
+every `size_every`-th one. The previous inputs of the `max_tracked` most
+recently called assigners are kept to name the fields that triggered a run,
+and only the `max_spans` most recent spans are kept.
+
+    tracer = Tracer()
+    graph = AssignerGraph(tracer.wrap(load_assigners(protocol_dir)))
+    IncrementalSession(graph, defaults).initialize()
+    tracer.write_chrome_trace("trace.json")
+    print_table(SUMMARY_HEADERS, tracer.summary())
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+from tools.cli import percentile
+from tools.protocol import AssignerSpec
+
+
+SUMMARY_HEADERS = [
+    "span",
+    "calls",
+    "failed",
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "max_ms",
+    "total_ms",
+]
+
+
+@dataclass
+class Span:
+    name: str
+    category: str
+    start: float
+    """Seconds since the tracer was created."""
+    duration: float = 0.0
+    thread_id: int = 0
+    success: bool = True
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+def _size(value: Any) -> int:
+    """Approximate payload size in bytes (JSON-encoded)."""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class Tracer:
+    def __init__(
+        self, size_every: int = 16, max_tracked: int = 1024, max_spans: int = 100_000
+    ):
+        if size_every <= 0 or max_tracked <= 0 or max_spans <= 0:
+            raise ValueError("size_every, max_tracked and max_spans must be > 0")
+        # Oldest spans are dropped first, so a long-lived tracer stays bounded.
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+        self.size_every = size_every
+        self.max_tracked = max_tracked
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        # Assigner name -> (calls so far, inputs of the previous call).
+        self._last_inputs: OrderedDict[str, tuple[int, dict[str, Any]]] = OrderedDict()
+
+    @contextmanager
+    def span(self, name: str, category: str = "function", **args: Any) -> Iterator[Span]:
+        """Record the enclosed block as one span; set `span.success`/`span.args` inside."""
+        span = Span(
+            name=name,
+            category=category,
+            start=time.perf_counter() - self._origin,
+            thread_id=threading.get_ident(),
+            args=args,
+        )
+        try:
+            yield span
+        except BaseException as e:
+            span.success = False
+            span.args["error"] = repr(e)
+            raise
+        finally:
+            span.duration = time.perf_counter() - self._origin - span.start
+            with self._lock:
+                self.spans.append(span)
+
+    def _trigger(self, name: str, inputs: dict[str, Any]) -> tuple[list[str], int]:
+        """The fields that triggered this call, and how many calls preceded it."""
+        # The fields whose value differs from this assigner's previous run are
+        # the ones that triggered it.
+        with self._lock:
+            calls, previous = self._last_inputs.pop(name, (0, None))
+            self._last_inputs[name] = (calls + 1, dict(inputs))
+            if len(self._last_inputs) > self.max_tracked:
+                self._last_inputs.popitem(last=False)
+        if previous is None:
+            return [], calls
+        return [
+            field
+            for field, value in inputs.items()
+            if field not in previous or previous[field] != value
+        ], calls
+
+    def wrap(self, specs: Iterable[AssignerSpec]) -> list[AssignerSpec]:
+        """Copies of `specs` whose functions record an `assigner` span per call."""
+        return [
+            dataclasses.replace(spec, func=self._wrap_assigner(spec)) for spec in specs
+        ]
+
+    def _wrap_assigner(self, spec: AssignerSpec) -> Callable:
+        func = spec.func
+
+        @functools.wraps(func)
+        def traced(dependent_fields: dict[str, Any]):
+            trigger, calls = self._trigger(spec.name, dependent_fields)
+            measure = calls % self.size_every == 0
+            with self.span(
+                spec.name, "assigner", mode=spec.mode, trigger=trigger or ["initial"]
+            ) as span:
+                if measure:
+                    span.args["input_bytes"] = _size(dependent_fields)
+                result = func(dependent_fields)
+                span.success = result.success
+                if measure:
+                    span.args["output_bytes"] = _size(result.assigned_fields)
+                if not result.success:
+                    span.args["error"] = result.error_message
+                return result
+
+        return traced
+
+    def _wrap_function(self, name: str, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def traced(*args, **kwargs):
+            with self.span(name, "function"):
+                return func(*args, **kwargs)
+
+        return traced
+
+    @contextmanager
+    def patch(self, module: ModuleType, *names: str) -> Iterator[None]:
+        """Trace calls to module-level functions of a protocol module while active."""
+        originals = {name: getattr(module, name) for name in names}
+        try:
+            for name, func in originals.items():
+                setattr(module, name, self._wrap_function(name, func))
+            yield
+        finally:
+            for name, func in originals.items():
+                setattr(module, name, func)
+
+    def chrome_trace(self) -> dict[str, Any]:
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": span.start * 1e6,
+                    "dur": span.duration * 1e6,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": {"success": span.success, **span.args},
+                }
+                for span in spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def write_chrome_trace(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self.chrome_trace(), default=str), encoding="utf-8")
+
+    def summary(self) -> list[list[Any]]:
+        """One row per span name (see `SUMMARY_HEADERS`), slowest total first."""
+        by_name: dict[str, list[Span]] = {}
+        with self._lock:
+            for span in self.spans:
+                by_name.setdefault(span.name, []).append(span)
+        rows = []
+        for name, spans in by_name.items():
+            durations = [span.duration * 1e3 for span in spans]
+            rows.append(
+                [
+                    name,
+                    len(spans),
+                    sum(not span.success for span in spans),
+                    f"{percentile(durations, 0.50):.2f}",
+                    f"{percentile(durations, 0.95):.2f}",
+                    f"{percentile(durations, 0.99):.2f}",
+                    f"{max(durations):.2f}",
+                    f"{sum(durations):.2f}",
+                ]
+            )
+        rows.sort(key=lambda row: -float(row[-1]))
+        return rows
@@ -0,0 +1,192 @@
+"""Bulk validation of typed var tables (`{{var|students: list[Student], subvars=[...]}}`).
+
+`validate_rows` is the reference path: one pydantic `model_validate` per row.
+`validate_table` turns the rows into columns and checks each column's type and
+`ge`/`gt`/`le`/`lt`/`min_length`/`max_length` constraints in bulk with
+C-level builtins (`map`, `all`, `operator`), so a column of plain, valid
+values costs no Python bytecode per row. Only rows that a bulk check rejects
+(a wrong or coercible type, a missing column, a violated constraint) go
+through `model_validate`, which decides between coercion and an error exactly
+as the reference path would.
+"""
+
+from __future__ import annotations
+
+import functools
+import itertools
+import operator
+import typing
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import annotated_types
+from pydantic import BaseModel, ValidationError
+
+from tools.protocol import load_var_model
+
+
+_MISSING: Any = object()
+_BULK_TYPES = (str, int, float, bool)
+# `bound` on the left: `ge <= value`, so that NaN fails like it does in pydantic.
+_BOUNDS = {
+    annotated_types.Ge: ("ge", operator.le),
+    annotated_types.Gt: ("gt", operator.lt),
+    annotated_types.Le: ("le", operator.ge),
+    annotated_types.Lt: ("lt", operator.gt),
+}
+_LENGTHS = {
+    annotated_types.MinLen: ("min_length", operator.le),
+    annotated_types.MaxLen: ("max_length", operator.ge),
+}
+
+
+def row_models(protocol_dir: str | Path) -> dict[str, type[BaseModel]]:
+    """Row model of every var table in `protocol.aimd`, keyed by var name."""
+    models = {}
+    for name, info in load_var_model(protocol_dir).model_fields.items():
+        if typing.get_origin(info.annotation) is list:
+            (item,) = typing.get_args(info.annotation)
+            if isinstance(item, type) and issubclass(item, BaseModel):
+                models[name] = item
+    return models
+
+
+@dataclass
+class TableValidation:
+    columns: dict[str, list[Any]]
+    """Validated (and, where pydantic coerced, converted) values per column.
+
+    Entries of rows listed in `errors` hold the raw input, or are missing.
+    """
+    errors: dict[int, list[dict[str, Any]]] = field(default_factory=dict)
+    """Pydantic error details per failing row index."""
+    fallback_rows: int = 0
+    """Rows that went through per-row `model_validate`."""
+
+    @property
+    def failed(self) -> list[int]:
+        return sorted(self.errors)
+
+    def rows(self) -> list[dict[str, Any]]:
+        """The valid rows, as dicts."""
+        names = list(self.columns)
+        return [
+            dict(zip(names, values))
+            for index, values in enumerate(zip(*self.columns.values()))
+            if index not in self.errors
+        ]
+
+
+def validate_rows(model: type[BaseModel], rows: list[Any]) -> TableValidation:
+    """Validate a table one row at a time."""
+    names = list(model.model_fields)
+    columns: dict[str, list[Any]] = {name: [] for name in names}
+    errors = {}
+    for index, row in enumerate(rows):
+        try:
+            validated = model.model_validate(row)
+        except ValidationError as e:
+            errors[index] = e.errors(include_url=False)
+            validated = None
+        for name in names:
+            columns[name].append(
+                getattr(validated, name)
+                if validated is not None
+                else row.get(name) if isinstance(row, dict) else None
+            )
+    return TableValidation(columns, errors, fallback_rows=len(rows))
+
+
+@dataclass(frozen=True)
+class _ColumnCheck:
+    name: str
+    type: type
+    bounds: tuple[tuple[Any, Callable], ...]
+    lengths: tuple[tuple[int, Callable], ...]
+
+
+@functools.cache
+def _column_checks(model: type[BaseModel]) -> tuple[_ColumnCheck, ...] | None:
+    """Bulk checks for every column, or None if some column needs a full validator."""
+    checks = []
+    for name, info in model.model_fields.items():
+        if info.annotation not in _BULK_TYPES:
+            return None
+        bounds = []
+        lengths = []
+        for constraint in info.metadata:
+            if type(constraint) in _BOUNDS:
+                attr, compare = _BOUNDS[type(constraint)]
+                bounds.append((getattr(constraint, attr), compare))
+            elif type(constraint) in _LENGTHS:
+                attr, compare = _LENGTHS[type(constraint)]
+                lengths.append((getattr(constraint, attr), compare))
+            else:
+                return None
+        checks.append(_ColumnCheck(name, info.annotation, tuple(bounds), tuple(lengths)))
+    return tuple(checks)
+
+
+def _suspect_rows(check: _ColumnCheck, column: list[Any]) -> set[int]:
+    """Indices of the rows of `column` that fail a bulk check."""
+    suspects: set[int] = set()
+    # Exact types only: `True` or `"3"` in an int column may still be valid,
+    # but that is for pydantic's coercion rules to decide.
+    if not all(map(operator.is_, map(type, column), itertools.repeat(check.type))):
+        suspects = {
+            index for index, value in enumerate(column) if type(value) is not check.type
+        }
+        # Placeholders keep the comparisons below from seeing other types.
+        column = [
+            check.type() if index in suspects else value
+            for index, value in enumerate(column)
+        ]
+    for bound, compare in check.bounds:
+        if not all(map(functools.partial(compare, bound), column)):
+            suspects.update(
+                index
+                for index, value in enumerate(column)
+                if not compare(bound, value) and index not in suspects
+            )
+    for limit, compare in check.lengths:
+        if not all(map(functools.partial(compare, limit), map(len, column))):
+            suspects.update(
+                index
+                for index, value in enumerate(column)
+                if not compare(limit, len(value)) and index not in suspects
+            )
+    return suspects
+
+
+def validate_table(model: type[BaseModel], rows: list[Any]) -> TableValidation:
+    """Validate a table column by column, falling back to per-row validation.
+
+    Gives the same `errors` and values as `validate_rows`.
+    """
+    checks = _column_checks(model)
+    if checks is None or not all(map(dict.__instancecheck__, rows)):
+        return validate_rows(model, rows)
+
+    columns = {
+        check.name: list(map(operator.methodcaller("get", check.name, _MISSING), rows))
+        for check in checks
+    }
+    suspects: set[int] = set()
+    for check in checks:
+        suspects |= _suspect_rows(check, columns[check.name])
+
+    errors = {}
+    for index in sorted(suspects):
+        try:
+            validated = model.model_validate(rows[index])
+        except ValidationError as e:
+            errors[index] = e.errors(include_url=False)
+            for check in checks:
+                if columns[check.name][index] is _MISSING:
+                    columns[check.name][index] = None
+            continue
+        for check in checks:
+            columns[check.name][index] = getattr(validated, check.name)
+    return TableValidation(columns, errors, fallback_rows=len(suspects))
@@ -0,0 +1,318 @@
+"""A long-lived worker serving many record-filling sessions.
+
+Each protocol directory is loaded once (from its bundle, see
+`tools.bundle`) into a `LoadedProtocol`: metadata, var schema, assigner
+graph and default values, shared read-only by every session of it. When a
+source file changes, the next session starts on a freshly loaded version;
+sessions already open keep the version they started on.
+
+A session itself is a `SessionRecord` with `__slots__`, holding only the
+fields whose value differs from the protocol's shared baseline and the
+`auto_first` assigners it has completed. Each operation rebuilds an
+`IncrementalSession` around that state, runs, and stores back the fields it
+wrote (the edited ones and the outputs of the assigners that ran).
+
+Source files are checked for changes at most every `check_interval` seconds
+per protocol, so an edit is picked up by sessions opened after that delay.
+
+The baseline is the default values after the initial cascade, computed once
+per protocol version: sessions opened without initial values start from it
+without running a single assigner. As with `AssignerMemo`, this assumes
+assigners are pure functions of their `dependent_fields`; pass
+`share_initial_cascade=False` otherwise. A cascade with failures is never
+shared, so every session retries it.
+
+Protocols without open sessions are evicted least recently used first once
+more than `max_protocols` are loaded.
+
+Operations on one session must not run concurrently (as with
+`IncrementalSession`); different sessions can be served from any thread.
+"""
+
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+from tools.assigner_graph import AssignerGraph
+from tools.bundle import ProtocolBundle, load_bundle, stale_sources
+from tools.incremental import IncrementalSession, UpdateReport
+from tools.protocol import resolve_protocol_dir
+
+
+@dataclass(frozen=True)
+class LoadedProtocol:
+    """The parsed, immutable state of one protocol version, shared by its sessions."""
+
+    protocol_dir: Path
+    bundle: ProtocolBundle
+    graph: AssignerGraph
+    defaults: Mapping[str, Any]
+    baseline: Mapping[str, Any]
+    """Values sessions start from: the defaults, after the initial cascade if it is shared."""
+    baseline_completed: frozenset[str]
+    """`auto_first` assigners completed by the shared initial cascade."""
+    shared_cascade: bool
+    """Whether sessions opened without values can start from `baseline` as is."""
+    loaded_at: float
+
+    @property
+    def protocol_id(self) -> str:
+        return self.bundle.metadata["id"]
+
+    @property
+    def version(self) -> str:
+        return self.bundle.metadata.get("version", "")
+
+
+class SessionRecord:
+    """Per-session state, kept as the difference from the protocol baseline."""
+
+    __slots__ = ("protocol", "changes", "completed_auto_first", "last_active")
+
+    def __init__(
+        self,
+        protocol: LoadedProtocol,
+        changes: dict[str, Any],
+        completed_auto_first: frozenset[str],
+    ):
+        self.protocol = protocol
+        self.changes = changes
+        self.completed_auto_first = completed_auto_first
+        self.last_active = time.monotonic()
+
+
+def load_protocol(
+    protocol_dir: str | Path, *, share_initial_cascade: bool = True
+) -> LoadedProtocol:
+    protocol_dir = resolve_protocol_dir(protocol_dir).resolve()
+    bundle = load_bundle(protocol_dir)
+    graph = AssignerGraph(bundle.load_assigners())
+    defaults = bundle.defaults()
+
+    baseline, completed = defaults, frozenset()
+    shared = share_initial_cascade or not graph.specs
+    if shared and graph.specs:
+        session = IncrementalSession(graph, defaults)
+        shared = not session.initialize().failed
+        if shared:
+            baseline = session.values
+            completed = frozenset(session.completed_auto_first)
+    return LoadedProtocol(
+        protocol_dir=protocol_dir,
+        bundle=bundle,
+        graph=graph,
+        defaults=MappingProxyType(defaults),
+        baseline=MappingProxyType(baseline),
+        baseline_completed=completed,
+        shared_cascade=shared,
+        loaded_at=time.monotonic(),
+    )
+
+
+class ProtocolWorker:
+    """Serves sessions of many protocols from one process, loading each version once.
+
+    `open_session` returns a session ID for `update`, `assign`, `values` and
+    `close_session`. `stats()` counts protocol loads, reloads after source
+    changes, cache hits and evictions.
+    """
+
+    def __init__(
+        self,
+        max_protocols: int = 16,
+        *,
+        share_initial_cascade: bool = True,
+        check_interval: float = 1.0,
+    ):
+        if max_protocols <= 0:
+            raise ValueError("max_protocols must be > 0")
+        if check_interval < 0:
+            raise ValueError("check_interval must be >= 0")
+        self.max_protocols = max_protocols
+        self.share_initial_cascade = share_initial_cascade
+        self.check_interval = check_interval
+        self.loads = 0
+        self.reloads = 0
+        self.hits = 0
+        self.evictions = 0
+        self._protocols: OrderedDict[Path, LoadedProtocol] = OrderedDict()
+        # Protocol directory -> when its sources were last checked.
+        self._checked: dict[Path, float] = {}
+        self._open: dict[Path, int] = {}
+        self._sessions: dict[int, SessionRecord] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        # Loading runs protocol code and can take a while; one lock per
+        # directory keeps other protocols' sessions flowing meanwhile. Locks
+        # are kept for the worker's lifetime (one per directory ever served),
+        # so every thread loading a directory always shares the same one.
+        self._load_locks: dict[Path, threading.Lock] = {}
+
+    def protocol(self, protocol_dir: str | Path) -> LoadedProtocol:
+        """The current version of a protocol, loading it on first use or after a change."""
+        key = resolve_protocol_dir(protocol_dir).resolve()
+        protocol = self._cached(key)
+        if protocol is not None:
+            return protocol
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            # Another thread may have loaded it while this one waited.
+            protocol = self._cached(key)
+            if protocol is not None:
+                return protocol
+            protocol = load_protocol(key, share_initial_cascade=self.share_initial_cascade)
+            with self._lock:
+                self.loads += 1
+                self.reloads += key in self._protocols
+                self._protocols[key] = protocol
+                self._protocols.move_to_end(key)
+                self._checked[key] = protocol.loaded_at
+                self._evict()
+        return protocol
+
+    def _cached(self, key: Path) -> LoadedProtocol | None:
+        now = time.monotonic()
+        with self._lock:
+            protocol = self._protocols.get(key)
+            if protocol is None:
+                return None
+            check = now - self._checked.get(key, 0.0) >= self.check_interval
+            if check:
+                self._checked[key] = now
+        # `stale_sources` stats every source file (and hashes touched ones);
+        # it only reads, the bundle is rewritten when the protocol reloads.
+        if check and stale_sources(protocol.bundle):
+            with self._lock:
+                # Make the next lookup check again and reload.
+                self._checked.pop(key, None)
+            return None
+        with self._lock:
+            self.hits += 1
+            if key in self._protocols:
+                self._protocols.move_to_end(key)
+        return protocol
+
+    def _evict(self) -> None:
+        # Called with `_lock` held. Protocols with open sessions stay loaded
+        # even past `max_protocols`, and so does the one just used.
+        for key in list(self._protocols)[:-1]:
+            if len(self._protocols) <= self.max_protocols:
+                return
+            if not self._open.get(key):
+                del self._protocols[key]
+                self._checked.pop(key, None)
+                self._open.pop(key, None)
+                self.evictions += 1
+
+    def open_session(
+        self, protocol_dir: str | Path, values: Mapping[str, Any] | None = None
+    ) -> tuple[int, UpdateReport]:
+        """Start a record, running the initial cascade unless the baseline already has."""
+        protocol = self.protocol(protocol_dir)
+        if not values and protocol.shared_cascade:
+            record = SessionRecord(protocol, {}, protocol.baseline_completed)
+            report = UpdateReport(changed=[])
+        else:
+            session = IncrementalSession(protocol.graph, {**protocol.defaults, **(values or {})})
+            report = session.initialize()
+            record = SessionRecord(protocol, {}, frozenset())
+            self._store(record, session, report, values or {})
+        with self._lock:
+            session_id = next(self._ids)
+            self._sessions[session_id] = record
+            self._open[protocol.protocol_dir] = self._open.get(protocol.protocol_dir, 0) + 1
+        return session_id, report
+
+    def close_session(self, session_id: int) -> None:
+        with self._lock:
+            record = self._sessions.pop(session_id)
+            self._open[record.protocol.protocol_dir] -= 1
+            self._evict()
+
+    def _record(self, session_id: int) -> SessionRecord:
+        record = self._sessions[session_id]
+        record.last_active = time.monotonic()
+        return record
+
+    @staticmethod
+    def _session(record: SessionRecord) -> IncrementalSession:
+        session = IncrementalSession(
+            record.protocol.graph, {**record.protocol.baseline, **record.changes}
+        )
+        session.completed_auto_first = set(record.completed_auto_first)
+        return session
+
+    @staticmethod
+    def _store(
+        record: SessionRecord,
+        session: IncrementalSession,
+        report: UpdateReport,
+        edited: Iterable[str] = (),
+    ) -> None:
+        # Only the fields this operation wrote can have moved relative to
+        # the baseline: the edits and the outputs of the assigners that ran.
+        specs = record.protocol.graph.specs
+        written = set(edited).union(report.changed)
+        for name in itertools.chain(report.ran, report.memo_hits):
+            if name not in report.failed:
+                written.update(specs[name].assigned_fields)
+        baseline = record.protocol.baseline
+        for name in written:
+            value = session.values.get(name)
+            if name in baseline and (baseline[name] is value or baseline[name] == value):
+                record.changes.pop(name, None)
+            elif name in session.values:
+                record.changes[name] = value
+        completed = frozenset(session.completed_auto_first)
+        if completed != record.completed_auto_first:
+            # Share the baseline's set when they are equal.
+            record.completed_auto_first = (
+                record.protocol.baseline_completed
+                if completed == record.protocol.baseline_completed
+                else completed
+            )
+
+    def update(self, session_id: int, changes: dict[str, Any]) -> UpdateReport:
+        record = self._record(session_id)
+        session = self._session(record)
+        report = session.update(changes)
+        self._store(record, session, report)
+        return report
+
+    def assign(self, session_id: int, name: str) -> UpdateReport:
+        record = self._record(session_id)
+        session = self._session(record)
+        report = session.assign(name)
+        self._store(record, session, report)
+        return report
+
+    def values(self, session_id: int) -> dict[str, Any]:
+        record = self._record(session_id)
+        return {**record.protocol.baseline, **record.changes}
+
+    def session_protocol(self, session_id: int) -> LoadedProtocol:
+        return self._sessions[session_id].protocol
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "protocols": len(self._protocols),
+                "max_protocols": self.max_protocols,
+                "loads": self.loads,
+                "reloads": self.reloads,
+                "hits": self.hits,
+                "evictions": self.evictions,
+            }